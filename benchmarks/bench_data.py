@@ -0,0 +1,163 @@
+import random
+from typing import Callable, Dict, List, Tuple
+from benchmarks.synthetic import SyntheticLibrary
+from core.duplicates import DuplicateFinder
+from core.name_index import NameIndex
+from core.script_manager import ScriptManager
+from core.tokenizer import tokenize_powershell
+from database.database import DatabaseManager
+from database.query import parse_query
+
+
+# name -> (factory(library) -> zero-argument callable to time, repeat)
+BENCHMARKS: Dict[str, Tuple[Callable[[SyntheticLibrary], Callable[[], object]], int]] = {}
+
+
+def benchmark(name: str, repeat: int = 5):
+    def decorator(factory):
+        BENCHMARKS[name] = (factory, repeat)
+        return factory
+    return decorator
+
+
+@benchmark("tree_load")
+def bench_tree_load(library: SyntheticLibrary):
+    db = DatabaseManager(library.db_path)
+
+    def run():
+        # Fresh manager each run so caches do not hide the cost
+        manager = ScriptManager(db)
+        manager.get_folder_tree()
+        manager.get_scripts_grouped_by_folder()
+    return run
+
+
+@benchmark("list_summaries")
+def bench_list_summaries(library: SyntheticLibrary):
+    db = DatabaseManager(library.db_path)
+
+    def run():
+        # Row -> Script conversion dominates once the pages are cached
+        db.get_all_script_summaries()
+    return run
+
+
+@benchmark("search_text")
+def bench_search_text(library: SyntheticLibrary):
+    manager = ScriptManager(DatabaseManager(library.db_path))
+    terms = ["Invoke-Deploy", "mailbox", "Cluster17", "zz-no-match-zz"]
+
+    def run():
+        for term in terms:
+            manager.search_scripts(term)
+    return run
+
+
+@benchmark("search_structured")
+def bench_search_structured(library: SyntheticLibrary):
+    manager = ScriptManager(DatabaseManager(library.db_path))
+    folder_path = manager.get_folder(library.top_folder_ids[0]).path
+    queries = [
+        parse_query("env:Production modified:week"),
+        parse_query("author:user03 type:bat"),
+        parse_query(f"folder:{folder_path}"),
+    ]
+
+    def run():
+        for query in queries:
+            manager.query_scripts(query)
+    return run
+
+
+@benchmark("get_script")
+def bench_get_script(library: SyntheticLibrary):
+    db = DatabaseManager(library.db_path)
+    ids = random.Random(1).sample(library.script_ids, min(500, len(library.script_ids)))
+
+    def run():
+        for script_id in ids:
+            db.get_script(script_id)
+    return run
+
+
+@benchmark("bulk_save", repeat=3)
+def bench_bulk_save(library: SyntheticLibrary):
+    manager = ScriptManager(DatabaseManager(library.db_path))
+    ids = random.Random(2).sample(library.script_ids, min(200, len(library.script_ids)))
+    scripts = [manager.get_script(script_id) for script_id in ids]
+
+    def run():
+        for script in scripts:
+            script.content = script.content + "\n# saved"
+            manager.update_script(script)
+    return run
+
+
+@benchmark("folder_move")
+def bench_folder_move(library: SyntheticLibrary):
+    manager = ScriptManager(DatabaseManager(library.db_path))
+    moving, target = library.top_folder_ids[0], library.top_folder_ids[-1]
+
+    def run():
+        # Move a whole top-level subtree under a sibling and back again
+        manager.move_folder(moving, target)
+        manager.move_folder(moving, None)
+    return run
+
+
+@benchmark("name_index_build", repeat=3)
+def bench_name_index_build(library: SyntheticLibrary):
+    manager = ScriptManager(DatabaseManager(library.db_path))
+
+    def run():
+        NameIndex().build(manager)
+    return run
+
+
+@benchmark("name_index_search", repeat=10)
+def bench_name_index_search(library: SyntheticLibrary):
+    index = NameIndex()
+    index.build(ScriptManager(DatabaseManager(library.db_path)))
+    queries = ["d", "dep", "getusr", "invdeploy", "bkp", "/back", "zzq"]
+
+    def run():
+        for query in queries:
+            index.search(query)
+    return run
+
+
+@benchmark("duplicates_cold", repeat=1)
+def bench_duplicates_cold(library: SyntheticLibrary):
+    db = DatabaseManager(library.db_path)
+
+    def run():
+        # Drop the fingerprint cache so every script is shingled again
+        with db.get_connection() as conn:
+            conn.execute("DELETE FROM script_fingerprints")
+        DuplicateFinder(db).run()
+    return run
+
+
+@benchmark("duplicates_cached", repeat=3)
+def bench_duplicates_cached(library: SyntheticLibrary):
+    db = DatabaseManager(library.db_path)
+    DuplicateFinder(db).run()
+
+    def run():
+        DuplicateFinder(db).run()
+    return run
+
+
+@benchmark("highlighter", repeat=3)
+def bench_highlighter(library: SyntheticLibrary):
+    db = DatabaseManager(library.db_path)
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT content FROM scripts WHERE file_type = 'ps1' LIMIT 2000")
+        contents: List[str] = [row[0] for row in cursor.fetchall()]
+
+    def run():
+        for content in contents:
+            tokenize_powershell(content)
+    run.bytes = sum(len(content) for content in contents)
+    return run
\ No newline at end of file
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Offscreen latency benchmarks for the real widgets.
+
+Runs FolderTreeWidget, EditorTabWidget and ScriptEditor under the Qt
+offscreen platform, drives them with scripted events and reports p50/p99
+latency per interaction plus peak RSS. Every sample includes a synchronous
+repaint so layout, styling and painting costs are counted.
+
+    python -m benchmarks.bench_gui --scripts 5000 --output gui.json
+    python -m benchmarks.bench_gui --baseline gui.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+# Must be set before the first PyQt6 import
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import summarize, compare
+from benchmarks.synthetic import LibrarySpec, generate_library, powershell_content
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PSLibrary offscreen GUI benchmarks")
+    parser.add_argument("--scripts", type=int, default=5000, help="number of scripts")
+    parser.add_argument("--depth", type=int, default=3, help="folder tree depth")
+    parser.add_argument("--fanout", type=int, default=5, help="subfolders per folder")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--tree-loads", type=int, default=5, help="full tree loads to time")
+    parser.add_argument("--expand", type=int, default=100, help="folders to expand")
+    parser.add_argument("--tabs", type=int, default=30, help="tabs to open")
+    parser.add_argument("--keystrokes", type=int, default=300,
+                        help="characters to type into the large script")
+    parser.add_argument("--large-size", type=int, default=1_000_000,
+                        help="size in bytes of the script used for typing")
+    parser.add_argument("--huge-size", type=int, default=8_000_000,
+                        help="size in bytes of the script opened in large-file mode")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown ratio before flagging a regression")
+    return parser.parse_args(argv)
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def time_samples(steps: List[Callable[[], object]], app) -> List[float]:
+    """Run each step, flush the event queue and return per-step latencies in ms."""
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for step in steps:
+            start = time.perf_counter()
+            step()
+            app.processEvents()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    return samples
+
+
+def bench_tree_load(app, tree, count: int) -> List[float]:
+    def step():
+        tree.load_tree()
+        tree.viewport().repaint()
+    return time_samples([step] * count, app)
+
+
+def bench_tree_expand(app, tree, count: int, rng: random.Random) -> List[float]:
+    folder_items = [item for (kind, _), item in tree.item_map.items() if kind == "folder"]
+    # Parents before children so each expansion reveals visible rows
+    folder_items.sort(key=lambda item: item.item_data.path.count("/"))
+    chosen = folder_items[:count]
+
+    def expand(item):
+        def step():
+            tree.expandItem(item)
+            tree.scrollToItem(item)
+            tree.viewport().repaint()
+        return step
+    samples = time_samples([expand(item) for item in chosen], app)
+    tree.collapseAll()
+    return samples
+
+
+def bench_tab_open(app, tabs, manager, script_ids: List[int]) -> List[float]:
+    def open_tab(script_id):
+        def step():
+            tabs.open_script(manager.get_script(script_id))
+            tabs.currentWidget().repaint()
+        return step
+    samples = time_samples([open_tab(script_id) for script_id in script_ids], app)
+    while tabs.count():
+        tabs.removeTab(0)
+    tabs.editors.clear()
+    return samples
+
+
+def bench_typing(app, tabs, manager, script_id: int, count: int) -> List[float]:
+    from PyQt6.QtTest import QTest
+
+    tabs.open_script(manager.get_script(script_id))
+    editor = tabs.editors[script_id]
+    editor.setFocus()
+    # Type in the middle of the document where restyling has work on both sides
+    editor.setCursorPosition(editor.lines() // 2, 0)
+    app.processEvents()
+
+    text = "Write-Host \"typing $value\" # bench\n"
+
+    def key(char):
+        def step():
+            QTest.keyClicks(editor, char)
+            editor.viewport().repaint()
+        return step
+    return time_samples([key(text[n % len(text)]) for n in range(count)], app)
+
+
+def bench_huge_open(app, tabs, manager, script_id: int, count: int = 3) -> List[float]:
+    def open_huge():
+        tabs.open_script(manager.get_script(script_id))
+        tabs.currentWidget().repaint()
+
+    samples = []
+    for _ in range(count):
+        samples.extend(time_samples([open_huge], app))
+        # Let the chunked load finish, then close the tab for the next round
+        editor = tabs.editors[script_id]
+        while editor.loading:
+            app.processEvents()
+        tabs.removeTab(tabs.indexOf(editor))
+        del tabs.editors[script_id]
+        editor.deleteLater()
+    return samples
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+
+    from PyQt6.QtWidgets import QApplication
+    from core.script_manager import ScriptManager
+    from database.database import DatabaseManager
+    from gui.editor_tabs import EditorTabWidget
+    from gui.folder_tree import FolderTreeWidget
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    spec = LibrarySpec(depth=args.depth, fanout=args.fanout, scripts=args.scripts,
+                       seed=args.seed)
+    rng = random.Random(args.seed)
+    raw: Dict[str, List[float]] = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, "bench_library.db")
+        print(f"Generating library: {spec.scripts} scripts, depth {spec.depth}, "
+              f"fan-out {spec.fanout}...", file=sys.stderr)
+        library = generate_library(db_path, spec)
+        manager = ScriptManager(DatabaseManager(db_path))
+        large = manager.create_script("Large-Benchmark", None, "ps1",
+                                      powershell_content(rng, args.large_size))
+        huge = manager.create_script("Huge-Benchmark", None, "ps1",
+                                     powershell_content(rng, args.huge_size))
+
+        tree = FolderTreeWidget(manager, load=False)
+        # Animations would defer the expansion work past the sample window
+        tree.setAnimated(False)
+        tree.resize(400, 900)
+        tree.show()
+        tabs = EditorTabWidget(manager)
+        tabs.resize(1200, 900)
+        tabs.show()
+        app.processEvents()
+
+        raw["tree_load"] = bench_tree_load(app, tree, args.tree_loads)
+        raw["tree_expand"] = bench_tree_expand(app, tree, args.expand, rng)
+        tab_ids = rng.sample(library.script_ids, min(args.tabs, len(library.script_ids)))
+        raw["tab_open"] = bench_tab_open(app, tabs, manager, tab_ids)
+        raw["typing_large_script"] = bench_typing(app, tabs, manager, large.id, args.keystrokes)
+        raw["huge_script_open"] = bench_huge_open(app, tabs, manager, huge.id)
+
+        tree.close()
+        tabs.close()
+
+    results = {}
+    for name, samples in raw.items():
+        results[name] = summarize(samples)
+        print(f"{name:<28}p50 {results[name]['median_ms']:>8.2f} ms   "
+              f"p99 {results[name]['p99_ms']:>8.2f} ms   ({len(samples)} samples)",
+              file=sys.stderr)
+    rss = peak_rss_mb()
+    print(f"{'peak RSS':<28}{rss:>12.1f} MB", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "qt_platform": os.environ.get("QT_QPA_PLATFORM"),
+            "spec": vars(spec),
+            "large_size": args.large_size,
+            "huge_size": args.huge_size,
+            "peak_rss_mb": rss,
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        # Tail latency is what users feel while typing, so gate on p99
+        regressions = compare(results, baseline.get("results", {}), args.tolerance,
+                              metric="p99_ms")
+        previous_rss = baseline.get("meta", {}).get("peak_rss_mb")
+        if previous_rss and rss > previous_rss * (1 + args.tolerance):
+            print(f"peak RSS grew from {previous_rss:.1f} MB to {rss:.1f} MB", file=sys.stderr)
+            regressions.append("peak_rss")
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Import-time budget for the headless layers.
+
+Imports each module in a fresh interpreter, checks that no Qt (or other GUI
+only) module was pulled in and that the median import time stays within
+budget. Exits non-zero on any violation, so it can gate CI.
+
+    python -m benchmarks.bench_imports
+    python -m benchmarks.bench_imports --budget-ms 80 --runs 9
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Everything a CLI, service or batch tool may import
+HEADLESS_MODULES = [
+    "database.models",
+    "database.query",
+    "database.database",
+    "database.pool",
+    "database.federation",
+    "database.maintenance",
+    "database.migrations",
+    "core.tracing",
+    "core.session",
+    "core.change_feed",
+    "core.backup",
+    "core.tokenizer",
+    "core.name_index",
+    "core.duplicates",
+    "core.dependencies",
+    "core.symbols",
+    "core.startup_profiler",
+    "core.script_manager",
+    "cli.main",
+]
+
+FORBIDDEN_PREFIXES = ("PyQt6", "PyQt5", "PySide6", "PySide2", "sip", "shiboken", "pygments")
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = (time.perf_counter() - start) * 1000
+print(json.dumps({{"ms": elapsed, "modules": sorted(sys.modules)}}))
+"""
+
+
+def probe(module: str) -> Dict:
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(module=module)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def check_module(module: str, runs: int, budget_ms: float) -> List[str]:
+    samples = []
+    problems = []
+    for _ in range(runs):
+        result = probe(module)
+        samples.append(result["ms"])
+    forbidden = sorted({name.split(".")[0] for name in result["modules"]
+                        if name.startswith(FORBIDDEN_PREFIXES)})
+    median = statistics.median(samples)
+    status = "ok"
+    if forbidden:
+        problems.append(f"{module} imports {', '.join(forbidden)}")
+        status = "GUI IMPORT"
+    if median > budget_ms:
+        problems.append(f"{module} took {median:.1f} ms (budget {budget_ms:.0f} ms)")
+        status = "OVER BUDGET"
+    print(f"{module:<28}{median:>8.1f} ms  {status}")
+    return problems
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Check import cost of the headless modules")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="maximum median import time per module")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per module")
+    parser.add_argument("modules", nargs="*", help="modules to check (default: headless set)")
+    args = parser.parse_args(argv)
+
+    problems = []
+    for module in args.modules or HEADLESS_MODULES:
+        problems.extend(check_module(module, args.runs, args.budget_ms))
+    for problem in problems:
+        print(f"FAIL: {problem}", file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+import gc
+import statistics
+import time
+from typing import Callable, Dict, List
+
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of samples (fraction in 0..1)."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def summarize(samples_ms: List[float]) -> Dict[str, float]:
+    return {
+        "runs": len(samples_ms),
+        "min_ms": min(samples_ms),
+        "median_ms": statistics.median(samples_ms),
+        "mean_ms": statistics.fmean(samples_ms),
+        "p90_ms": percentile(samples_ms, 0.90),
+        "p99_ms": percentile(samples_ms, 0.99),
+        "max_ms": max(samples_ms),
+    }
+
+
+def measure(run: Callable[[], object], repeat: int = 5, warmup: int = 1) -> Dict[str, float]:
+    """Time run() repeat times after warmup calls; GC is paused while timing."""
+    for _ in range(warmup):
+        run()
+    samples = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return summarize(samples)
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            tolerance: float, metric: str = "median_ms") -> List[str]:
+    """Print a comparison table and return the names that regressed."""
+    regressions = []
+    print(f"{'benchmark':<28}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous or metric not in previous or metric not in stats:
+            print(f"{name:<28}{'-':>12}{stats.get(metric, 0):>12.2f}{'new':>8}")
+            continue
+        ratio = stats[metric] / previous[metric] if previous[metric] else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif ratio < 1 - tolerance:
+            flag = "  faster"
+        print(f"{name:<28}{previous[metric]:>12.2f}{stats[metric]:>12.2f}{ratio:>8.2f}{flag}")
+    return regressions
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Headless benchmarks for the data layer.
+
+Generates a synthetic library, times DatabaseManager/ScriptManager hot paths
+and writes the results as JSON. With --baseline, results are compared to a
+stored run and the exit code is non-zero if anything regressed.
+
+    python -m benchmarks.run --scripts 20000 --output results.json
+    python -m benchmarks.run --baseline results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.common import measure, compare
+from benchmarks.synthetic import LibrarySpec, generate_library
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="PSLibrary data-layer benchmarks")
+    parser.add_argument("--scripts", type=int, default=5000, help="number of scripts")
+    parser.add_argument("--depth", type=int, default=3, help="folder tree depth")
+    parser.add_argument("--fanout", type=int, default=5, help="subfolders per folder")
+    parser.add_argument("--size-median", type=int, default=2000,
+                        help="median script size in bytes (log-normal)")
+    parser.add_argument("--size-sigma", type=float, default=1.0,
+                        help="log-normal sigma of script sizes")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--only", help="comma-separated benchmark names to run")
+    parser.add_argument("--repeat", type=int, help="override repetitions per benchmark")
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--baseline", help="compare against a previous results JSON")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown ratio before flagging a regression")
+    parser.add_argument("--keep-db", help="copy of the generated library is kept at this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    from benchmarks.bench_data import BENCHMARKS
+
+    spec = LibrarySpec(depth=args.depth, fanout=args.fanout, scripts=args.scripts,
+                       size_median=args.size_median, size_sigma=args.size_sigma,
+                       seed=args.seed)
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        print(f"Unknown benchmark(s): {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = args.keep_db or os.path.join(workdir, "bench_library.db")
+        if os.path.exists(db_path):
+            os.remove(db_path)
+        print(f"Generating library: {spec.scripts} scripts, depth {spec.depth}, "
+              f"fan-out {spec.fanout}...", file=sys.stderr)
+        library = generate_library(db_path, spec)
+
+        results = {}
+        for name in selected:
+            factory, repeat = BENCHMARKS[name]
+            run = factory(library)
+            stats = measure(run, repeat=args.repeat or repeat)
+            if hasattr(run, "bytes"):
+                stats["mb_per_s"] = run.bytes / 1e6 / (stats["median_ms"] / 1000)
+            results[name] = stats
+            print(f"{name:<28}{stats['median_ms']:>10.2f} ms (median of {stats['runs']})",
+                  file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "spec": vars(spec),
+            "library_bytes": library.total_bytes,
+            "folders": len(library.folder_ids),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        if baseline.get("meta", {}).get("spec") != report["meta"]["spec"]:
+            print("warning: baseline was generated with a different library spec",
+                  file=sys.stderr)
+        regressions = compare(results, baseline.get("results", {}), args.tolerance)
+        if regressions:
+            print(f"Regressed: {', '.join(regressions)}", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,148 @@
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+from database.database import DatabaseManager
+
+
+VERBS = ["Get", "Set", "New", "Remove", "Invoke", "Start", "Stop", "Test",
+         "Update", "Import", "Export", "Add", "Clear", "Sync", "Restart"]
+NOUNS = ["User", "Mailbox", "Service", "Config", "Deploy", "Backup", "Report",
+         "Certificate", "Share", "Printer", "Cluster", "Database", "Log", "Group",
+         "Policy", "Registry", "Firewall", "Package", "Schedule", "Inventory"]
+AUTHORS = [f"user{n:02d}" for n in range(20)]
+
+
+@dataclass
+class LibrarySpec:
+    depth: int = 3
+    fanout: int = 5
+    scripts: int = 5000
+    size_median: int = 2000  # bytes; content sizes follow a log-normal distribution
+    size_sigma: float = 1.0
+    size_max: int = 200_000
+    bat_ratio: float = 0.25
+    production_ratio: float = 0.2
+    seed: int = 1234
+
+
+@dataclass
+class SyntheticLibrary:
+    db_path: str
+    spec: LibrarySpec
+    folder_ids: List[int] = field(default_factory=list)
+    top_folder_ids: List[int] = field(default_factory=list)
+    script_ids: List[int] = field(default_factory=list)
+    total_bytes: int = 0
+
+
+def powershell_content(rng: random.Random, size: int) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        verb, noun = rng.choice(VERBS), rng.choice(NOUNS)
+        block = rng.randrange(5)
+        if block == 0:
+            text = (f"function {verb}-{noun}{rng.randrange(100)} {{\n"
+                    f"    param([string]$Name = 'default', [int]$Retries = {rng.randrange(10)})\n"
+                    f"    # {verb} the {noun.lower()} and report status\n"
+                    f"    $result = {verb}-{noun} -Name $Name -ErrorAction Stop\n"
+                    f"    return $result\n}}\n\n")
+        elif block == 1:
+            text = f"$items = {verb}-{noun} | Where-Object {{ $_.Count -gt {rng.randrange(1000)} }}\n"
+        elif block == 2:
+            text = f"Write-Host \"Processing {noun} step {rng.randrange(50)} of $total\"\n"
+        elif block == 3:
+            text = f". .\\{noun}Helpers.ps1\nImport-Module {noun}Tools\n"
+        else:
+            text = f"# TODO: review {noun.lower()} handling ({rng.randrange(9999)})\n"
+        parts.append(text)
+        length += len(text)
+    return "".join(parts)[:size]
+
+
+def batch_content(rng: random.Random, size: int) -> str:
+    parts = ["@echo off\n"]
+    length = len(parts[0])
+    while length < size:
+        noun = rng.choice(NOUNS)
+        block = rng.randrange(4)
+        if block == 0:
+            text = f":{noun.lower()}_{rng.randrange(100)}\n"
+        elif block == 1:
+            text = f"call {noun.lower()}_setup.bat %1 %2\n"
+        elif block == 2:
+            text = f"set {noun.upper()}_PATH=C:\\Tools\\{noun}\\{rng.randrange(10)}\n"
+        else:
+            text = f"echo Running {noun} job %DATE% %TIME%\n"
+        parts.append(text)
+        length += len(text)
+    return "".join(parts)[:size]
+
+
+def generate_library(db_path: str, spec: Optional[LibrarySpec] = None) -> SyntheticLibrary:
+    """Create a synthetic library at db_path (which should not exist yet)."""
+    spec = spec or LibrarySpec()
+    rng = random.Random(spec.seed)
+    db = DatabaseManager(db_path)
+    library = SyntheticLibrary(db_path=db_path, spec=spec)
+    now = datetime.now()
+
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Folders: a full tree of the given depth and fan-out
+        level = [(None, "")]
+        for depth in range(spec.depth):
+            next_level = []
+            for parent_id, parent_path in level:
+                for n in range(spec.fanout):
+                    name = f"{rng.choice(NOUNS)}{depth}_{n}"
+                    path = f"{parent_path}/{name}"
+                    cursor.execute(
+                        'INSERT INTO folders (name, parent_id, created_date, path) VALUES (?, ?, ?, ?)',
+                        (name, parent_id, now - timedelta(days=400), path)
+                    )
+                    folder_id = cursor.lastrowid
+                    library.folder_ids.append(folder_id)
+                    if parent_id is None:
+                        library.top_folder_ids.append(folder_id)
+                    next_level.append((folder_id, path))
+            level = next_level
+
+        # Scripts spread over all folders, a few at the root
+        mu = math.log(spec.size_median)
+        rows = []
+        for n in range(spec.scripts):
+            is_bat = rng.random() < spec.bat_ratio
+            size = min(spec.size_max, max(16, int(rng.lognormvariate(mu, spec.size_sigma))))
+            content = batch_content(rng, size) if is_bat else powershell_content(rng, size)
+            library.total_bytes += len(content)
+            folder_id = rng.choice(library.folder_ids) if library.folder_ids and rng.random() > 0.02 else None
+            modified = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+            rows.append((
+                f"{rng.choice(VERBS)}-{rng.choice(NOUNS)}{n}",
+                folder_id,
+                content,
+                f"Synthetic script {n}",
+                rng.choice(AUTHORS),
+                "Production" if rng.random() < spec.production_ratio else "Testing",
+                "bat" if is_bat else "ps1",
+                modified - timedelta(days=30),
+                modified,
+                modified,
+            ))
+        cursor.executemany('''
+            INSERT INTO scripts (name, folder_id, content, description, author,
+                               environment_tag, file_type, created_date,
+                               modified_date, last_opened_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+        cursor.execute('SELECT id FROM scripts ORDER BY id')
+        library.script_ids = [row[0] for row in cursor.fetchall()]
+
+    # Raw inserts bypass ScriptManager, so derived tables are rebuilt in bulk
+    db.rebuild_folder_closure()
+    db.rebuild_folder_stats()
+    return library
\ No newline at end of file
@@ -0,0 +1,614 @@
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+from database.database import DatabaseManager
+from database.models import Script
+from database.query import ScriptQuery, parse_query
+from core.script_manager import ScriptManager, normalize_path, split_script_path
+
+
+class CliError(Exception):
+    """A user-facing failure; reported as "error: ..." with exit code 1."""
+
+
+# Output helpers
+def script_record(manager: ScriptManager, script: Script, content: bool = False,
+                  path: Optional[str] = None) -> Dict[str, Any]:
+    record = {
+        "id": script.id,
+        "path": path or manager.get_script_path(script),
+        "name": script.name,
+        "file_type": script.file_type,
+        "environment": script.environment_tag,
+        "author": script.author,
+        "description": script.description,
+        "created": script.created_date.isoformat(timespec="seconds"),
+        "modified": script.modified_date.isoformat(timespec="seconds"),
+    }
+    if content:
+        record["content"] = script.content
+    return record
+
+
+def write_record(out: TextIO, record: Dict[str, Any]):
+    out.write(json.dumps(record, ensure_ascii=False))
+    out.write("\n")
+
+
+def read_lines(stream: TextIO) -> Iterable[str]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield line
+
+
+# Lookups
+def resolve_script(manager: ScriptManager, target: str) -> Optional[Script]:
+    """A script by library path, or by id when given as "#12" or a bare number."""
+    if target.lstrip("#").isdigit():
+        return manager.get_script(int(target.lstrip("#")))
+    return manager.get_script_by_path(target)
+
+
+def resolve_folder_id(manager: ScriptManager, path: str) -> Optional[int]:
+    """Folder id for path; None for the library root."""
+    if normalize_path(path) == "/":
+        return None
+    folder = manager.get_folder_by_path(path)
+    if folder is None:
+        raise CliError(f"folder not found: {path}")
+    return folder.id
+
+
+def put_script(manager: ScriptManager, path: str, content: str,
+               environment: Optional[str] = None, author: Optional[str] = None,
+               description: Optional[str] = None, create_folders: bool = True) -> Dict[str, Any]:
+    """Create or update the script at path; returns its record plus "action"."""
+    folder_path, name, file_type = split_script_path(path)
+    if not name:
+        raise CliError(f"invalid script path: {path}")
+    script = manager.get_script_by_path(path)
+    if script is None:
+        if create_folders:
+            folder_id = manager.ensure_folder_path(folder_path)
+        else:
+            folder_id = resolve_folder_id(manager, folder_path)
+        script = manager.create_script(name, folder_id, file_type or "ps1", content)
+        action = "created"
+    else:
+        action = "updated" if script.content != content else "unchanged"
+        script.content = content
+
+    metadata_changed = False
+    for attr, value in (("environment_tag", environment), ("author", author),
+                        ("description", description)):
+        if value is not None and getattr(script, attr) != value:
+            setattr(script, attr, value)
+            metadata_changed = True
+    if metadata_changed and action == "unchanged":
+        action = "updated"
+    # Re-putting identical content is common in pipelines; skip the write
+    if action == "updated" or metadata_changed:
+        manager.update_script(script)
+    record = script_record(manager, script)
+    record["action"] = action
+    return record
+
+
+def move_item(manager: ScriptManager, source: str, dest: str) -> Dict[str, Any]:
+    """Move a script or folder (by path) into the folder at dest."""
+    dest_id = resolve_folder_id(manager, dest)
+    script = resolve_script(manager, source)
+    if script is not None:
+        if not manager.move_script(script.id, dest_id):
+            raise CliError(f"could not move {source}")
+        return {"type": "script", "id": script.id, "path": manager.get_script_path(script)}
+    folder = manager.get_folder_by_path(source)
+    if folder is None:
+        raise CliError(f"not found: {source}")
+    if not manager.move_folder(folder.id, dest_id):
+        raise CliError(f"could not move {source} into {dest}")
+    return {"type": "folder", "id": folder.id, "path": folder.path}
+
+
+def delete_item(manager: ScriptManager, target: str, recursive: bool = False) -> Dict[str, Any]:
+    script = resolve_script(manager, target)
+    if script is not None:
+        manager.delete_script(script.id)
+        return {"type": "script", "id": script.id, "deleted": True}
+    folder = manager.get_folder_by_path(target)
+    if folder is None:
+        raise CliError(f"not found: {target}")
+    if recursive:
+        scripts, folders = manager.delete_items([], [folder.id])
+        return {"type": "folder", "id": folder.id, "deleted": True,
+                "scripts": scripts, "folders": folders}
+    if not manager.delete_folder(folder.id):
+        raise CliError(f"folder is not empty (use --recursive): {target}")
+    return {"type": "folder", "id": folder.id, "deleted": True}
+
+
+# Commands
+def cmd_list(manager: ScriptManager, args, out: TextIO) -> int:
+    query = parse_query(args.filter) if args.filter else ScriptQuery()
+    if args.folder and args.all_libraries:
+        # Folder ids differ between libraries; match the path in each
+        path = normalize_path(args.folder)
+        query.folder_path = path if path != "/" else None
+        query.include_subfolders = not args.no_recursive
+        query.root_only = query.folder_path is None and args.no_recursive
+    elif args.folder:
+        query.folder_id = resolve_folder_id(manager, args.folder)
+        query.include_subfolders = not args.no_recursive
+        query.root_only = query.folder_id is None and args.no_recursive
+    if args.all_libraries:
+        return write_federated(manager, query, args.content, out)
+    manager.get_all_folders()  # warm the folder cache used for paths
+    for script in manager.iter_scripts(query):
+        write_record(out, script_record(manager, script, args.content))
+    return 0
+
+
+def cmd_search(manager: ScriptManager, args, out: TextIO) -> int:
+    query = parse_query(" ".join(args.query))
+    query.limit = args.limit
+    if args.all_libraries:
+        return write_federated(manager, query, args.content, out)
+    manager.get_all_folders()
+    for script in manager.iter_scripts(query):
+        write_record(out, script_record(manager, script, args.content))
+    return 0
+
+
+def write_federated(manager: ScriptManager, query: ScriptQuery, content: bool, out: TextIO) -> int:
+    """Matches from this library and every mounted one, from one query."""
+    from database.federation import LibraryFederation
+    federation = LibraryFederation(manager.db)
+    for hit in federation.query_scripts(query):
+        if content:
+            hit.script.content = federation.get_script_content(hit.library, hit.script.id)
+        record = {"library": hit.library}
+        record.update(script_record(manager, hit.script, content, hit.path))
+        write_record(out, record)
+    return 0
+
+
+def cmd_libraries(manager: ScriptManager, args, out: TextIO) -> int:
+    from database.federation import FederationError, LibraryFederation
+    federation = LibraryFederation(manager.db)
+    try:
+        if args.mount:
+            federation.mount(args.mount, args.name)
+        elif args.unmount and not federation.unmount(args.unmount):
+            raise CliError(f"not mounted: {args.unmount}")
+    except FederationError as error:
+        raise CliError(str(error))
+    available = {mount.name for mount in federation.available()}
+    for mount in federation.mounts:
+        write_record(out, {"name": mount.name, "path": mount.path,
+                           "available": mount.name in available})
+    return 0
+
+
+def cmd_get(manager: ScriptManager, args, out: TextIO) -> int:
+    targets: Iterable[str] = args.targets
+    if targets == ["-"]:
+        targets = read_lines(sys.stdin)
+    elif len(targets) == 1 and not args.json:
+        # Single script: raw content, ready to pipe into a file
+        script = resolve_script(manager, targets[0])
+        if script is None:
+            raise CliError(f"script not found: {targets[0]}")
+        out.write(script.content)
+        return 0
+
+    status = 0
+    # One connection for the whole run instead of one per lookup
+    with manager.transaction():
+        for target in targets:
+            script = resolve_script(manager, target)
+            if script is None:
+                write_record(out, {"target": target, "error": "not found"})
+                status = 1
+                continue
+            record = script_record(manager, script, content=True)
+            record["target"] = target
+            write_record(out, record)
+    return status
+
+
+def cmd_put(manager: ScriptManager, args, out: TextIO) -> int:
+    if args.file:
+        with open(args.file, encoding="utf-8") as handle:
+            content = handle.read()
+    else:
+        content = sys.stdin.read()
+    with manager.transaction():
+        record = put_script(manager, args.path, content, args.env, args.author,
+                            args.description, create_folders=not args.no_create_folders)
+    write_record(out, record)
+    return 0
+
+
+def cmd_move(manager: ScriptManager, args, out: TextIO) -> int:
+    with manager.transaction():
+        record = move_item(manager, args.source, args.dest)
+    write_record(out, record)
+    return 0
+
+
+def cmd_delete(manager: ScriptManager, args, out: TextIO) -> int:
+    with manager.transaction():
+        records = [delete_item(manager, target, args.recursive) for target in args.targets]
+    for record in records:
+        write_record(out, record)
+    return 0
+
+
+def cmd_export(manager: ScriptManager, args, out: TextIO) -> int:
+    query = parse_query(args.filter) if args.filter else ScriptQuery()
+    if args.folder:
+        query.folder_id = resolve_folder_id(manager, args.folder)
+    manager.get_all_folders()
+    root = os.path.abspath(args.dest)
+    for script in manager.iter_scripts(query):
+        library_path = manager.get_script_path(script)
+        target = os.path.join(root, *library_path.strip("/").split("/"))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8", newline="") as handle:
+            handle.write(script.content)
+        write_record(out, {"id": script.id, "path": library_path, "file": target})
+    return 0
+
+
+BATCH_OPERATIONS = ("put", "move", "delete", "get")
+
+
+def run_batch_operation(manager: ScriptManager, operation: Dict[str, Any]) -> Dict[str, Any]:
+    op = operation.get("op")
+    if op == "put":
+        return put_script(manager, operation["path"], operation.get("content", ""),
+                          operation.get("environment"), operation.get("author"),
+                          operation.get("description"),
+                          create_folders=operation.get("create_folders", True))
+    if op == "move":
+        return move_item(manager, operation["source"], operation["dest"])
+    if op == "delete":
+        return delete_item(manager, operation["path"], operation.get("recursive", False))
+    if op == "get":
+        script = resolve_script(manager, operation["path"])
+        if script is None:
+            raise CliError(f"script not found: {operation['path']}")
+        return script_record(manager, script, content=True)
+    raise CliError(f"unknown op {op!r} (expected one of {', '.join(BATCH_OPERATIONS)})")
+
+
+def cmd_batch(manager: ScriptManager, args, out: TextIO) -> int:
+    """Apply JSON-lines operations from stdin in one transaction (all or nothing)."""
+    stream = open(args.file, encoding="utf-8") if args.file else sys.stdin
+    results: List[Dict[str, Any]] = []
+    try:
+        with manager.transaction():
+            for number, line in enumerate(read_lines(stream), 1):
+                try:
+                    operation = json.loads(line)
+                    result = run_batch_operation(manager, operation)
+                except (ValueError, KeyError, CliError) as e:
+                    detail = f"missing field {e}" if isinstance(e, KeyError) else str(e)
+                    raise CliError(f"line {number}: {detail}; batch rolled back") from e
+                result["op"] = operation.get("op")
+                results.append(result)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    # Only report results once they are committed
+    for result in results:
+        write_record(out, result)
+    return 0
+
+
+def cmd_sync(manager: ScriptManager, args, out: TextIO) -> int:
+    from core.sync import SyncEngine
+    try:
+        engine = SyncEngine.for_directory(manager, args.folder, args.directory, watch=args.watch)
+    except ValueError as e:
+        raise CliError(str(e))
+    try:
+        full = True
+        while True:
+            result = engine.sync(full=full)
+            full = False
+            if result.changed():
+                record = {key: value for key, value in vars(result).items() if value}
+                write_record(out, record)
+                out.flush()
+            if not args.watch:
+                return 0
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        engine.close()
+
+
+def cmd_duplicates(manager: ScriptManager, args, out: TextIO) -> int:
+    from core.duplicates import DuplicateFinder, group_record, script_paths
+    finder = DuplicateFinder(manager.db, threshold=args.threshold, workers=args.workers)
+    report = finder.run()
+    paths = script_paths(manager.db)
+    for group in report.groups:
+        if args.exact and group.kind != "exact":
+            continue
+        write_record(out, group_record(group, paths))
+    print(f"{report.scanned} scripts ({report.fingerprinted} fingerprinted) in "
+          f"{report.elapsed:.1f}s: {len(report.exact_groups())} exact and "
+          f"{len(report.near_groups())} near-duplicate groups, "
+          f"{report.redundant_scripts()} redundant scripts", file=sys.stderr)
+    return 0
+
+
+def cmd_symbols(manager: ScriptManager, args, out: TextIO) -> int:
+    from core.duplicates import script_paths
+    from core.symbols import SymbolIndex, symbol_query
+    index = SymbolIndex(manager.db)
+    indexed = index.refresh()
+    if indexed:
+        print(f"indexed {indexed} scripts", file=sys.stderr)
+    name, kinds = symbol_query(args.name)
+    hits = index.references(name, kinds, args.limit) if args.refs else index.definitions(name)
+    paths = script_paths(manager.db)
+    for hit in hits:
+        record = hit._asdict()
+        record["path"] = paths.get(hit.script_id)
+        write_record(out, record)
+    return 0 if hits else 1
+
+
+def cmd_deps(manager: ScriptManager, args, out: TextIO) -> int:
+    from core.dependencies import DependencyGraph
+    from core.duplicates import script_paths
+    from core.symbols import SymbolIndex
+    script = resolve_script(manager, args.target)
+    if not script:
+        raise CliError(f"script not found: {args.target}")
+    indexed = SymbolIndex(manager.db).refresh()
+    if indexed:
+        print(f"indexed {indexed} scripts", file=sys.stderr)
+    graph = DependencyGraph(manager.db)
+    related = graph.dependents(script.id) if args.dependents else graph.dependencies(script.id)
+    paths = script_paths(manager.db)
+    for dependency in related:
+        record = dependency._asdict()
+        record["path"] = paths.get(dependency.script_id)
+        write_record(out, record)
+    return 0
+
+
+def cmd_backup(manager: ScriptManager, args, out: TextIO) -> int:
+    from core.backup import BackupError, LibraryBackup
+    backup = LibraryBackup(manager.db, args.dir, args.keep, True if args.compress else None)
+    if not args.list and not (args.if_due and not backup.is_due()):
+        try:
+            backup.run()
+        except BackupError as error:
+            raise CliError(str(error))
+    for info in backup.list_backups():
+        write_record(out, {"path": info.path, "size": info.size,
+                           "created": info.created.isoformat(timespec="seconds")})
+    return 0
+
+
+def cmd_maintenance(manager: ScriptManager, args, out: TextIO) -> int:
+    from database.maintenance import LibraryMaintenance
+    maintenance = LibraryMaintenance(manager.db)
+    if args.vacuum:
+        maintenance.vacuum()
+    if not args.report and not (args.if_due and not maintenance.is_due()):
+        result = maintenance.run(args.budget)
+        write_record(out, {"dropped_indexes": result.dropped_indexes,
+                           "freed_pages": result.freed_pages,
+                           "free_pages_left": result.free_pages_left,
+                           "seconds": round(result.seconds, 3)})
+    if args.report:
+        report = maintenance.storage_report()
+        write_record(out, {"page_size": report.page_size, "pages": report.page_count,
+                           "free_pages": report.free_pages, "auto_vacuum": report.auto_vacuum})
+        for entry in report.entries:
+            record = entry._asdict()
+            record["fragmentation"] = round(entry.fragmentation, 3)
+            write_record(out, record)
+    return 0
+
+
+def cmd_config(manager: ScriptManager, args, out: TextIO) -> int:
+    if args.value is not None:
+        manager.db.set_setting(args.key, args.value)
+    write_record(out, {"key": args.key, "value": manager.db.get_setting(args.key)})
+    return 0
+
+
+def cmd_serve(manager: ScriptManager, args, out: TextIO) -> int:
+    from cli.server import serve
+    serve(manager.db, args.host, args.port, args.pool_size, args.quiet)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pslibrary",
+        description="Query and modify the script library without the GUI. "
+                    "Listings are written as JSON lines."
+    )
+    parser.add_argument(
+        "--db", default=os.environ.get("PSLIBRARY_DB", "script_library.db"),
+        help="library database (default: $PSLIBRARY_DB or ./script_library.db)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    list_parser = commands.add_parser("list", help="list scripts, optionally under a folder")
+    list_parser.add_argument("folder", nargs="?", help="folder path, e.g. /Deploy/Web")
+    list_parser.add_argument("--no-recursive", action="store_true",
+                             help="only scripts directly in the folder")
+    list_parser.add_argument("--filter", help='filter expression, e.g. "env:Production modified:week"')
+    list_parser.add_argument("--content", action="store_true", help="include script content")
+    list_parser.add_argument("--all-libraries", action="store_true",
+                             help="also list the mounted libraries (see libraries --mount)")
+    list_parser.set_defaults(handler=cmd_list)
+
+    search_parser = commands.add_parser("search", help="search with the filter syntax")
+    search_parser.add_argument("query", nargs="+", help='e.g. mailbox env:Production author:jsmith')
+    search_parser.add_argument("--limit", type=int)
+    search_parser.add_argument("--content", action="store_true", help="include script content")
+    search_parser.add_argument("--all-libraries", action="store_true",
+                               help="also search the mounted libraries, in one query")
+    search_parser.set_defaults(handler=cmd_search)
+
+    get_parser = commands.add_parser(
+        "get", help="print script content; several targets (or - for stdin) give JSON lines"
+    )
+    get_parser.add_argument("targets", nargs="+", help="script paths or ids (#12)")
+    get_parser.add_argument("--json", action="store_true", help="JSON output for a single target")
+    get_parser.set_defaults(handler=cmd_get)
+
+    put_parser = commands.add_parser("put", help="create or update a script from a file or stdin")
+    put_parser.add_argument("path", help="script path, e.g. /Deploy/Web/Install-Site.ps1")
+    put_parser.add_argument("--file", help="read content from this file instead of stdin")
+    put_parser.add_argument("--env", choices=["Testing", "Production"])
+    put_parser.add_argument("--author")
+    put_parser.add_argument("--description")
+    put_parser.add_argument("--no-create-folders", action="store_true",
+                            help="fail instead of creating missing folders")
+    put_parser.set_defaults(handler=cmd_put)
+
+    move_parser = commands.add_parser("move", help="move a script or folder into another folder")
+    move_parser.add_argument("source", help="script or folder path")
+    move_parser.add_argument("dest", help="destination folder path (/ for the root)")
+    move_parser.set_defaults(handler=cmd_move)
+
+    delete_parser = commands.add_parser("delete", help="delete scripts or folders in one transaction")
+    delete_parser.add_argument("targets", nargs="+", help="script or folder paths")
+    delete_parser.add_argument("-r", "--recursive", action="store_true",
+                               help="delete non-empty folders with everything below them")
+    delete_parser.set_defaults(handler=cmd_delete)
+
+    export_parser = commands.add_parser("export", help="write scripts to a directory tree")
+    export_parser.add_argument("dest", help="output directory")
+    export_parser.add_argument("--folder", help="only export this folder (recursively)")
+    export_parser.add_argument("--filter", help="filter expression")
+    export_parser.set_defaults(handler=cmd_export)
+
+    batch_parser = commands.add_parser(
+        "batch", help="apply JSON-lines operations (put/move/delete/get) in one transaction"
+    )
+    batch_parser.add_argument("--file", help="read operations from this file instead of stdin")
+    batch_parser.set_defaults(handler=cmd_batch)
+
+    sync_parser = commands.add_parser(
+        "sync", help="two-way sync between a library folder and a directory"
+    )
+    sync_parser.add_argument("folder", help="library folder path (/ for the whole library)")
+    sync_parser.add_argument("directory", help="working directory to mirror into")
+    sync_parser.add_argument("--watch", action="store_true",
+                             help="keep running and sync changes from either side")
+    sync_parser.add_argument("--interval", type=float, default=2.0,
+                             help="seconds between passes with --watch")
+    sync_parser.set_defaults(handler=cmd_sync)
+
+    duplicates_parser = commands.add_parser(
+        "duplicates", help="report exact and near-duplicate scripts"
+    )
+    duplicates_parser.add_argument("--threshold", type=float, default=0.8,
+                                   help="minimum estimated similarity for near duplicates")
+    duplicates_parser.add_argument("--workers", type=int,
+                                   help="processes for fingerprinting (default: CPU count)")
+    duplicates_parser.add_argument("--exact", action="store_true",
+                                   help="only report identical content")
+    duplicates_parser.set_defaults(handler=cmd_duplicates)
+
+    symbols_parser = commands.add_parser(
+        "symbols", help="find where a function or batch label is defined, or (--refs) used"
+    )
+    symbols_parser.add_argument(
+        "name", help="e.g. Get-Config or :cleanup; $Name or %%NAME%% for variables with --refs"
+    )
+    symbols_parser.add_argument("--refs", action="store_true",
+                                help="list scripts that call or use the symbol")
+    symbols_parser.add_argument("--limit", type=int)
+    symbols_parser.set_defaults(handler=cmd_symbols)
+
+    deps_parser = commands.add_parser(
+        "deps", help="scripts a script dot-sources, imports or calls, directly or transitively"
+    )
+    deps_parser.add_argument("target", help="script path or id (#12)")
+    deps_parser.add_argument("--dependents", action="store_true",
+                             help="list the scripts that use this one instead")
+    deps_parser.set_defaults(handler=cmd_deps)
+
+    libraries_parser = commands.add_parser(
+        "libraries", help="list, mount or unmount other library files (read-only)"
+    )
+    libraries_group = libraries_parser.add_mutually_exclusive_group()
+    libraries_group.add_argument("--mount", metavar="PATH", help="library file to mount")
+    libraries_group.add_argument("--unmount", metavar="NAME")
+    libraries_parser.add_argument("--name", help="name for --mount (default: the file name)")
+    libraries_parser.set_defaults(handler=cmd_libraries)
+
+    backup_parser = commands.add_parser(
+        "backup", help="back up the library while it is in use, keeping the newest --keep copies"
+    )
+    backup_parser.add_argument("--dir", help="backup directory (default: setting backup_dir, "
+                                             "else backups/ next to the library)")
+    backup_parser.add_argument("--keep", type=int, help="backups to keep (default: setting "
+                                                        "backup_keep, else 7)")
+    backup_parser.add_argument("--compress", action="store_true", help="gzip the backup")
+    backup_parser.add_argument("--if-due", action="store_true",
+                               help="only if backup_interval_hours has passed since the last one")
+    backup_parser.add_argument("--list", action="store_true", help="only list existing backups")
+    backup_parser.set_defaults(handler=cmd_backup)
+
+    maintenance_parser = commands.add_parser(
+        "maintenance", help="refresh planner statistics, reclaim free pages, drop obsolete indexes"
+    )
+    maintenance_parser.add_argument("--report", action="store_true",
+                                    help="only report table/index sizes and fragmentation")
+    maintenance_parser.add_argument("--vacuum", action="store_true",
+                                    help="first rewrite the whole file (locks the library meanwhile)")
+    maintenance_parser.add_argument("--budget", type=float, default=30.0,
+                                    help="seconds to spend reclaiming free pages (default 30)")
+    maintenance_parser.add_argument("--if-due", action="store_true",
+                                    help="only if maintenance_interval_hours has passed")
+    maintenance_parser.set_defaults(handler=cmd_maintenance)
+
+    config_parser = commands.add_parser(
+        "config", help="show or change a setting (e.g. large_file_bytes, large_file_lines)"
+    )
+    config_parser.add_argument("key")
+    config_parser.add_argument("value", nargs="?", help="new value; omit to show the current one")
+    config_parser.set_defaults(handler=cmd_config)
+
+    serve_parser = commands.add_parser("serve", help="serve the library read-only over HTTP/JSON")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--pool-size", type=int, default=8,
+                              help="read-only SQLite connections shared by request threads")
+    serve_parser.add_argument("--quiet", action="store_true", help="do not log requests")
+    serve_parser.set_defaults(handler=cmd_serve)
+
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    manager = ScriptManager(DatabaseManager(args.db))
+    try:
+        return args.handler(manager, args, sys.stdout)
+    except CliError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output piped into head etc.; not an error
+        sys.stderr.close()
+        return 0
@@ -0,0 +1,279 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from database.database import DatabaseManager
+from database.pool import ReadOnlyConnectionPool
+from database.query import ScriptQuery, parse_query
+from core.script_manager import ScriptManager, normalize_path, split_script_path
+
+
+MAX_PER_PAGE = 1000
+
+
+def make_etag(stamp: Tuple[int, str, Optional[str]], representation: str) -> str:
+    """Strong ETag from (id, modified_date, folder path) and the response format."""
+    script_id, modified, folder_path = stamp
+    digest = hashlib.blake2b(f"{script_id}|{modified}|{folder_path}|{representation}".encode(),
+                             digest_size=8).hexdigest()
+    return f'"{digest}"'
+
+
+class ResponseCache:
+    """LRU of encoded script responses keyed by (script id, format).
+
+    An entry is only served while its ETag still matches the current stamp,
+    so a hit costs one small indexed lookup instead of reading content.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[int, str], Tuple[str, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[int, str], etag: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != etag:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Tuple[int, str], etag: str, body: bytes):
+        if len(body) > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous:
+                self._bytes -= len(previous[1])
+            self._entries[key] = (etag, body)
+            self._bytes += len(body)
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+class LibraryServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, db: DatabaseManager, pool_size: int = 8, quiet: bool = False):
+        self.db = db
+        self.quiet = quiet
+        self.pool = ReadOnlyConnectionPool(db.db_path, pool_size)
+        self.cache = ResponseCache()
+        super().__init__(address, LibraryRequestHandler)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.close()
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class LibraryRequestHandler(BaseHTTPRequestHandler):
+    """Read-only JSON API.
+
+    GET /health
+    GET /scripts?q=<filter>&page=&per_page=      listing/search (no content)
+    GET /scripts/<id>[?format=raw]               one script, conditional on ETag
+    GET /paths/<folder>/<name>.<ext>[?format=raw]
+    GET /folders/<folder path>[?recursive=1&page=&per_page=]
+    """
+
+    server: LibraryServer
+    protocol_version = "HTTP/1.1"
+    server_version = "PSLibrary"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        path = unquote(url.path)
+        try:
+            # Each request runs on its own pooled read-only connection and a
+            # fresh ScriptManager, so no cache is shared between threads
+            with self.server.pool.connection() as conn, self.server.db.using_connection(conn):
+                manager = ScriptManager(self.server.db)
+                self.route(manager, path, params)
+        except HttpError as e:
+            self.send_json({"error": str(e)}, e.status)
+        except ValueError as e:
+            self.send_json({"error": str(e)}, HTTPStatus.BAD_REQUEST)
+
+    def route(self, manager: ScriptManager, path: str, params: Dict[str, str]):
+        if path == "/health":
+            self.send_json({"status": "ok"})
+        elif path in ("/scripts", "/scripts/"):
+            self.list_scripts(manager, parse_query(params.get("q", "")), params)
+        elif path.startswith("/scripts/"):
+            script_id = path[len("/scripts/"):].strip("/")
+            if not script_id.isdigit():
+                raise HttpError(HTTPStatus.NOT_FOUND, f"no such script: {script_id}")
+            stamp = manager.db.get_script_stamp(int(script_id))
+            self.send_script(manager, stamp, params)
+        elif path.startswith("/paths/"):
+            folder_path, name, file_type = split_script_path(path[len("/paths"):])
+            folder_id = None
+            if folder_path != "/":
+                folder = manager.get_folder_by_path(folder_path)
+                if folder is None:
+                    raise HttpError(HTTPStatus.NOT_FOUND, f"no such folder: {folder_path}")
+                folder_id = folder.id
+            stamp = manager.db.find_script_stamp(folder_id, name, file_type)
+            self.send_script(manager, stamp, params)
+        elif path == "/folders" or path.startswith("/folders/"):
+            self.list_folder(manager, normalize_path(path[len("/folders"):]), params)
+        else:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"unknown endpoint: {path}")
+
+    # Scripts
+    def send_script(self, manager: ScriptManager, stamp, params: Dict[str, str]):
+        if stamp is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, "script not found")
+        representation = "raw" if params.get("format") == "raw" else "json"
+        etag = make_etag(stamp, representation)
+        if self.etag_matches(etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        key = (stamp[0], representation)
+        body = self.server.cache.get(key, etag)
+        if body is None:
+            script = manager.get_script(stamp[0])
+            if script is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, "script not found")
+            if representation == "raw":
+                body = script.content.encode("utf-8")
+            else:
+                body = self.encode(script_json(manager, script))
+            self.server.cache.put(key, etag, body)
+        content_type = ("text/plain; charset=utf-8" if representation == "raw"
+                        else "application/json")
+        self.send_body(body, content_type, etag)
+
+    def etag_matches(self, etag: str) -> bool:
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        candidates = [value.strip() for value in header.split(",")]
+        return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
+
+    # Listings
+    def list_scripts(self, manager: ScriptManager, query: ScriptQuery,
+                     params: Dict[str, str], extra: Optional[Dict[str, Any]] = None):
+        page = max(1, int(params.get("page", 1)))
+        per_page = max(1, min(MAX_PER_PAGE, int(params.get("per_page", 100))))
+        # One extra row tells us whether there is a next page
+        query.limit = per_page + 1
+        query.offset = (page - 1) * per_page
+        rows = manager.db.query_script_summaries(query)
+        folder_paths = {folder.id: folder.path for folder in manager.get_all_folders()}
+        items = [summary_json(row, folder_paths) for row in rows[:per_page]]
+        response = dict(extra or {})
+        response.update({
+            "items": items,
+            "page": page,
+            "per_page": per_page,
+            "next_page": page + 1 if len(rows) > per_page else None,
+        })
+        self.send_json(response)
+
+    def list_folder(self, manager: ScriptManager, folder_path: str, params: Dict[str, str]):
+        folder = None
+        if folder_path != "/":
+            folder = manager.get_folder_by_path(folder_path)
+            if folder is None:
+                raise HttpError(HTTPStatus.NOT_FOUND, f"no such folder: {folder_path}")
+        recursive = params.get("recursive", "0") not in ("0", "false", "")
+        query = ScriptQuery(text=params.get("q", ""))
+        if folder is not None:
+            query.folder_id = folder.id
+            query.include_subfolders = recursive
+        elif not recursive:
+            query.root_only = True
+        subfolders = [{"id": child.id, "name": child.name, "path": child.path}
+                      for child in manager.get_child_folders(folder.id if folder else None)]
+        extra = {
+            "folder": {"id": folder.id if folder else None, "path": folder_path},
+            "subfolders": subfolders,
+        }
+        self.list_scripts(manager, query, params, extra)
+
+    # Output
+    def encode(self, payload: Any) -> bytes:
+        return json.dumps(payload, ensure_ascii=False).encode("utf-8")
+
+    def send_json(self, payload: Any, status: HTTPStatus = HTTPStatus.OK):
+        self.send_body(self.encode(payload), "application/json", status=status)
+
+    def send_body(self, body: bytes, content_type: str, etag: Optional[str] = None,
+                  status: HTTPStatus = HTTPStatus.OK):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+
+def script_json(manager: ScriptManager, script, content: bool = True) -> Dict[str, Any]:
+    record = {
+        "id": script.id,
+        "path": manager.get_script_path(script),
+        "name": script.name,
+        "folder_id": script.folder_id,
+        "file_type": script.file_type,
+        "environment": script.environment_tag,
+        "author": script.author,
+        "description": script.description,
+        "created": script.created_date.isoformat(timespec="seconds"),
+        "modified": script.modified_date.isoformat(timespec="seconds"),
+    }
+    if content:
+        record["content"] = script.content
+    return record
+
+
+def summary_json(row: Dict[str, Any], folder_paths: Dict[int, str]) -> Dict[str, Any]:
+    prefix = folder_paths.get(row["folder_id"], "")
+    return {
+        "id": row["id"],
+        "path": f"{prefix}/{row['name']}.{row['file_type']}",
+        "name": row["name"],
+        "folder_id": row["folder_id"],
+        "file_type": row["file_type"],
+        "environment": row["environment_tag"],
+        "author": row["author"],
+        "description": row["description"],
+        "created": datetime.fromisoformat(row["created_date"]).isoformat(timespec="seconds"),
+        "modified": datetime.fromisoformat(row["modified_date"]).isoformat(timespec="seconds"),
+    }
+
+
+def serve(db: DatabaseManager, host: str = "127.0.0.1", port: int = 8765,
+          pool_size: int = 8, quiet: bool = False):
+    server = LibraryServer((host, port), db, pool_size, quiet)
+    print(f"Serving {db.db_path} on http://{host}:{server.server_address[1]}/", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,200 @@
+"""
+Online backups of the library file, safe to take while it is in use.
+
+sqlite3's backup API copies the database a few pages per step, and the
+source is unlocked between steps, so saves from the GUI (or anyone sharing
+the file) wait at most one short step instead of the whole copy. A commit
+from another connection between steps makes SQLite restart the copy; a
+backup that keeps getting overtaken finishes with one locked pass rather
+than running forever.
+
+Copies are written under a temporary name and renamed into place once
+complete (gzip-compressed first if asked), and only the newest `keep`
+backups are kept.
+"""
+
+import gzip
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, List, NamedTuple, Optional
+from database.database import DatabaseManager
+from core.tracing import tracer
+
+
+# Pages copied per step (4 MB at the default page size) and the pause between steps
+BACKUP_STEP_PAGES = 1024
+BACKUP_STEP_SLEEP = 0.005
+
+# Restarts (writes from other connections mid-copy) before a locked single pass
+MAX_RESTARTS = 3
+
+DEFAULT_KEEP = 7
+
+_STAMP_FORMAT = "%Y%m%d-%H%M%S"
+_PARTIAL_SUFFIX = ".partial"
+
+
+class BackupInfo(NamedTuple):
+    path: str
+    size: int
+    created: datetime
+
+
+class BackupError(Exception):
+    pass
+
+
+class _Overtaken(Exception):
+    pass
+
+
+class LibraryBackup:
+    """Backups of one library into a directory, with rotation.
+
+    Anything not given is read from the library's settings: backup_dir
+    (default: a backups folder next to the library), backup_keep and
+    backup_compress ("1" to gzip). backup_interval_hours schedules them
+    (see is_due); 0 or unset means only on demand.
+    """
+
+    def __init__(self, db: DatabaseManager, directory: Optional[str] = None,
+                 keep: Optional[int] = None, compress: Optional[bool] = None):
+        self.db = db
+        library_dir = os.path.dirname(os.path.abspath(db.db_path))
+        self.directory = directory or db.get_setting("backup_dir") or \
+            os.path.join(library_dir, "backups")
+        self.keep = keep if keep is not None else int(db.get_setting("backup_keep", str(DEFAULT_KEEP)))
+        self.compress = compress if compress is not None else db.get_setting("backup_compress") == "1"
+        self.stem = os.path.splitext(os.path.basename(db.db_path))[0]
+        self._lock = threading.Lock()
+
+    # Schedule
+    def interval(self) -> Optional[timedelta]:
+        hours = float(self.db.get_setting("backup_interval_hours", "0") or 0)
+        return timedelta(hours=hours) if hours > 0 else None
+
+    def last_backup(self) -> Optional[datetime]:
+        value = self.db.get_setting("backup_last")
+        return datetime.fromisoformat(value) if value else None
+
+    def is_due(self, now: Optional[datetime] = None) -> bool:
+        interval = self.interval()
+        if interval is None:
+            return False
+        last = self.last_backup()
+        return last is None or (now or datetime.now()) - last >= interval
+
+    # Backups
+    @tracer.traced(category="core")
+    def run(self, progress: Optional[Callable[[int, int], None]] = None) -> BackupInfo:
+        """Take a backup now; progress(copied_pages, total_pages) is called per step."""
+        if not self._lock.acquire(blocking=False):
+            raise BackupError("a backup is already running")
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            self._remove_partial()
+            created = datetime.now().replace(microsecond=0)
+            name = f"{self.stem}-{created.strftime(_STAMP_FORMAT)}.db"
+            path = os.path.join(self.directory, name + (".gz" if self.compress else ""))
+            partial = os.path.join(self.directory, name + _PARTIAL_SUFFIX)
+            try:
+                self._copy(partial, progress)
+                if self.compress:
+                    with open(partial, "rb") as source, gzip.open(path + _PARTIAL_SUFFIX, "wb") as target:
+                        shutil.copyfileobj(source, target, 1024 * 1024)
+                    os.remove(partial)
+                    partial = path + _PARTIAL_SUFFIX
+                os.replace(partial, path)
+            except (OSError, sqlite3.Error) as error:
+                if os.path.exists(partial):
+                    os.remove(partial)
+                raise BackupError(f"backup failed: {error}")
+            self.db.set_setting("backup_last", created.isoformat())
+            self._rotate()
+            return BackupInfo(path, os.path.getsize(path), created)
+        finally:
+            self._lock.release()
+
+    def run_async(self, done: Optional[Callable[[Optional[BackupInfo], Optional[str]], None]] = None
+                  ) -> threading.Thread:
+        """Run on a worker thread; done(info, error) is called there when it ends."""
+        def work():
+            try:
+                info = self.run()
+            except BackupError as error:
+                if done:
+                    done(None, str(error))
+                return
+            if done:
+                done(info, None)
+        thread = threading.Thread(target=work, name="library-backup", daemon=True)
+        thread.start()
+        return thread
+
+    def _copy(self, target_path: str, progress: Optional[Callable[[int, int], None]]):
+        restarts = 0
+        previous = None
+
+        def step(status, remaining, total):
+            nonlocal restarts, previous
+            if previous is not None and remaining > previous:
+                # Another connection wrote to the library; SQLite started over
+                restarts += 1
+                if restarts > MAX_RESTARTS:
+                    raise _Overtaken()
+            previous = remaining
+            if progress:
+                progress(total - remaining, total)
+            time.sleep(BACKUP_STEP_SLEEP)
+
+        source = sqlite3.connect(self.db.db_path)
+        try:
+            target = sqlite3.connect(target_path)
+            try:
+                try:
+                    source.backup(target, pages=BACKUP_STEP_PAGES, progress=step)
+                except _Overtaken:
+                    # Busy library: one pass holding the read lock throughout
+                    source.backup(target, pages=-1)
+            finally:
+                target.close()
+        finally:
+            source.close()
+
+    def _remove_partial(self):
+        # Left behind by a backup that was interrupted (e.g. the app closed)
+        for name in os.listdir(self.directory):
+            if name.startswith(self.stem + "-") and name.endswith(_PARTIAL_SUFFIX):
+                os.remove(os.path.join(self.directory, name))
+
+    def list_backups(self) -> List[BackupInfo]:
+        """This library's backups, newest first."""
+        backups = []
+        if not os.path.isdir(self.directory):
+            return backups
+        for name in os.listdir(self.directory):
+            if not name.startswith(self.stem + "-"):
+                continue
+            stamp = name[len(self.stem) + 1:]
+            for suffix in (".db.gz", ".db"):
+                if stamp.endswith(suffix):
+                    stamp = stamp[:-len(suffix)]
+                    break
+            else:
+                continue
+            try:
+                created = datetime.strptime(stamp, _STAMP_FORMAT)
+            except ValueError:
+                continue
+            path = os.path.join(self.directory, name)
+            backups.append(BackupInfo(path, os.path.getsize(path), created))
+        backups.sort(key=lambda backup: backup.created, reverse=True)
+        return backups
+
+    def _rotate(self):
+        for backup in self.list_backups()[max(self.keep, 1):]:
+            os.remove(backup.path)
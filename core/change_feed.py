@@ -0,0 +1,70 @@
+"""
+Change feed: picks up edits other clients commit to a shared library.
+
+Triggers append every script/folder insert, update and delete to change_log
+(see the schema in database/database.py). A ChangeFeed remembers the last
+sequence number it has seen and returns only the entries after it, so
+catching up costs what changed, not what the library holds.
+
+Polling is cheap when nothing happened: PRAGMA data_version on a connection
+the feed keeps open only changes when another connection commits, so most
+polls never touch the change log.
+"""
+
+import sqlite3
+from typing import List, NamedTuple, Optional
+from database.database import DatabaseManager
+from core.tracing import tracer
+
+
+class Change(NamedTuple):
+    item_type: str      # "script" or "folder"
+    item_id: int
+    action: str         # "insert", "update" or "delete" (last one wins)
+    created: bool       # inserted since the last poll
+
+
+class ChangeFeed:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self.last_seq = db.get_latest_change_seq()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._data_version: Optional[int] = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _changed_elsewhere(self) -> bool:
+        if self._conn is None:
+            # data_version is per connection, so this one stays open
+            self._conn = sqlite3.connect(self.db.db_path, check_same_thread=False)
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    @tracer.traced(category="core")
+    def poll(self) -> Optional[List[Change]]:
+        """Changes committed since the last poll, one per item.
+
+        Returns None if entries this feed has not seen were already pruned
+        from the log; the caller has to reload everything then.
+        """
+        if not self._changed_elsewhere():
+            return []
+        oldest, rows = self.db.get_changes_since(self.last_seq)
+        if not rows:
+            return []
+        if oldest is not None and oldest > self.last_seq + 1:
+            self.last_seq = rows[-1][0]
+            return None
+        self.last_seq = rows[-1][0]
+        # Fold each item's entries into one: its final state is what matters
+        changes = {}
+        for _, item_type, item_id, action in rows:
+            key = (item_type, item_id)
+            created = action == "insert" or (key in changes and changes[key].created)
+            changes[key] = Change(item_type, item_id, action, created)
+        return list(changes.values())
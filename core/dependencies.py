@@ -0,0 +1,175 @@
+"""
+Script-to-script dependencies: dot-sourcing, & / direct invocation and
+Import-Module in PowerShell, CALL and direct invocation in batch files.
+
+References are extracted with the symbol index (see core/symbols.py) and
+stored as written, in script_references. Resolving them to library scripts
+depends on names and folder paths elsewhere in the library, so resolved
+edges are a per-script cache in script_dependencies: triggers drop a
+script's cached edges when its references change, when it moves, and when a
+script with a name it refers to is created, renamed, moved or deleted.
+DependencyGraph resolves whatever is stale before answering, and transitive
+queries are recursive CTEs over the edge table.
+"""
+
+import posixpath
+import re
+from collections import defaultdict
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from database.database import DatabaseManager
+from core.tracing import tracer
+
+
+class Reference(NamedTuple):
+    kind: str                   # "dot_source", "call" or "module"
+    target_name: str            # lower-cased file name without extension
+    target_type: Optional[str]  # "ps1" or "bat"; None matches any type
+    target_dir: Optional[str]   # relative folder ("", "../lib"); None when unknown
+    line: int
+
+
+class Dependency(NamedTuple):
+    script_id: int
+    direct: bool
+
+
+_PS_DOT_SOURCE = re.compile(r"^[ \t]*\.[ \t]+(?P<path>\"[^\"\n]+\"|'[^'\n]+'|[^\s;|]+)",
+                            re.MULTILINE)
+_PS_INVOKE = re.compile(r"^[ \t]*(?:&[ \t]*)?(?P<path>(?:\"[^\"\n]+\.ps1\"|'[^'\n]+\.ps1'"
+                        r"|(?:\.{1,2}|\$PSScriptRoot)[\\/][^\s;|]+\.ps1))",
+                        re.MULTILINE | re.IGNORECASE)
+_PS_MODULE = re.compile(r"\b(?:Import-Module(?:[ \t]+-Name)?|using[ \t]+module)[ \t]+"
+                        r"(?P<path>\"[^\"\n]+\"|'[^'\n]+'|[^\s;|,]+)", re.IGNORECASE)
+_PS_FILE = re.compile(r"-File[ \t]+(?P<path>\"[^\"\n]+\"|'[^'\n]+'|[^\s;|&]+)", re.IGNORECASE)
+_PS_COMMENT = re.compile(r"<#.*?#>|#[^\n]*", re.DOTALL)
+_NOT_NEWLINE = re.compile(r"[^\n]")
+
+_BAT_CALL = re.compile(r"^[ \t@]*(?:call[ \t]+)?(?P<path>\"[^\"\n]+\.(?:bat|cmd)\"|"
+                       r"[^\s\"&|<>]+\.(?:bat|cmd))(?=[\s&|]|$)",
+                       re.MULTILINE | re.IGNORECASE)
+_BAT_REM = re.compile(r"^[ \t@]*(?:rem\b|::)[^\n]*", re.MULTILINE | re.IGNORECASE)
+
+# Prefixes meaning "the folder of the calling script"
+_SCRIPT_DIR_PREFIXES = ("$psscriptroot/", "%~dp0", "%~dp0/")
+
+
+def _reference(kind: str, path: str, line: int, module: bool = False) -> Optional[Reference]:
+    path = path.strip("\"'").replace("\\", "/")
+    lowered = path.lower()
+    for prefix in _SCRIPT_DIR_PREFIXES:
+        if lowered.startswith(prefix):
+            path = "./" + path[len(prefix):].lstrip("/")
+            break
+    directory, _, filename = path.rpartition("/")
+    stem, dot, extension = filename.rpartition(".")
+    if not dot:
+        stem, extension = filename, ""
+    extension = extension.lower()
+    if not stem or any(char in stem for char in "$%*?"):
+        return None
+    if module:
+        # Modules load by name (or .psm1 path); match any script with that name
+        target_type = None
+    elif extension in ("ps1", "bat"):
+        target_type = extension
+    elif extension == "cmd":
+        target_type = "bat"
+    else:
+        return None
+    if "$" in directory or "%" in directory or ":" in directory or path.startswith("/"):
+        target_dir = None       # variable or absolute location: match by name
+    elif module and not directory:
+        target_dir = None       # searched in $env:PSModulePath
+    else:
+        target_dir = "" if directory in ("", ".") else directory
+    return Reference(kind, stem.lower(), target_type, target_dir, line)
+
+
+def extract_references(content: str, file_type: str) -> List[Reference]:
+    """References from one script to other scripts, one per (kind, target)."""
+    # Blank out comments with same-length text so offsets keep their lines
+    lowered = content.lower()
+    if file_type == "bat":
+        code = _BAT_REM.sub(lambda match: " " * len(match.group()), content)
+        patterns = [("call", _BAT_CALL, False, (".bat", ".cmd")),
+                    ("call", _PS_FILE, False, ("-file",))]
+    else:
+        code = _PS_COMMENT.sub(lambda match: _NOT_NEWLINE.sub(" ", match.group()), content) \
+            if "#" in content else content
+        patterns = [("dot_source", _PS_DOT_SOURCE, False, (". ", ".\t")),
+                    ("call", _PS_INVOKE, False, (".ps1",)),
+                    ("call", _PS_FILE, False, ("-file",)),
+                    ("module", _PS_MODULE, True, ("import-module", "using"))]
+    found: Dict[Tuple, Reference] = {}
+    for kind, pattern, module, needles in patterns:
+        # Substring checks first: most scripts use few of these forms
+        if not any(needle in lowered for needle in needles):
+            continue
+        for match in pattern.finditer(code):
+            offset = match.start("path")
+            reference = _reference(kind, match.group("path"), code.count("\n", 0, offset) + 1,
+                                   module)
+            if reference:
+                found.setdefault(reference[:4], reference)
+    return list(found.values())
+
+
+class DependencyGraph:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+
+    @tracer.traced(category="core")
+    def resolve_pending(self) -> int:
+        """Resolve the references of scripts whose cached edges were dropped."""
+        stale = self.db.get_unresolved_dependency_script_ids()
+        if not stale:
+            return 0
+        references: Dict[int, List[Tuple]] = defaultdict(list)
+        for script_id, name, target_type, target_dir in self.db.get_script_references(stale):
+            references[script_id].append((name, target_type, target_dir))
+        names = {reference[0] for refs in references.values() for reference in refs}
+        candidates: Dict[str, List[Tuple[int, str, Optional[int]]]] = defaultdict(list)
+        for script_id, name, file_type, folder_id in self.db.get_scripts_by_names(names):
+            candidates[name.lower()].append((script_id, file_type, folder_id))
+        folder_paths = {folder.id: folder.path for folder in self.db.get_all_folders()}
+        own_folders = dict(self.db.get_script_folder_ids(list(references)))
+
+        edges = []
+        for script_id in stale:
+            folder_id = own_folders.get(script_id)
+            targets: Set[int] = set()
+            for name, target_type, target_dir in references.get(script_id, ()):
+                matches = [candidate for candidate in candidates.get(name, ())
+                           if target_type is None or candidate[1] == target_type]
+                targets.update(self._pick(matches, folder_id, target_dir, folder_paths))
+            targets.discard(script_id)
+            edges.append((script_id, sorted(targets)))
+        self.db.save_script_dependencies(edges)
+        return len(stale)
+
+    def _pick(self, matches: List[Tuple[int, str, Optional[int]]], folder_id: Optional[int],
+              target_dir: Optional[str], folder_paths: Dict[int, str]) -> List[int]:
+        if len(matches) <= 1:
+            return [match[0] for match in matches]
+        if target_dir is not None:
+            # Relative path: the folder it points at, from the caller's folder
+            base = folder_paths.get(folder_id, "") or "/"
+            wanted = posixpath.normpath(posixpath.join(base, target_dir))
+            exact = [match[0] for match in matches
+                     if (folder_paths.get(match[2], "") or "/") == wanted]
+            if exact:
+                return exact
+        # Same folder first; otherwise every candidate, so impact analysis
+        # errs on the side of listing too much
+        local = [match[0] for match in matches if match[2] == folder_id]
+        return local or [match[0] for match in matches]
+
+    def dependencies(self, script_id: int) -> List[Dependency]:
+        """Scripts this one uses, directly or through other scripts."""
+        self.resolve_pending()
+        return [Dependency(*row) for row in self.db.get_dependency_closure(script_id)]
+
+    def dependents(self, script_id: int) -> List[Dependency]:
+        """Scripts that use this one, directly or through other scripts."""
+        self.resolve_pending()
+        return [Dependency(*row) for row in self.db.get_dependency_closure(script_id, reverse=True)]
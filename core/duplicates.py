@@ -0,0 +1,249 @@
+"""
+Exact and near-duplicate detection over script content.
+
+Exact duplicates share a SHA-256 content hash. Near duplicates are found
+with MinHash over 5-word shingles (one-permutation hashing: each shingle
+hash falls into one of NUM_BINS bins and each bin keeps its minimum) and
+LSH banding, so only scripts that agree on a whole band are compared.
+
+Fingerprints are computed in a process pool and cached in the
+script_fingerprints table; a cached row is reused while the script's
+modified_date is unchanged.
+"""
+
+import hashlib
+import operator
+import os
+import re
+import time
+import zlib
+from array import array
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+from database.database import DatabaseManager
+from core.tracing import tracer
+from core.workers import run_chunked
+
+
+NUM_BINS = 128
+BANDS = 32                  # 4 bins per band
+SHINGLE_SIZE = 5            # words per shingle
+EMPTY_BIN = 0xFFFFFFFF
+SIGNATURE_BYTES = NUM_BINS * 4
+EMPTY_DIGEST = hashlib.sha256(b"").hexdigest()
+
+CHUNK_SIZE = 500
+BUCKET_WINDOW = 16
+
+_WORD = re.compile(r"\w+")
+
+
+def fingerprint(content: str) -> Tuple[str, bytes]:
+    """(sha256 hex digest, MinHash signature) of one script."""
+    digest = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    words = _WORD.findall(content.lower())
+    if len(words) <= SHINGLE_SIZE:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + SHINGLE_SIZE])
+                    for i in range(len(words) - SHINGLE_SIZE + 1)}
+    bins = [EMPTY_BIN] * NUM_BINS
+    for shingle in shingles:
+        # Multiplicative mixing so the high bits pick the bin
+        value = (zlib.crc32(shingle.encode("utf-8")) * 0x9E3779B1) & 0xFFFFFFFF
+        index = value >> 25
+        value &= 0x1FFFFFF
+        if value < bins[index]:
+            bins[index] = value
+    return digest, array("I", bins).tobytes()
+
+
+def _decode(signature: bytes) -> Tuple[array, int]:
+    """Signature values plus a bitmask of its empty bins."""
+    values = array("I", signature)
+    empty = 0
+    for index, value in enumerate(values):
+        if value == EMPTY_BIN:
+            empty |= 1 << index
+    return values, empty
+
+
+def _similarity(first: Tuple[array, int], second: Tuple[array, int]) -> float:
+    # Bins empty on both sides carry no information
+    both_empty = bin(first[1] & second[1]).count("1")
+    used = NUM_BINS - both_empty
+    if not used:
+        return 0.0
+    return (sum(map(operator.eq, first[0], second[0])) - both_empty) / used
+
+
+def similarity(first: bytes, second: bytes) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return _similarity(_decode(first), _decode(second))
+
+
+def _fingerprint_chunk(items: List[Tuple[int, str, str]]) -> List[Tuple[int, str, str, bytes]]:
+    return [(script_id, modified, *fingerprint(content))
+            for script_id, modified, content in items]
+
+
+@dataclass
+class DuplicateGroup:
+    kind: str                   # "exact" or "near"
+    script_ids: List[int]
+    similarity: float           # 1.0 for exact; weakest link of a near cluster
+
+
+@dataclass
+class DuplicateReport:
+    groups: List[DuplicateGroup] = field(default_factory=list)
+    scanned: int = 0
+    fingerprinted: int = 0      # recomputed this run (the rest came from the cache)
+    elapsed: float = 0.0
+
+    def exact_groups(self) -> List[DuplicateGroup]:
+        return [group for group in self.groups if group.kind == "exact"]
+
+    def near_groups(self) -> List[DuplicateGroup]:
+        return [group for group in self.groups if group.kind == "near"]
+
+    def redundant_scripts(self) -> int:
+        """Scripts that could go if each group kept one copy.
+
+        Exact groups inside a near-duplicate cluster are counted with it.
+        """
+        in_near = {script_id for group in self.near_groups() for script_id in group.script_ids}
+        return sum(len(group.script_ids) - 1 for group in self.groups
+                   if group.kind == "near" or group.script_ids[0] not in in_near)
+
+
+class DuplicateFinder:
+    def __init__(self, db: DatabaseManager, threshold: float = 0.8,
+                 workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.db = db
+        self.threshold = threshold
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.progress = progress
+
+    @tracer.traced(category="core")
+    def run(self) -> DuplicateReport:
+        start = time.perf_counter()
+        report = DuplicateReport()
+        fingerprints = self.update_fingerprints(report)
+        report.scanned = len(fingerprints)
+
+        # Exact duplicates: same content hash
+        by_digest: Dict[str, List[int]] = defaultdict(list)
+        for script_id, (digest, _) in fingerprints.items():
+            if digest != EMPTY_DIGEST:
+                by_digest[digest].append(script_id)
+        for script_ids in by_digest.values():
+            if len(script_ids) > 1:
+                report.groups.append(DuplicateGroup("exact", sorted(script_ids), 1.0))
+
+        # Near duplicates: LSH over one representative per distinct content
+        signatures = {script_ids[0]: fingerprints[script_ids[0]][1]
+                      for script_ids in by_digest.values()}
+        members = {script_ids[0]: script_ids for script_ids in by_digest.values()}
+        for cluster, weakest in self._near_clusters(signatures):
+            script_ids = sorted(i for rep in cluster for i in members[rep])
+            report.groups.append(DuplicateGroup("near", script_ids, weakest))
+
+        report.groups.sort(key=lambda group: (-len(group.script_ids), -group.similarity))
+        report.elapsed = time.perf_counter() - start
+        return report
+
+    def update_fingerprints(self, report: DuplicateReport) -> Dict[int, Tuple[str, bytes]]:
+        """Refresh stale cache rows and return script id -> (digest, signature)."""
+        cached = self.db.get_script_fingerprints()
+        current: Dict[int, Tuple[str, bytes]] = {}
+        stale: List[int] = []
+        for script_id, modified in self.db.get_script_modified_dates():
+            entry = cached.get(script_id)
+            if entry and entry[0] == modified and len(entry[2]) == SIGNATURE_BYTES:
+                current[script_id] = (entry[1], entry[2])
+            else:
+                stale.append(script_id)
+
+        done = 0
+        for rows in self._compute(stale):
+            self.db.save_script_fingerprints(rows)
+            for script_id, _, digest, signature in rows:
+                current[script_id] = (digest, signature)
+            done += len(rows)
+            if self.progress:
+                self.progress(done, len(stale))
+        report.fingerprinted = len(stale)
+        return current
+
+    def _chunks(self, script_ids: List[int]) -> Iterator[List[Tuple[int, str, str]]]:
+        for i in range(0, len(script_ids), CHUNK_SIZE):
+            yield self.db.get_script_contents(script_ids[i:i + CHUNK_SIZE])
+
+    def _compute(self, stale: List[int]) -> Iterator[List[Tuple[int, str, str, bytes]]]:
+        return run_chunked(_fingerprint_chunk, self._chunks(stale), self.workers, len(stale))
+
+    def _near_clusters(self, signatures: Dict[int, bytes]) -> List[Tuple[List[int], float]]:
+        band_bytes = SIGNATURE_BYTES // BANDS
+        empty_band = array("I", [EMPTY_BIN] * (NUM_BINS // BANDS)).tobytes()
+        buckets: Dict[Tuple[int, bytes], List[int]] = defaultdict(list)
+        for script_id, signature in signatures.items():
+            for band in range(BANDS):
+                key = signature[band * band_bytes:(band + 1) * band_bytes]
+                if key != empty_band:
+                    buckets[(band, key)].append(script_id)
+
+        # Union-find; pairs already in one cluster are not compared again,
+        # and neither are pairs that met in another band and were rejected
+        decoded = {script_id: _decode(signature) for script_id, signature in signatures.items()}
+        rejected: Set[Tuple[int, int]] = set()
+        parent: Dict[int, int] = {}
+        weakest: Dict[int, float] = {}
+
+        def find(item: int) -> int:
+            root = item
+            while parent.get(root, root) != root:
+                root = parent[root]
+            while item != root:
+                parent[item], item = root, parent.get(item, item)
+            return root
+
+        for bucket in buckets.values():
+            # Compare with a window of earlier bucket members, so a huge bucket
+            # of boilerplate stays linear once its members share a cluster
+            for position in range(1, len(bucket)):
+                item = bucket[position]
+                for other in bucket[max(0, position - BUCKET_WINDOW):position]:
+                    a, b = find(other), find(item)
+                    if a == b or (other, item) in rejected:
+                        continue
+                    score = _similarity(decoded[other], decoded[item])
+                    if score < self.threshold:
+                        rejected.add((other, item))
+                        continue
+                    parent[b] = a
+                    weakest[a] = min(score, weakest.get(a, 1.0), weakest.get(b, 1.0))
+
+        clusters: Dict[int, List[int]] = defaultdict(list)
+        for item in parent:
+            clusters[find(item)].append(item)
+        return [(sorted(set(items) | {root}), weakest.get(root, 1.0))
+                for root, items in clusters.items()]
+
+
+def script_paths(db: DatabaseManager) -> Dict[int, str]:
+    """Library path of every script, for labelling report entries."""
+    folders = {folder.id: folder.path for folder in db.get_all_folders()}
+    return {script_id: f"{folders.get(folder_id, '')}/{name}.{file_type}"
+            for script_id, name, file_type, folder_id in db.get_script_names()}
+
+
+def group_record(group: DuplicateGroup, paths: Dict[int, str]) -> Dict[str, Any]:
+    return {
+        "kind": group.kind,
+        "similarity": round(group.similarity, 3),
+        "scripts": [{"id": script_id, "path": paths.get(script_id)}
+                    for script_id in group.script_ids],
+    }
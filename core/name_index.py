@@ -0,0 +1,244 @@
+import heapq
+import re
+import threading
+from itertools import chain
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from database.models import Script, Folder
+from core.tracing import tracer
+
+
+class NameMatch(NamedTuple):
+    score: int
+    kind: str  # "script" or "folder"
+    item_id: int
+    label: str
+    detail: str
+
+
+# Characters after which a match counts as the start of a word
+_BOUNDARY_CHARS = frozenset(" /\\_-.")
+
+
+# Bit positions set in each byte value, for walking candidate masks
+_BYTE_BITS = [tuple(bit for bit in range(8) if value >> bit & 1) for value in range(256)]
+
+
+class NameIndex:
+    """In-memory fuzzy index of script names and folder paths.
+
+    Each entry's lower-cased label is stored alongside a bitmask per
+    character recording which entries contain it. A query intersects the
+    masks of its characters, then verifies the surviving candidates in index
+    order - shortest labels first - stopping once enough matches are found.
+    Updates append a new entry and tombstone the old one, so keeping the
+    index current never needs a full rebuild.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._scripts: Dict[int, Tuple[str, Optional[int]]] = {}
+        self._folders: Dict[int, str] = {}
+        self._clear_entries()
+        self._building = False
+        self._pending: List[Tuple[str, Any]] = []
+        self.ready = threading.Event()
+
+    def _clear_entries(self):
+        self._entries: List[Optional[Tuple[str, int, str]]] = []
+        self._lowered: List[str] = []
+        self._masks: Dict[str, int] = {}
+        self._sorted_count = 0
+        self._live: Dict[Tuple[str, int], int] = {}
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # Building
+    @tracer.traced(category="core")
+    def build(self, script_manager):
+        with self._lock:
+            self._building = True
+            self._pending = []
+
+        # Read outside the lock; events arriving meanwhile are queued
+        folders = script_manager.db.get_all_folders()
+        script_rows = script_manager.db.get_script_names()
+
+        with self._lock:
+            self._folders = {folder.id: folder.path for folder in folders}
+            self._scripts = {
+                script_id: (f"{name}.{file_type}", folder_id)
+                for script_id, name, file_type, folder_id in script_rows
+            }
+            self._rebuild()
+            pending, self._pending = self._pending, []
+            self._building = False
+            for event, item in pending:
+                self._apply(event, item)
+        self.ready.set()
+
+    def build_async(self, script_manager) -> threading.Thread:
+        thread = threading.Thread(
+            target=self.build, args=(script_manager,),
+            name="name-index-build", daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _rebuild(self):
+        labels = [("folder", folder_id, path) for folder_id, path in self._folders.items()]
+        labels.extend(
+            ("script", script_id, label) for script_id, (label, _) in self._scripts.items()
+        )
+        # Short labels first, so early-terminated queries favour tight matches
+        labels.sort(key=lambda entry: len(entry[2]))
+
+        self._clear_entries()
+        bitmaps: Dict[str, bytearray] = {}
+        size = len(labels) // 8 + 1
+        for index, (kind, item_id, label) in enumerate(labels):
+            lowered = label.lower()
+            self._live[(kind, item_id)] = index
+            self._entries.append((kind, item_id, label))
+            self._lowered.append(lowered)
+            for ch in set(lowered):
+                bitmap = bitmaps.get(ch)
+                if bitmap is None:
+                    bitmap = bitmaps[ch] = bytearray(size)
+                bitmap[index >> 3] |= 1 << (index & 7)
+        self._masks = {ch: int.from_bytes(bitmap, "little") for ch, bitmap in bitmaps.items()}
+        self._sorted_count = len(labels)
+
+    def _append(self, kind: str, item_id: int, label: str):
+        self._remove(kind, item_id)
+        index = len(self._entries)
+        lowered = label.lower()
+        self._live[(kind, item_id)] = index
+        self._entries.append((kind, item_id, label))
+        self._lowered.append(lowered)
+        bit = 1 << index
+        for ch in set(lowered):
+            self._masks[ch] = self._masks.get(ch, 0) | bit
+
+    def _remove(self, kind: str, item_id: int):
+        previous = self._live.pop((kind, item_id), None)
+        if previous is not None:
+            self._entries[previous] = None
+            self._dead += 1
+
+    # Incremental updates
+    def handle_event(self, event: str, item: Any):
+        """Listener for ScriptManager change events."""
+        with self._lock:
+            if self._building:
+                self._pending.append((event, item))
+                return
+            self._apply(event, item)
+
+    def _apply(self, event: str, item: Any):
+        if event in ("script_created", "script_updated") and isinstance(item, Script):
+            label = f"{item.name}.{item.file_type}"
+            self._scripts[item.id] = (label, item.folder_id)
+            self._append("script", item.id, label)
+        elif event == "script_deleted":
+            self._scripts.pop(item, None)
+            self._remove("script", item)
+        elif event in ("folder_created", "folder_updated") and isinstance(item, Folder):
+            self._folders[item.id] = item.path
+            self._append("folder", item.id, item.path)
+        elif event == "folder_deleted":
+            self._folders.pop(item, None)
+            self._remove("folder", item)
+
+        if self._dead > max(1024, len(self._live) // 4):
+            self._rebuild()
+
+    # Querying
+    @tracer.traced(category="core")
+    def search(self, query: str, limit: int = 50) -> List[NameMatch]:
+        needle = "".join(query.lower().split())
+        if not needle:
+            return []
+        # Negated classes keep the subsequence match free of backtracking
+        pattern = re.compile(re.escape(needle[0]) + "".join(
+            f"[^{re.escape(ch)}]*{re.escape(ch)}" for ch in needle[1:]
+        ))
+
+        with self._lock:
+            entries = self._entries
+            lowered = self._lowered
+            folders = self._folders
+            scripts = self._scripts
+            sorted_count = self._sorted_count
+            candidates = -1
+            for ch in set(needle):
+                candidates &= self._masks.get(ch, 0)
+        candidates = max(candidates, 0)
+
+        # Entries changed since the last rebuild are unsorted; visit them
+        # first so recently created or renamed items are never crowded out
+        recent = (sorted_count + index for index in _bit_indices(candidates >> sorted_count))
+        older = _bit_indices(candidates & ((1 << sorted_count) - 1))
+
+        scored = []
+        wanted = limit * 4
+        for index in chain(recent, older):
+            entry = entries[index]
+            if entry is None or not pattern.search(lowered[index]):
+                continue
+            positions = _match_positions(lowered[index], needle)
+            scored.append((self._score(positions, entry), index))
+            if len(scored) >= wanted:
+                break
+
+        results = []
+        for score, index in heapq.nlargest(limit, scored):
+            kind, item_id, label = entries[index]
+            if kind == "script":
+                folder_id = scripts.get(item_id, ("", None))[1]
+                detail = folders.get(folder_id, "/") if folder_id is not None else "/"
+            else:
+                detail = ""
+            results.append(NameMatch(score, kind, item_id, label, detail))
+        return results
+
+    @staticmethod
+    def _score(positions: List[int], entry: Tuple[str, int, str]) -> int:
+        label = entry[2]
+        first = positions[0]
+
+        # Prefer compact matches that start early in short labels
+        score = 100 - (positions[-1] - first) - min(first, 20) - len(label) // 8
+        previous = -2
+        for pos in positions:
+            if pos == previous + 1:
+                score += 8
+            if pos == 0 or label[pos - 1:pos] in _BOUNDARY_CHARS:
+                score += 10
+            elif label[pos:pos + 1].isupper() and label[pos - 1:pos].islower():
+                score += 6
+            previous = pos
+
+        # For folders, prefer hits in the last path component
+        if entry[0] == "folder" and first > label.rfind("/"):
+            score += 15
+        return score
+
+
+def _match_positions(line: str, needle: str) -> List[int]:
+    """Greedy leftmost positions of an already verified subsequence match."""
+    positions = []
+    pos = -1
+    for ch in needle:
+        pos = line.find(ch, pos + 1)
+        positions.append(pos)
+    return positions
+
+
+def _bit_indices(mask: int):
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    for match in re.finditer(b"[^\x00]", data):
+        base = match.start() * 8
+        for bit in _BYTE_BITS[data[base >> 3]]:
+            yield base + bit
\ No newline at end of file
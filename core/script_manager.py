@@ -1,6 +1,14 @@
-from typing import List, Optional, Dict, Any
+from contextlib import contextmanager
+from datetime import datetime
+from typing import List, Optional, Dict, Any, Callable, Iterator, Tuple
 from database.database import DatabaseManager
-from database.models import Script, Folder
+from database.models import Script, Folder, SavedSearch, FolderStats
+from database.query import ScriptQuery, parse_query
+from core.change_feed import Change
+from core.session import SessionState
+from core.dependencies import extract_references
+from core.symbols import extract_symbols
+from core.tracing import tracer
 
 
 class ScriptManager:
@@ -8,6 +16,99 @@ class ScriptManager:
         self.db = db_manager
         self._script_cache: Dict[int, Script] = {}
         self._folder_cache: Dict[int, Folder] = {}
+        self._listeners: List[Callable[[str, Any], None]] = []
+    
+    # Change notifications
+    def add_listener(self, listener: Callable[[str, Any], None]):
+        """Register a callback for create/update/delete events.
+
+        The callback receives the event name (e.g. "script_updated") and the
+        affected Script/Folder, or its id for "*_deleted" events.
+        """
+        self._listeners.append(listener)
+    
+    def remove_listener(self, listener: Callable[[str, Any], None]):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+    
+    def _notify(self, event: str, item: Any):
+        for listener in list(self._listeners):
+            listener(event, item)
+    
+    @tracer.traced(category="core")
+    def apply_changes(self, changes: List[Change]) -> List[Tuple[str, Any, bool]]:
+        """Bring caches up to date with changes made elsewhere (see ChangeFeed).
+
+        Reads only the changed rows, updates cached objects in place so
+        editors holding them stay current, notifies listeners and returns
+        (event, item, content_changed) in an order that is safe to apply:
+        new and changed folders (parents first), then scripts, then deleted
+        folders. content_changed is False for a script whose cached copy
+        was already up to date, which includes this manager's own writes
+        coming back from the feed; handlers must cope with events for items
+        they already show.
+        """
+        events: List[Tuple[str, Any, bool]] = []
+        # Folders go after the scripts that were in them
+        deleted_folders: List[Tuple[str, Any, bool]] = []
+        folder_changes = {change.item_id: change for change in changes if change.item_type == "folder"}
+        script_changes = {change.item_id: change for change in changes if change.item_type == "script"}
+        
+        # In path order, so parents come before their subfolders
+        folders = self.db.get_folders(folder_changes)
+        for folder_id in folder_changes.keys() - {folder.id for folder in folders}:
+            self._folder_cache.pop(folder_id, None)
+            deleted_folders.append(("folder_deleted", folder_id, False))
+        for folder in folders:
+            change = folder_changes[folder.id]
+            cached = self._folder_cache.get(folder.id)
+            if cached is not None:
+                cached.name, cached.parent_id, cached.path = folder.name, folder.parent_id, folder.path
+                folder = cached
+            else:
+                self._folder_cache[folder.id] = folder
+            events.append(("folder_created" if change.created else "folder_updated", folder, False))
+        
+        scripts = {script.id: script for script in self.db.get_script_summaries(script_changes)}
+        for script_id, change in script_changes.items():
+            script = scripts.get(script_id)
+            cached = self._script_cache.get(script_id)
+            if script is None:
+                self._script_cache.pop(script_id, None)
+                events.append(("script_deleted", script_id, False))
+                continue
+            content_changed = True
+            if cached is not None:
+                content_changed = cached.modified_date != script.modified_date
+                for field in ("name", "folder_id", "description", "author", "environment_tag",
+                              "file_type", "created_date", "modified_date", "last_opened_date"):
+                    setattr(cached, field, getattr(script, field))
+                if content_changed:
+                    # Read again on demand (get_content / get_script)
+                    cached.content = None
+                script = cached
+            events.append(("script_created" if change.created else "script_updated", script,
+                           content_changed))
+        
+        events.extend(deleted_folders)
+        for event, item, _ in events:
+            self._notify(event, item)
+        return events
+    
+    @contextmanager
+    def transaction(self):
+        """Commit everything done inside the block at once (see DatabaseManager.transaction)."""
+        try:
+            with self.db.transaction():
+                yield
+        except Exception:
+            # Cached objects may reflect writes that were just rolled back
+            self.clear_caches()
+            raise
+    
+    def clear_caches(self):
+        self._script_cache.clear()
+        self._folder_cache.clear()
     
     # Script operations
     def create_script(self, name: str, folder_id: Optional[int] = None, 
@@ -18,45 +119,124 @@ class ScriptManager:
             file_type=file_type,
             content=content
         )
-        script.id = self.db.create_script(script)
+        with self.db.transaction():
+            script.id = self.db.create_script(script)
+            self._adjust_folder_stats(script.folder_id, 1, _size(script.content),
+                                      script.modified_date)
+            self._index_content(script)
         self._script_cache[script.id] = script
+        self._notify("script_created", script)
         return script
     
     def get_script(self, script_id: int) -> Optional[Script]:
         if script_id in self._script_cache:
-            return self._script_cache[script_id]
+            tracer.count("script_cache.hit")
+            script = self._script_cache[script_id]
+            if script.content is None:
+                # Content was handed to an editor; callers here expect it, so
+                # return a loaded copy and keep the cached object empty
+                return script._replace(content=self.db.get_script_content(script_id))
+            return script
         
+        tracer.count("script_cache.miss")
         script = self.db.get_script(script_id)
         if script:
             self._script_cache[script_id] = script
         return script
     
     def update_script(self, script: Script) -> bool:
-        success = self.db.update_script(script)
+        with self.db.transaction():
+            previous = self.db.get_script_footprint(script.id)
+            success = self.db.update_script(script)
+            if success and previous:
+                old_folder_id, old_size = previous
+                # Unloaded content is left as stored
+                new_size = old_size if script.content is None else _size(script.content)
+                if old_folder_id == script.folder_id:
+                    self._adjust_folder_stats(script.folder_id, 0, new_size - old_size,
+                                              script.modified_date)
+                else:
+                    self._adjust_folder_stats(old_folder_id, -1, -old_size, script.modified_date)
+                    self._adjust_folder_stats(script.folder_id, 1, new_size, script.modified_date)
+            if success:
+                self._index_content(script)
         if success:
             self._script_cache[script.id] = script
+            self._notify("script_updated", script)
         return success
     
     def delete_script(self, script_id: int) -> bool:
-        success = self.db.delete_script(script_id)
-        if success and script_id in self._script_cache:
-            del self._script_cache[script_id]
+        with self.db.transaction():
+            previous = self.db.get_script_footprint(script_id)
+            success = self.db.delete_script(script_id)
+            if success and previous:
+                # A deletion counts as a change to the folder
+                self._adjust_folder_stats(previous[0], -1, -previous[1], datetime.now())
+        if success:
+            self._script_cache.pop(script_id, None)
+            self._notify("script_deleted", script_id)
         return success
     
     def mark_script_opened(self, script_id: int) -> bool:
         success = self.db.update_script_last_opened(script_id)
         if success and script_id in self._script_cache:
             script = self._script_cache[script_id]
-            from datetime import datetime
             script.last_opened_date = datetime.now()
         return success
     
     def get_scripts_by_folder(self, folder_id: Optional[int]) -> List[Script]:
         return self.db.get_scripts_by_folder(folder_id)
     
+    @tracer.traced(category="core")
+    def get_scripts_grouped_by_folder(self) -> Dict[Optional[int], List[Script]]:
+        # One query for the whole library instead of one per folder
+        grouped: Dict[Optional[int], List[Script]] = {}
+        for script in self.db.get_all_script_summaries():
+            grouped.setdefault(script.folder_id, []).append(script)
+        return grouped
+    
+    def get_content(self, script: Script) -> str:
+        """The script's content, read from the database if not loaded."""
+        if script.content is None:
+            return self.db.get_script_content(script.id) or ""
+        return script.content
+    
+    def release_content(self, script: Script):
+        """Drop the model's copy once an editor owns the text."""
+        script.content = None
+    
+    def iter_scripts(self, query: Optional[ScriptQuery] = None) -> Iterator[Script]:
+        return self.db.iter_scripts(query)
+    
     def search_scripts(self, query: str) -> List[Script]:
         return self.db.search_scripts(query)
     
+    def query_scripts(self, query: ScriptQuery) -> List[Script]:
+        return self.db.query_scripts(query)
+    
+    # Saved searches
+    def save_search(self, name: str, query_text: str) -> SavedSearch:
+        search = SavedSearch(name=name, query_text=query_text)
+        search.id = self.db.create_saved_search(search)
+        return search
+    
+    def get_saved_searches(self) -> List[SavedSearch]:
+        return self.db.get_saved_searches()
+    
+    def delete_saved_search(self, search_id: int) -> bool:
+        return self.db.delete_saved_search(search_id)
+    
+    def run_saved_search(self, search: SavedSearch) -> List[Script]:
+        # Re-parse each run so relative dates like "modified:week" stay current
+        return self.query_scripts(parse_query(search.query_text))
+    
+    # Session state
+    def load_session(self) -> SessionState:
+        return SessionState.from_json(self.db.get_setting("session"))
+    
+    def save_session(self, session: SessionState):
+        self.db.set_setting("session", session.to_json())
+    
     # Folder operations
     def create_folder(self, name: str, parent_id: Optional[int] = None) -> Folder:
         path = self._calculate_folder_path(name, parent_id)
@@ -67,12 +247,15 @@ class ScriptManager:
         )
         folder.id = self.db.create_folder(folder)
         self._folder_cache[folder.id] = folder
+        self._notify("folder_created", folder)
         return folder
     
     def get_folder(self, folder_id: int) -> Optional[Folder]:
         if folder_id in self._folder_cache:
+            tracer.count("folder_cache.hit")
             return self._folder_cache[folder_id]
         
+        tracer.count("folder_cache.miss")
         folder = self.db.get_folder(folder_id)
         if folder:
             self._folder_cache[folder_id] = folder
@@ -81,14 +264,37 @@ class ScriptManager:
     def update_folder(self, folder: Folder) -> bool:
         # Update path when parent changes
         folder.path = self._calculate_folder_path(folder.name, folder.parent_id)
-        success = self.db.update_folder(folder)
+        with self.db.transaction():
+            previous = self.db.get_folder(folder.id)
+            # Also moves the subtree in the closure table and rewrites descendant paths
+            success = self.db.update_folder(folder)
+            if success and previous and previous.parent_id != folder.parent_id:
+                # The whole subtree's totals move from the old ancestors to the new ones
+                stats = self.db.get_folder_stats(folder.id)
+                if stats:
+                    now = datetime.now()
+                    self._adjust_folder_stats(previous.parent_id, -stats.script_count,
+                                              -stats.total_bytes, now)
+                    self._adjust_folder_stats(folder.parent_id, stats.script_count,
+                                              stats.total_bytes, now)
+            descendants = []
+            if success and previous and previous.path != folder.path:
+                descendants = self.db.get_subtree_folders(folder.id)
         if success:
             self._folder_cache[folder.id] = folder
-            # Update paths of child folders
-            self._update_child_folder_paths(folder.id)
+            self._notify("folder_updated", folder)
+            for child in descendants:
+                self._folder_cache[child.id] = child
+                self._notify("folder_updated", child)
         return success
     
-    def delete_folder(self, folder_id: int) -> bool:
+    def get_subtree_folders(self, folder_id: int) -> List[Folder]:
+        return self.db.get_subtree_folders(folder_id)
+    
+    def delete_folder(self, folder_id: int, recursive: bool = False) -> bool:
+        if recursive:
+            return self.delete_items([], [folder_id]) != (0, 0)
+        
         # Check if folder has scripts or subfolders
         scripts = self.get_scripts_by_folder(folder_id)
         children = self.get_child_folders(folder_id)
@@ -97,10 +303,92 @@ class ScriptManager:
             return False  # Don't delete non-empty folders
         
         success = self.db.delete_folder(folder_id)
-        if success and folder_id in self._folder_cache:
-            del self._folder_cache[folder_id]
+        if success:
+            self._folder_cache.pop(folder_id, None)
+            self._notify("folder_deleted", folder_id)
         return success
     
+    # Bulk operations
+    def delete_items(self, script_ids: List[int], folder_ids: List[int]) -> Tuple[int, int]:
+        """Delete scripts and whole folder subtrees in one transaction.
+        
+        Folders are deleted with everything below them. Returns the number of
+        (scripts, folders) removed.
+        """
+        deleted_scripts: List[int] = []
+        deleted_folders: List[int] = []
+        with self.transaction():
+            now = datetime.now()
+            if script_ids:
+                footprints = self.db.get_script_footprints(script_ids)
+                deleted_scripts = self.db.delete_scripts(script_ids)
+                for folder_id, (count, size) in footprints.items():
+                    self._adjust_folder_stats(folder_id, -count, -size, now)
+            for folder_id in folder_ids:
+                folder = self.db.get_folder(folder_id)
+                if folder is None:
+                    continue  # already gone with a selected ancestor
+                stats = self.db.get_folder_stats(folder_id)
+                folders, scripts = self.db.delete_folder_tree(folder_id)
+                if stats:
+                    self._adjust_folder_stats(folder.parent_id, -stats.script_count,
+                                              -stats.total_bytes, now)
+                deleted_folders.extend(folders)
+                deleted_scripts.extend(scripts)
+        for script_id in deleted_scripts:
+            self._script_cache.pop(script_id, None)
+            self._notify("script_deleted", script_id)
+        for folder_id in deleted_folders:
+            self._folder_cache.pop(folder_id, None)
+            self._notify("folder_deleted", folder_id)
+        return len(deleted_scripts), len(deleted_folders)
+    
+    def move_items(self, script_ids: List[int], folder_ids: List[int],
+                   target_folder_id: Optional[int]) -> bool:
+        """Move scripts and folders into target_folder_id in one transaction.
+        
+        Nothing is moved if any folder would end up inside itself.
+        """
+        if target_folder_id is not None and any(
+                self._would_create_circular_reference(folder_id, target_folder_id)
+                for folder_id in folder_ids):
+            return False
+        with self.transaction():
+            if script_ids:
+                now = datetime.now()
+                footprints = self.db.get_script_footprints(script_ids)
+                self.db.move_scripts(script_ids, target_folder_id)
+                for folder_id, (count, size) in footprints.items():
+                    self._adjust_folder_stats(folder_id, -count, -size, now)
+                    self._adjust_folder_stats(target_folder_id, count, size, now)
+            for folder_id in folder_ids:
+                if any(other != folder_id and self.db.is_descendant(folder_id, other)
+                       for other in folder_ids):
+                    continue  # travels with its selected ancestor
+                folder = self.get_folder(folder_id)
+                if folder and folder.parent_id != target_folder_id:
+                    folder.parent_id = target_folder_id
+                    self.update_folder(folder)
+            # Summaries only: moving thousands of scripts must not load their bodies
+            moved = self.db.get_script_summaries(script_ids) if script_ids else []
+        for script in moved:
+            cached = self._script_cache.get(script.id)
+            if cached:
+                # Keep objects held by open editors in step
+                cached.folder_id = script.folder_id
+                cached.modified_date = script.modified_date
+                script = cached
+            else:
+                self._script_cache[script.id] = script
+            self._notify("script_updated", script)
+        return True
+    
+    def get_folder_stats(self, folder_id: int) -> Optional[FolderStats]:
+        return self.db.get_folder_stats(folder_id)
+    
+    def get_all_folder_stats(self) -> Dict[int, FolderStats]:
+        return self.db.get_all_folder_stats()
+    
     def get_all_folders(self) -> List[Folder]:
         folders = self.db.get_all_folders()
         for folder in folders:
@@ -110,6 +398,48 @@ class ScriptManager:
     def get_child_folders(self, parent_id: Optional[int]) -> List[Folder]:
         return self.db.get_child_folders(parent_id)
     
+    # Path lookups ("/Deploy/Web" for folders, "/Deploy/Web/Install-Site.ps1" for scripts)
+    def get_folder_by_path(self, path: str) -> Optional[Folder]:
+        path = normalize_path(path)
+        if path == "/":
+            return None
+        folder = self.db.get_folder_by_path(path)
+        if folder:
+            self._folder_cache[folder.id] = folder
+        return folder
+    
+    def ensure_folder_path(self, path: str) -> Optional[int]:
+        """Return the id of the folder at path, creating missing folders on the way."""
+        parent_id = None
+        current = ""
+        for name in normalize_path(path).strip("/").split("/"):
+            if not name:
+                continue
+            current += f"/{name}"
+            folder = self.get_folder_by_path(current)
+            if folder is None:
+                folder = self.create_folder(name, parent_id)
+            parent_id = folder.id
+        return parent_id
+    
+    def get_script_by_path(self, path: str) -> Optional[Script]:
+        folder_path, name, file_type = split_script_path(path)
+        folder_id = None
+        if folder_path != "/":
+            folder = self.get_folder_by_path(folder_path)
+            if folder is None:
+                return None
+            folder_id = folder.id
+        script = self.db.get_script_by_name(folder_id, name, file_type)
+        if script:
+            self._script_cache[script.id] = script
+        return script
+    
+    def get_script_path(self, script: Script) -> str:
+        folder = self.get_folder(script.folder_id) if script.folder_id is not None else None
+        prefix = folder.path if folder else ""
+        return f"{prefix}/{script.name}.{script.file_type}"
+    
     def move_folder(self, folder_id: int, new_parent_id: Optional[int]) -> bool:
         folder = self.get_folder(folder_id)
         if not folder:
@@ -131,6 +461,18 @@ class ScriptManager:
         return self.update_script(script)
     
     # Helper methods
+    def _index_content(self, script: Script):
+        # Unloaded content is unchanged, so its symbols and references are still current
+        if script.content is not None:
+            self.db.save_script_index([(script.id,
+                                        extract_symbols(script.content, script.file_type),
+                                        extract_references(script.content, script.file_type))])
+    
+    def _adjust_folder_stats(self, folder_id: Optional[int], count_delta: int,
+                             bytes_delta: int, modified: Optional[datetime]):
+        if folder_id is not None:
+            self.db.adjust_folder_stats(folder_id, count_delta, bytes_delta, modified)
+    
     def _calculate_folder_path(self, name: str, parent_id: Optional[int]) -> str:
         if parent_id is None:
             return f"/{name}"
@@ -140,24 +482,10 @@ class ScriptManager:
             return f"{parent.path}/{name}"
         return f"/{name}"
     
-    def _update_child_folder_paths(self, parent_id: int):
-        children = self.get_child_folders(parent_id)
-        for child in children:
-            child.path = self._calculate_folder_path(child.name, child.parent_id)
-            self.db.update_folder(child)
-            self._folder_cache[child.id] = child
-            # Recursively update children
-            self._update_child_folder_paths(child.id)
-    
     def _would_create_circular_reference(self, folder_id: int, target_parent_id: int) -> bool:
-        current_id = target_parent_id
-        while current_id is not None:
-            if current_id == folder_id:
-                return True
-            parent = self.get_folder(current_id)
-            current_id = parent.parent_id if parent else None
-        return False
+        return self.db.is_descendant(target_parent_id, folder_id)
     
+    @tracer.traced(category="core")
     def get_folder_tree(self) -> Dict[Optional[int], List[Folder]]:
         all_folders = self.get_all_folders()
         tree: Dict[Optional[int], List[Folder]] = {}
@@ -168,4 +496,25 @@ class ScriptManager:
                 tree[parent_id] = []
             tree[parent_id].append(folder)
         
-        return tree
\ No newline at end of file
+        return tree
+
+
+def _size(content: Optional[str]) -> int:
+    return len(content.encode("utf-8")) if content else 0
+
+
+def normalize_path(path: str) -> str:
+    """Library paths always use forward slashes and a leading slash."""
+    path = "/" + path.replace("\\", "/").strip("/")
+    while "//" in path:
+        path = path.replace("//", "/")
+    return path
+
+
+def split_script_path(path: str) -> Tuple[str, str, Optional[str]]:
+    """Split "/A/B/Name.ps1" into ("/A/B", "Name", "ps1"); the extension is optional."""
+    folder_path, _, filename = normalize_path(path).rpartition("/")
+    name, dot, extension = filename.rpartition(".")
+    if dot and extension.lower() in ("ps1", "bat"):
+        return folder_path or "/", name, extension.lower()
+    return folder_path or "/", filename, None
\ No newline at end of file
@@ -0,0 +1,39 @@
+import json
+from dataclasses import dataclass, field, asdict
+from typing import List, Optional
+
+
+@dataclass
+class TabState:
+    script_id: int
+    title: str = ""
+    line: int = 0
+    column: int = 0
+    first_visible_line: int = 0
+
+
+@dataclass
+class SessionState:
+    tabs: List[TabState] = field(default_factory=list)
+    current_index: int = -1
+    expanded_folder_ids: List[int] = field(default_factory=list)
+    selected_item: Optional[List] = None  # ["folder" | "script", id]
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self))
+
+    @classmethod
+    def from_json(cls, text: Optional[str]) -> "SessionState":
+        if not text:
+            return cls()
+        try:
+            data = json.loads(text)
+            return cls(
+                tabs=[TabState(**tab) for tab in data.get("tabs", [])],
+                current_index=data.get("current_index", -1),
+                expanded_folder_ids=list(data.get("expanded_folder_ids", [])),
+                selected_item=data.get("selected_item"),
+            )
+        except (ValueError, TypeError):
+            # A corrupt session should never block startup
+            return cls()
\ No newline at end of file
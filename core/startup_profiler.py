@@ -0,0 +1,39 @@
+import sys
+import time
+from typing import List, Tuple
+
+
+class StartupProfiler:
+    """Records named milestones during startup (see ``main.py --profile-startup``)."""
+
+    def __init__(self):
+        self.enabled = False
+        self.origin = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+        self._reported = False
+
+    def mark(self, label: str):
+        if self.enabled:
+            self.marks.append((label, time.perf_counter()))
+
+    def report(self) -> str:
+        lines = ["Startup profile", f"{'milestone':<36}{'at (ms)':>10}{'step (ms)':>11}"]
+        previous = self.origin
+        for label, moment in self.marks:
+            lines.append(
+                f"{label:<36}{(moment - self.origin) * 1000:>10.1f}"
+                f"{(moment - previous) * 1000:>11.1f}"
+            )
+            previous = moment
+        return "\n".join(lines)
+
+    def finish(self, label: str = "ready for interaction"):
+        """Record the final milestone and print the report once."""
+        if not self.enabled or self._reported:
+            return
+        self.mark(label)
+        self._reported = True
+        print(self.report(), file=sys.stderr)
+
+
+startup_profiler = StartupProfiler()
\ No newline at end of file
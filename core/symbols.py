@@ -0,0 +1,267 @@
+"""
+Symbol index: function definitions, command invocations, variables and
+batch labels per script.
+
+Each script is tokenized once and stored as one script_symbols row per
+distinct (kind, name) with its first line and occurrence count, so
+go-to-definition and find-references are index lookups rather than LIKE
+scans over the content. ScriptManager re-indexes a script whenever it saves
+its content; a trigger drops the rows of content changed any other way and
+SymbolIndex.refresh picks those scripts up again. The same pass extracts
+script-to-script references for the dependency graph (core/dependencies.py).
+"""
+
+import bisect
+import os
+import re
+import threading
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from database.database import DatabaseManager
+from core.dependencies import Reference, extract_references
+from core.tracing import tracer
+from core.workers import run_chunked
+
+
+# Definitions are what go-to-definition jumps to; the rest are references
+DEFINITION_KINDS = ("function", "label")
+REFERENCE_KINDS = ("command", "variable")
+
+CHUNK_SIZE = 2500
+
+
+class Symbol(NamedTuple):
+    kind: str           # "function", "label", "command" or "variable"
+    name: str           # batch labels keep their colon (":cleanup")
+    line: int           # first occurrence, 1-based
+    occurrences: int
+
+
+class SymbolLocation(NamedTuple):
+    script_id: int
+    kind: str
+    name: str
+    line: int
+    occurrences: int
+
+
+class _Collector:
+    """Folds occurrences into one Symbol per (kind, name), case-insensitively."""
+
+    def __init__(self, text: str):
+        self._newlines = [match.start() for match in re.finditer("\n", text)]
+        self._found: Dict[Tuple[str, str], List] = {}
+
+    def add(self, kind: str, name: str, offset: int):
+        key = (kind, name.lower())
+        entry = self._found.get(key)
+        if entry:
+            entry[2] += 1
+        else:
+            self._found[key] = [name, bisect.bisect_left(self._newlines, offset) + 1, 1]
+
+    def symbols(self) -> List[Symbol]:
+        return [Symbol(kind, name, line, count)
+                for (kind, _), (name, line, count) in self._found.items()]
+
+
+# PowerShell
+_PS_TOKEN = re.compile(r"""
+      (?P<blank>[ \t\r]+ | <\#.*?\#> | \#[^\n]*)    # whitespace and comments
+    | `\r?\n                                        # line continuation
+    | -[A-Za-z]\w*                                  # parameter or operator
+    | @'.*?\n'@                                     # literal here-string
+    | (?P<expandable>@".*?\n"@ | "(?:`.|[^"`])*")   # strings that expand $vars
+    | '(?:''|[^'])*'
+    | (?P<variable>\$(?:\{[^}\n]*\}|[\w:]+))
+    | (?P<function>\b(?:function|filter|workflow)\s+(?P<function_name>[\w:.-]+))
+    | \[[A-Za-z_][\w.]*(?:\[\])?\]                  # type literal, e.g. [string]
+    | (?P<word>[A-Za-z_][\w.\\:-]*)
+    | (?P<open>@\{|[{(\[])
+    | (?P<close>[})\]])
+    | (?P<separator>[\n;|=&])
+""", re.VERBOSE | re.DOTALL)
+
+_PS_INLINE_VARIABLE = re.compile(r"\$(?:\{[^}\n]*\}|[\w:]+)")
+
+# Words that start a statement without being a command
+_PS_KEYWORDS = frozenset("""
+    begin break catch class continue data do dynamicparam else elseif end enum
+    exit filter finally for foreach function if in param process return switch
+    throw trap try until using while workflow
+""".split())
+
+# Automatic variables say nothing about a script
+_PS_AUTOMATIC = frozenset(["_", "true", "false", "null", "args", "this", "input",
+                           "psitem", "error", "lastexitcode", "psscriptroot",
+                           "pscmdlet", "psboundparameters", "matches"])
+
+
+def _variable_name(token: str) -> str:
+    name = token[1:]
+    if name.startswith("{"):
+        name = name[1:-1]
+    # $script:Name, $global:Name and $env:Name refer to Name in a scope
+    scope, _, rest = name.partition(":")
+    return rest if rest and scope.lower() in ("script", "global", "local", "private", "env") \
+        else name
+
+
+def _add_variable(collector: _Collector, token: str, offset: int):
+    name = _variable_name(token)
+    if name and name.lower() not in _PS_AUTOMATIC:
+        collector.add("variable", name, offset)
+
+
+def _powershell_symbols(text: str) -> List[Symbol]:
+    collector = _Collector(text)
+    # Command position: start of a statement or pipeline element, except
+    # inside hashtable literals and [attribute(...)] brackets
+    contexts: List[str] = []
+    at_command = True
+    for match in _PS_TOKEN.finditer(text):
+        group = match.lastgroup
+        if group == "blank":
+            continue
+        elif group == "separator":
+            at_command = not contexts or contexts[-1] in "{("
+        elif group == "word":
+            word = match.group()
+            if at_command:
+                if word.lower() in _PS_KEYWORDS:
+                    continue
+                collector.add("command", word, match.start())
+            at_command = False
+        elif group == "variable":
+            _add_variable(collector, match.group(), match.start())
+            at_command = False
+        elif group == "function":
+            collector.add("function", match.group("function_name"), match.start("function_name"))
+            at_command = False
+        elif group == "open":
+            token = match.group()
+            at_command = token in "{(" and (not contexts or contexts[-1] != "[")
+            contexts.append(token)
+        elif group == "close":
+            if contexts:
+                contexts.pop()
+            at_command = False
+        elif group == "expandable":
+            for variable in _PS_INLINE_VARIABLE.finditer(match.group()):
+                _add_variable(collector, variable.group(), match.start() + variable.start())
+            at_command = False
+        else:
+            at_command = False
+    return collector.symbols()
+
+
+# Batch
+_BAT_LINE = re.compile(r"^[ \t@]*(?P<rest>[^\n]*)", re.MULTILINE)
+_BAT_LABEL = re.compile(r":(?P<name>[\w.-]+)")
+_BAT_JUMP = re.compile(r"\b(?:goto\s+:?|call\s+:)(?P<name>[\w.-]+)", re.IGNORECASE)
+_BAT_COMMAND = re.compile(r"(?:^|[&|(])[ \t@]*(?P<name>[A-Za-z_][\w.\\-]*)")
+_BAT_CALL = re.compile(r"\bcall\s+(?P<name>[A-Za-z_][\w.\\-]*)", re.IGNORECASE)
+_BAT_VARIABLE = re.compile(r"%(?P<percent>[A-Za-z_][\w-]*)%|!(?P<bang>[A-Za-z_][\w-]*)!"
+                           r"|\bset\s+(?:/[ap]\s+)?\"?(?P<set>[A-Za-z_][\w-]*)=",
+                           re.IGNORECASE)
+
+_BAT_KEYWORDS = frozenset(["if", "for", "else", "do", "not", "exist", "defined", "in",
+                           "goto", "call", "rem"])
+
+
+def _batch_symbols(text: str) -> List[Symbol]:
+    collector = _Collector(text)
+    for line in _BAT_LINE.finditer(text):
+        rest = line.group("rest")
+        start = line.start("rest")
+        lowered = rest.lower()
+        if lowered.startswith("::") or lowered == "rem" or lowered.startswith("rem "):
+            continue
+        if rest.startswith(":"):
+            label = _BAT_LABEL.match(rest)
+            if label:
+                collector.add("label", ":" + label.group("name"), start)
+            continue
+        for command in _BAT_COMMAND.finditer(rest):
+            if command.group("name").lower() not in _BAT_KEYWORDS:
+                collector.add("command", command.group("name"), start + command.start("name"))
+        # Substring checks first: most lines need none of the patterns below
+        if "goto" in lowered or "call" in lowered:
+            for jump in _BAT_JUMP.finditer(rest):
+                if jump.group("name").lower() != "eof":
+                    collector.add("command", ":" + jump.group("name"), start + jump.start("name"))
+            for call in _BAT_CALL.finditer(rest):
+                collector.add("command", call.group("name"), start + call.start("name"))
+        if "%" in rest or "!" in rest or "set" in lowered:
+            for variable in _BAT_VARIABLE.finditer(rest):
+                group = variable.lastgroup
+                collector.add("variable", variable.group(group), start + variable.start(group))
+    return collector.symbols()
+
+
+def extract_symbols(content: str, file_type: str) -> List[Symbol]:
+    if file_type in ("bat", "cmd"):
+        return _batch_symbols(content)
+    return _powershell_symbols(content)
+
+
+def symbol_query(text: str) -> Tuple[str, Tuple[str, ...]]:
+    """Stored name and reference kinds for a symbol as written in a script.
+
+    "$Name", "${Name}" and "$script:Name" (PowerShell) or "%NAME%" and
+    "!NAME!" (batch) are variables; anything else, including ":label", is
+    looked up as a command or label.
+    """
+    text = text.strip()
+    if text.startswith("$"):
+        return _variable_name(text), ("variable",)
+    if len(text) > 2 and text[0] == text[-1] and text[0] in "%!":
+        return text[1:-1], ("variable",)
+    return text, ("command",)
+
+
+def _extract_chunk(sources: List[Tuple[int, str, str]]
+                   ) -> List[Tuple[int, List[Symbol], List[Reference]]]:
+    return [(script_id, extract_symbols(content, file_type), extract_references(content, file_type))
+            for script_id, file_type, content in sources]
+
+
+class SymbolIndex:
+    """Keeps script_symbols current and answers lookups against it."""
+
+    def __init__(self, db: DatabaseManager, workers: Optional[int] = None,
+                 progress: Optional[Callable[[int, int], None]] = None):
+        self.db = db
+        self.workers = workers if workers is not None else (os.cpu_count() or 1)
+        self.progress = progress
+
+    @tracer.traced(category="core")
+    def refresh(self) -> int:
+        """Index scripts without current symbols and references; returns how many."""
+        stale = self.db.get_unindexed_symbol_script_ids()
+        done = 0
+        for entries in self._compute(stale):
+            # Scripts saved through ScriptManager meanwhile already have fresh rows
+            self.db.save_script_index(entries, skip_indexed=True)
+            done += len(entries)
+            if self.progress:
+                self.progress(done, len(stale))
+        return done
+
+    def refresh_async(self) -> threading.Thread:
+        thread = threading.Thread(target=self.refresh, name="symbol-index-refresh", daemon=True)
+        thread.start()
+        return thread
+
+    def _chunks(self, script_ids: List[int]) -> Iterator[List[Tuple[int, str, str]]]:
+        for i in range(0, len(script_ids), CHUNK_SIZE):
+            yield self.db.get_script_sources(script_ids[i:i + CHUNK_SIZE])
+
+    def _compute(self, stale: List[int]) -> Iterator[List[Tuple[int, List[Symbol], List[Reference]]]]:
+        return run_chunked(_extract_chunk, self._chunks(stale), self.workers, len(stale))
+
+    def definitions(self, name: str) -> List[SymbolLocation]:
+        return [SymbolLocation(*row) for row in self.db.find_symbols(name, DEFINITION_KINDS)]
+
+    def references(self, name: str, kinds: Sequence[str] = REFERENCE_KINDS,
+                   limit: Optional[int] = None) -> List[SymbolLocation]:
+        return [SymbolLocation(*row) for row in self.db.find_symbols(name, kinds, limit)]
@@ -0,0 +1,377 @@
+import hashlib
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+from database.models import Script, SyncStateEntry, SyncTarget
+from database.query import ScriptQuery
+from core.script_manager import ScriptManager, normalize_path
+from core.tracing import tracer
+
+
+SCRIPT_EXTENSIONS = (".ps1", ".bat")
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class SyncResult:
+    written: List[str] = field(default_factory=list)         # library -> disk
+    imported: List[str] = field(default_factory=list)        # disk -> library
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+    deleted_files: List[str] = field(default_factory=list)
+    deleted_scripts: List[str] = field(default_factory=list)
+    conflicts: List[str] = field(default_factory=list)       # both changed; newer side won
+
+    def changed(self) -> bool:
+        return any((self.written, self.imported, self.renamed, self.deleted_files,
+                    self.deleted_scripts, self.conflicts))
+
+
+class DirectoryWatcher:
+    """Collects changed script paths under a directory using watchdog.
+
+    watchdog is optional; create() returns None when it is not installed and
+    the engine falls back to stat polling.
+    """
+
+    def __init__(self, root: str):
+        from watchdog.events import FileSystemEventHandler
+        from watchdog.observers import Observer
+
+        self.root = root
+        self._lock = threading.Lock()
+        self._dirty: Set[str] = set()
+        self._rescan = True  # nothing observed before start: scan once
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher._on_event(event)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), root, recursive=True)
+        self._observer.start()
+
+    @classmethod
+    def create(cls, root: str) -> Optional["DirectoryWatcher"]:
+        try:
+            return cls(root)
+        except ImportError:
+            return None
+
+    def _on_event(self, event):
+        paths = [event.src_path, getattr(event, "dest_path", "") or ""]
+        with self._lock:
+            if event.is_directory and event.event_type in ("moved", "deleted"):
+                # A whole subtree appeared or vanished; cheaper to rescan once
+                self._rescan = True
+                return
+            for path in paths:
+                if path.lower().endswith(SCRIPT_EXTENSIONS):
+                    self._dirty.add(os.path.relpath(path, self.root).replace(os.sep, "/"))
+
+    def drain(self) -> Optional[Set[str]]:
+        """Relative paths changed since the last call, or None if a full scan is needed."""
+        with self._lock:
+            if self._rescan:
+                self._rescan = False
+                self._dirty.clear()
+                return None
+            dirty, self._dirty = self._dirty, set()
+            return dirty
+
+    def stop(self):
+        self._observer.stop()
+        self._observer.join()
+
+
+class SyncEngine:
+    """Two-way mirror between a library folder subtree and a directory.
+
+    Every pass compares three things per script: the library's modified_date,
+    the file's (mtime, size) and the hashes recorded at the last sync. Only
+    scripts whose modified_date moved are loaded from the database, and only
+    files whose stat changed are read and hashed; with a watcher only the
+    reported files are even stat'ed. When both sides changed, the newer one
+    wins and the script is reported as a conflict.
+    """
+
+    def __init__(self, manager: ScriptManager, target: SyncTarget, watch: bool = True):
+        self.manager = manager
+        self.target = target
+        self.root = os.path.abspath(target.directory)
+        os.makedirs(self.root, exist_ok=True)
+        self.state: Dict[int, SyncStateEntry] = {
+            entry.script_id: entry for entry in manager.db.get_sync_state(target.id)
+        }
+        self.watcher = DirectoryWatcher.create(self.root) if watch else None
+        # Per-pass bookkeeping for save_sync_state
+        self._dirty_entries: Dict[int, SyncStateEntry] = {}
+        self._removed: List[int] = []
+
+    @classmethod
+    def for_directory(cls, manager: ScriptManager, folder_path: str, directory: str,
+                      watch: bool = True) -> "SyncEngine":
+        """Register (or reuse) the mapping folder_path <-> directory."""
+        folder_id = None
+        if normalize_path(folder_path) != "/":
+            folder = manager.get_folder_by_path(folder_path)
+            if folder is None:
+                raise ValueError(f"folder not found: {folder_path}")
+            folder_id = folder.id
+        target = SyncTarget(folder_id=folder_id, directory=os.path.abspath(directory))
+        target.id = manager.db.create_sync_target(target)
+        return cls(manager, target, watch)
+
+    def close(self):
+        if self.watcher:
+            self.watcher.stop()
+
+    # Scanning
+    def _library_items(self) -> Tuple[Dict[int, Tuple[str, str]], str]:
+        """script id -> (relative path, modified_date text) for the subtree; no content."""
+        folder_paths = {folder.id: folder.path for folder in self.manager.get_all_folders()}
+        prefix = folder_paths.get(self.target.folder_id, "") if self.target.folder_id else ""
+        query = ScriptQuery(folder_id=self.target.folder_id)
+        items = {}
+        for row in self.manager.db.query_script_summaries(query):
+            path = f"{folder_paths.get(row['folder_id'], '')}/{row['name']}.{row['file_type']}"
+            items[row["id"]] = (path[len(prefix) + 1:], row["modified_date"])
+        return items, prefix
+
+    def _stat(self, rel_path: str) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(os.path.join(self.root, rel_path))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _scan_disk(self, dirty: Optional[Set[str]]) -> Dict[str, Optional[Tuple[int, int]]]:
+        """Stat of every examined path (None = missing); all files when dirty is None."""
+        if dirty is not None:
+            return {rel_path: self._stat(rel_path) for rel_path in dirty}
+        # Paths we know about are examined too, so deletions are noticed
+        found: Dict[str, Optional[Tuple[int, int]]] = {
+            entry.rel_path: None for entry in self.state.values()
+        }
+        stack = [""]
+        while stack:
+            rel_dir = stack.pop()
+            with os.scandir(os.path.join(self.root, rel_dir)) as entries:
+                for entry in entries:
+                    rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(rel_path)
+                    elif entry.name.lower().endswith(SCRIPT_EXTENSIONS):
+                        st = entry.stat()
+                        found[rel_path] = (st.st_mtime_ns, st.st_size)
+        return found
+
+    def _read(self, rel_path: str) -> Optional[str]:
+        """The file's text, or None if it was removed since the scan."""
+        try:
+            with open(os.path.join(self.root, rel_path), encoding="utf-8", newline="") as handle:
+                return handle.read()
+        except FileNotFoundError:
+            return None
+
+    def _disk_change(self, entry: SyncStateEntry,
+                     disk: Dict[str, Optional[Tuple[int, int]]]) -> Tuple[str, Optional[str]]:
+        """("same"|"modified"|"deleted", new text) for a tracked file."""
+        if entry.rel_path not in disk:
+            return "same", None  # not reported by the watcher
+        stat = disk[entry.rel_path]
+        if stat is None:
+            return "deleted", None
+        if stat == (entry.file_mtime_ns, entry.file_size):
+            return "same", None
+        text = self._read(entry.rel_path)
+        if text is None:
+            return "deleted", None
+        if content_hash(text) == entry.content_hash:
+            # Touched but not edited; remember the new stat so it is not re-read
+            entry.file_mtime_ns, entry.file_size = stat
+            self._dirty_entries[entry.script_id] = entry
+            return "same", None
+        return "modified", text
+
+    # Writing
+    def _write_file(self, rel_path: str, text: str) -> Tuple[int, int]:
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers of the share never see a partial file
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w", encoding="utf-8", newline="") as stream:
+                stream.write(text)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return self._stat(rel_path)
+
+    def _remove_file(self, rel_path: str):
+        try:
+            os.remove(os.path.join(self.root, rel_path))
+        except FileNotFoundError:
+            pass
+        self._prune_dirs(rel_path)
+
+    def _prune_dirs(self, rel_path: str):
+        # Drop directories left empty by a delete or move, never the root itself
+        parent = os.path.dirname(os.path.join(self.root, rel_path))
+        while parent != self.root and parent.startswith(self.root):
+            try:
+                os.rmdir(parent)
+            except OSError:
+                break
+            parent = os.path.dirname(parent)
+
+    def _record(self, script: Script, rel_path: str, text: str, stat: Tuple[int, int]):
+        entry = SyncStateEntry(script.id, rel_path, content_hash(text), stat[0], stat[1],
+                               str(script.modified_date))
+        self.state[script.id] = entry
+        self._dirty_entries[script.id] = entry
+
+    def _forget(self, script_id: int):
+        self.state.pop(script_id, None)
+        self._dirty_entries.pop(script_id, None)
+        self._removed.append(script_id)
+
+    def _import_file(self, rel_path: str, text: str, prefix: str,
+                     script: Optional[Script] = None) -> Script:
+        if script is None:
+            folder_part, _, filename = rel_path.rpartition("/")
+            name, _, extension = filename.rpartition(".")
+            folder_id = self.manager.ensure_folder_path(f"{prefix}/{folder_part}") \
+                if (prefix or folder_part) else None
+            script = self.manager.create_script(name, folder_id, extension.lower(), text)
+        else:
+            script.content = text
+            self.manager.update_script(script)
+        return script
+
+    # Reconciling
+    @tracer.traced(category="core")
+    def sync(self, full: bool = False) -> SyncResult:
+        """One reconciliation pass; full=True ignores the watcher and rescans."""
+        result = SyncResult()
+        self._dirty_entries = {}
+        self._removed = []
+        dirty = None if full or self.watcher is None else self.watcher.drain()
+        disk = self._scan_disk(dirty)
+        library, prefix = self._library_items()
+        claimed: Set[str] = set()
+
+        with self.manager.transaction():
+            for script_id, (rel_path, modified) in library.items():
+                claimed.add(rel_path)
+                entry = self.state.get(script_id)
+                if entry is None:
+                    self._sync_new_script(script_id, rel_path, disk, result)
+                    continue
+                claimed.add(entry.rel_path)
+                library_changed = entry.db_modified != modified
+                disk_state, text = self._disk_change(entry, disk)
+                if library_changed and disk_state != "same":
+                    self._resolve_conflict(script_id, rel_path, entry, disk_state, text, prefix, result)
+                elif disk_state == "modified":
+                    script = self._import_file(entry.rel_path, text, prefix,
+                                               self.manager.get_script(script_id))
+                    self._record(script, entry.rel_path, text, disk[entry.rel_path])
+                    result.imported.append(entry.rel_path)
+                elif disk_state == "deleted":
+                    self.manager.delete_script(script_id)
+                    self._forget(script_id)
+                    result.deleted_scripts.append(entry.rel_path)
+                elif entry.rel_path != rel_path and not library_changed:
+                    self._rename(entry, rel_path, result)
+                elif library_changed or entry.rel_path != rel_path:
+                    self._export(script_id, rel_path, entry.rel_path, result)
+
+            # Tracked scripts deleted from the library (or moved out of the subtree)
+            for script_id in [sid for sid in self.state if sid not in library]:
+                entry = self.state[script_id]
+                disk_state, _ = self._disk_change(entry, disk)
+                self._forget(script_id)
+                if disk_state == "same":
+                    if entry.rel_path not in claimed:  # else another script lives there now
+                        self._remove_file(entry.rel_path)
+                        result.deleted_files.append(entry.rel_path)
+                    # Gone, or someone else's; either way not a new file to import
+                    disk.pop(entry.rel_path, None)
+                else:
+                    claimed.discard(entry.rel_path)  # edited on disk: import it again below
+
+            # Files nobody knows about yet
+            for rel_path, stat in disk.items():
+                if stat is None or rel_path in claimed:
+                    continue
+                text = self._read(rel_path)
+                if text is None:
+                    continue  # removed again since the scan
+                script = self._import_file(rel_path, text, prefix)
+                self._record(script, rel_path, text, stat)
+                result.imported.append(rel_path)
+
+            self.manager.db.save_sync_state(self.target.id, list(self._dirty_entries.values()),
+                                            self._removed)
+        return result
+
+    def _sync_new_script(self, script_id: int, rel_path: str,
+                         disk: Dict[str, Optional[Tuple[int, int]]], result: SyncResult):
+        script = self.manager.get_script(script_id)
+        stat = disk[rel_path] if rel_path in disk else self._stat(rel_path)
+        text = self._read(rel_path) if stat is not None else None
+        if text is not None:
+            if text == script.content:
+                self._record(script, rel_path, text, stat)
+                return
+            result.conflicts.append(rel_path)
+            if stat[0] / 1e9 > script.modified_date.timestamp():
+                script = self._import_file(rel_path, text, "", script)
+                self._record(script, rel_path, text, stat)
+                result.imported.append(rel_path)
+                return
+        stat = self._write_file(rel_path, script.content)
+        self._record(script, rel_path, script.content, stat)
+        result.written.append(rel_path)
+
+    def _export(self, script_id: int, rel_path: str, old_rel_path: str, result: SyncResult):
+        script = self.manager.get_script(script_id)
+        stat = self._write_file(rel_path, script.content)
+        if old_rel_path != rel_path:
+            self._remove_file(old_rel_path)
+        self._record(script, rel_path, script.content, stat)
+        result.written.append(rel_path)
+
+    def _rename(self, entry: SyncStateEntry, rel_path: str, result: SyncResult):
+        source = os.path.join(self.root, entry.rel_path)
+        target = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+        self._prune_dirs(entry.rel_path)
+        result.renamed.append((entry.rel_path, rel_path))
+        entry.rel_path = rel_path
+        self._dirty_entries[entry.script_id] = entry
+
+    def _resolve_conflict(self, script_id: int, rel_path: str, entry: SyncStateEntry,
+                          disk_state: str, text: Optional[str], prefix: str, result: SyncResult):
+        script = self.manager.get_script(script_id)
+        result.conflicts.append(rel_path)
+        if disk_state == "deleted":
+            # Edited in the library, deleted on disk: keep the edit
+            self._export(script_id, rel_path, entry.rel_path, result)
+            return
+        file_time = os.stat(os.path.join(self.root, entry.rel_path)).st_mtime
+        if file_time > script.modified_date.timestamp() and entry.rel_path == rel_path:
+            script = self._import_file(rel_path, text, prefix, script)
+            self._record(script, rel_path, text, self._stat(rel_path))
+            result.imported.append(rel_path)
+        else:
+            self._export(script_id, rel_path, entry.rel_path, result)
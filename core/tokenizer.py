@@ -0,0 +1,72 @@
+from typing import List, Tuple
+
+# Style numbers shared with PowerShellHighlighter
+DEFAULT = 0
+COMMENT = 1
+STRING = 2
+KEYWORD = 3
+VARIABLE = 4
+NUMBER = 5
+OPERATOR = 6
+CMDLET = 7
+
+
+def tokenize_powershell(text: str) -> List[Tuple[int, int]]:
+    """Split PowerShell source into (length, style) runs covering all of text.
+
+    Kept free of Qt so the lexing cost can be measured and reused headlessly;
+    consecutive default characters are merged into a single run.
+    """
+    runs: List[Tuple[int, int]] = []
+    length = len(text)
+    default_start = 0
+    i = 0
+    while i < length:
+        ch = text[i]
+        
+        # Comments
+        if ch == '#':
+            j = text.find('\n', i)
+            if j < 0:
+                j = length
+            style = COMMENT
+        
+        # Strings
+        elif ch == '"' or ch == "'":
+            j = i + 1
+            while j < length and text[j] != ch:
+                if text[j] == '\\' and j + 1 < length:
+                    j += 2
+                else:
+                    j += 1
+            if j < length:
+                j += 1
+            style = STRING
+        
+        # Variables
+        elif ch == '$':
+            j = i + 1
+            while j < length and (text[j].isalnum() or text[j] == '_'):
+                j += 1
+            style = VARIABLE
+        
+        # Numbers
+        elif ch.isdigit():
+            j = i
+            while j < length and (text[j].isdigit() or text[j] == '.'):
+                j += 1
+            style = NUMBER
+        
+        # Default
+        else:
+            i += 1
+            continue
+        
+        if default_start < i:
+            runs.append((i - default_start, DEFAULT))
+        runs.append((j - i, style))
+        i = default_start = j
+    
+    if default_start < length:
+        runs.append((length - default_start, DEFAULT))
+    return runs
@@ -0,0 +1,184 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class _NullSpan:
+    """Shared do-nothing span handed out while tracing is off."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "name", "category", "args", "start")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.tracer._record_span(self.name, self.category, self.start,
+                                 time.perf_counter_ns() - self.start, self.args)
+        return False
+
+    def set(self, **args):
+        """Attach extra arguments (e.g. row counts) to the span."""
+        self.args.update(args)
+
+
+class Tracer:
+    """Lightweight timers, counters and query log.
+
+    While disabled every entry point returns after a single attribute check,
+    so instrumentation can stay in hot paths permanently. Events are kept in
+    a bounded ring buffer and can be exported as Chrome trace JSON
+    (chrome://tracing or https://ui.perfetto.dev).
+    """
+
+    def __init__(self, capacity: int = 200_000):
+        self.enabled = False
+        self.log_sql = False
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter_ns()
+        self._events: deque = deque(maxlen=capacity)
+        # name -> [count, total_ns, max_ns]
+        self._stats: Dict[str, List[int]] = {}
+        self._counters: Dict[str, int] = {}
+
+    def enable(self, log_sql: bool = False):
+        self.log_sql = log_sql
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.log_sql = False
+
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._stats.clear()
+            self._counters.clear()
+
+    # Recording
+    def span(self, name: str, category: str = "app", **args):
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, category, args)
+
+    def count(self, name: str, value: int = 1):
+        if not self.enabled:
+            return
+        with self._lock:
+            total = self._counters.get(name, 0) + value
+            self._counters[name] = total
+            self._events.append(("C", name, "counter", time.perf_counter_ns(), 0,
+                                 threading.get_ident(), {"value": total}))
+
+    def sql(self, statement: str):
+        """sqlite3 trace callback; logs each executed statement as an instant event."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._events.append(("i", "sql", "sql", time.perf_counter_ns(), 0,
+                                 threading.get_ident(), {"statement": statement}))
+
+    def _record_span(self, name: str, category: str, start: int, duration: int,
+                     args: Dict[str, Any]):
+        with self._lock:
+            self._events.append(("X", name, category, start, duration,
+                                 threading.get_ident(), args))
+            stats = self._stats.get(name)
+            if stats is None:
+                self._stats[name] = [1, duration, duration]
+            else:
+                stats[0] += 1
+                stats[1] += duration
+                if duration > stats[2]:
+                    stats[2] = duration
+
+    def traced(self, name: Optional[str] = None, category: str = "app") -> Callable:
+        """Decorator timing each call; list results are recorded as row counts."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                start = time.perf_counter_ns()
+                result = func(*args, **kwargs)
+                extra = {"rows": len(result)} if isinstance(result, list) else {}
+                self._record_span(span_name, category, start,
+                                  time.perf_counter_ns() - start, extra)
+                return result
+            return wrapper
+        return decorator
+
+    # Reporting
+    def summary(self) -> List[Tuple[str, int, float, float, float]]:
+        """(name, calls, total ms, average ms, max ms), slowest total first."""
+        with self._lock:
+            rows = [
+                (name, count, total / 1e6, total / count / 1e6, peak / 1e6)
+                for name, (count, total, peak) in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row[2], reverse=True)
+        return rows
+
+    def counters(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters)
+
+    def event_count(self) -> int:
+        return len(self._events)
+
+    def export_chrome_trace(self, path: str):
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+        trace_events = []
+        for phase, name, category, start, duration, tid, args in events:
+            event = {
+                "name": name,
+                "cat": category,
+                "ph": phase,
+                "ts": (start - self._origin) / 1000,
+                "pid": pid,
+                "tid": tid,
+                "args": args,
+            }
+            if phase == "X":
+                event["dur"] = duration / 1000
+            elif phase == "i":
+                event["s"] = "t"
+            trace_events.append(event)
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, handle)
+
+
+tracer = Tracer()
+
+# Allow tracing from process start, e.g. PSLIBRARY_TRACE=sql for the query log too
+if os.environ.get("PSLIBRARY_TRACE"):
+    tracer.enable(log_sql=os.environ["PSLIBRARY_TRACE"].lower() == "sql")
\ No newline at end of file
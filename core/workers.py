@@ -0,0 +1,41 @@
+"""
+Process-pool fan-out for CPU-bound passes over script content
+(fingerprints in core/duplicates.py, symbols in core/symbols.py).
+"""
+
+from typing import Callable, Iterable, Iterator, TypeVar
+
+
+# Below this many items the pool start-up costs more than it saves
+POOL_THRESHOLD = 2000
+
+_Chunk = TypeVar("_Chunk")
+_Result = TypeVar("_Result")
+
+
+def run_chunked(fn: Callable[[_Chunk], _Result], chunks: Iterable[_Chunk], workers: int,
+                items: int, threshold: int = POOL_THRESHOLD) -> Iterator[_Result]:
+    """Yield fn(chunk) for each chunk, in order.
+
+    items is the total the chunks hold; with fewer than threshold of them,
+    or a single worker, everything runs in this process. Otherwise fn runs
+    in a pool of workers processes, so it must be a module-level function.
+    chunks is only read a few chunks ahead of the results taken, which
+    bounds the content held in memory when it reads from the library.
+    """
+    if workers <= 1 or items < threshold:
+        for chunk in chunks:
+            yield fn(chunk)
+        return
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # spawn: safe to start from GUI threads, and the default on Windows anyway
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        pending = []
+        for chunk in chunks:
+            pending.append(pool.submit(fn, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.pop(0).result()
+        for future in pending:
+            yield future.result()
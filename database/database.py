@@ -1,20 +1,55 @@
 import sqlite3
 import os
-from typing import List, Optional, Tuple
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime
 from contextlib import contextmanager
-from .models import Folder, Script
+from .models import Folder, Script, SavedSearch, FolderStats, SyncTarget, SyncStateEntry
+from .query import ScriptQuery
+from .migrations import Migration, migrate
+from core.tracing import tracer
+
+
+# Every scripts column, in Script field order (see Script._from_row)
+SCRIPT_COLUMNS = ("id, name, folder_id, content, description, author, environment_tag, "
+                  "file_type, created_date, modified_date, last_opened_date")
+# The same without content: rows for scripts whose content is left unloaded
+SCRIPT_SUMMARY_COLUMNS = SCRIPT_COLUMNS.replace("content", "NULL AS content", 1)
+FOLDER_COLUMNS = "id, name, parent_id, created_date, path"
+
+# Listing columns: everything except content
+SUMMARY_COLUMNS = ("id, name, folder_id, description, author, environment_tag, "
+                   "file_type, created_date, modified_date, last_opened_date")
+
+# Change log entries kept for clients catching up (see core/change_feed.py)
+CHANGE_LOG_KEEP = 100000
+
+# (id, modified_date, folder path) - enough to validate a cached copy
+_STAMP_SQL = '''
+    SELECT s.id, s.modified_date, f.path FROM scripts s
+    LEFT JOIN folders f ON f.id = s.folder_id
+'''
 
 
 class DatabaseManager:
     def __init__(self, db_path: str = "script_library.db"):
         self.db_path = db_path
+        self._local = threading.local()
         self.init_database()
     
     @contextmanager
     def get_connection(self):
+        shared = getattr(self._local, "conn", None)
+        if shared is not None:
+            # Inside transaction(): reuse its connection, it commits at the end
+            yield shared
+            return
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
+        # Off by default in SQLite; the schema relies on ON DELETE CASCADE
+        conn.execute("PRAGMA foreign_keys = ON")
+        if tracer.log_sql:
+            conn.set_trace_callback(tracer.sql)
         try:
             yield conn
             conn.commit()
@@ -24,45 +59,45 @@ class DatabaseManager:
         finally:
             conn.close()
     
+    @contextmanager
+    def using_connection(self, conn: sqlite3.Connection):
+        """Route this thread's get_connection() calls to conn (e.g. from a pool).
+
+        The caller owns conn; nothing is committed or closed here.
+        """
+        previous = getattr(self._local, "conn", None)
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = previous
+    
+    @contextmanager
+    def transaction(self):
+        """Group several operations into a single commit on this thread.
+
+        Every get_connection() call made inside the block shares one
+        connection; everything is committed together on exit or rolled back
+        if an exception escapes. Nested transactions join the outer one.
+        """
+        if getattr(self._local, "conn", None) is not None:
+            yield self._local.conn
+            return
+        with self.get_connection() as conn, self.using_connection(conn):
+            yield conn
+    
+    @tracer.traced(category="db")
     def init_database(self):
+        """Create or upgrade the schema (see database/migrations.py)."""
+        migrate(self.db_path, MIGRATIONS)
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            
-            # Create folders table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS folders (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    parent_id INTEGER,
-                    created_date TIMESTAMP NOT NULL,
-                    path TEXT NOT NULL,
-                    FOREIGN KEY (parent_id) REFERENCES folders(id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Create scripts table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS scripts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    folder_id INTEGER,
-                    content TEXT NOT NULL DEFAULT '',
-                    description TEXT NOT NULL DEFAULT '',
-                    author TEXT NOT NULL DEFAULT '',
-                    environment_tag TEXT NOT NULL DEFAULT 'Testing',
-                    file_type TEXT NOT NULL DEFAULT 'ps1',
-                    created_date TIMESTAMP NOT NULL,
-                    modified_date TIMESTAMP NOT NULL,
-                    last_opened_date TIMESTAMP NOT NULL,
-                    FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE
-                )
-            ''')
-            
-            # Create indexes for better search performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_name ON scripts(name)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_content ON scripts(content)')
+            conn.execute('''
+                DELETE FROM change_log
+                WHERE seq <= (SELECT MAX(seq) FROM change_log) - ?
+            ''', (CHANGE_LOG_KEEP,))
     
     # Folder operations
+    @tracer.traced(category="db")
     def create_folder(self, folder: Folder) -> int:
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -70,49 +105,227 @@ class DatabaseManager:
                 INSERT INTO folders (name, parent_id, created_date, path)
                 VALUES (?, ?, ?, ?)
             ''', (folder.name, folder.parent_id, folder.created_date, folder.path))
-            return cursor.lastrowid
+            folder_id = cursor.lastrowid
+            # The new folder's ancestors are its parent's ancestors plus itself
+            cursor.execute('''
+                INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+                SELECT ancestor_id, ?, depth + 1 FROM folder_closure WHERE descendant_id = ?
+                UNION ALL SELECT ?, ?, 0
+            ''', (folder_id, folder.parent_id, folder_id, folder_id))
+            cursor.execute('INSERT INTO folder_stats (folder_id) VALUES (?)', (folder_id,))
+            return folder_id
     
+    @tracer.traced(category="db")
     def get_folder(self, folder_id: int) -> Optional[Folder]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM folders WHERE id = ?', (folder_id,))
+            cursor.execute(f'SELECT {FOLDER_COLUMNS} FROM folders WHERE id = ?', (folder_id,))
             row = cursor.fetchone()
             if row:
                 return self._row_to_folder(row)
             return None
     
-    def get_all_folders(self) -> List[Folder]:
+    @tracer.traced(category="db")
+    def get_folder_by_path(self, path: str) -> Optional[Folder]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM folders ORDER BY name')
+            cursor.execute(f'SELECT {FOLDER_COLUMNS} FROM folders WHERE path = ?', (path,))
+            row = cursor.fetchone()
+            if row:
+                return self._row_to_folder(row)
+            return None
+    
+    @tracer.traced(category="db")
+    def get_all_folders(self) -> List[Folder]:
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(f'SELECT {FOLDER_COLUMNS} FROM folders ORDER BY name')
             return [self._row_to_folder(row) for row in cursor.fetchall()]
     
+    @tracer.traced(category="db")
     def get_child_folders(self, parent_id: Optional[int]) -> List[Folder]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             if parent_id is None:
-                cursor.execute('SELECT * FROM folders WHERE parent_id IS NULL ORDER BY name')
+                cursor.execute(f'SELECT {FOLDER_COLUMNS} FROM folders WHERE parent_id IS NULL ORDER BY name')
             else:
-                cursor.execute('SELECT * FROM folders WHERE parent_id = ? ORDER BY name', (parent_id,))
+                cursor.execute(f'SELECT {FOLDER_COLUMNS} FROM folders WHERE parent_id = ? ORDER BY name', (parent_id,))
             return [self._row_to_folder(row) for row in cursor.fetchall()]
     
+    @tracer.traced(category="db")
     def update_folder(self, folder: Folder) -> bool:
+        """Save a folder; a new parent or path is applied to its whole subtree."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('SELECT parent_id, path FROM folders WHERE id = ?', (folder.id,))
+            previous = cursor.fetchone()
+            if previous is None:
+                return False
             cursor.execute('''
                 UPDATE folders 
                 SET name = ?, parent_id = ?, path = ?
                 WHERE id = ?
             ''', (folder.name, folder.parent_id, folder.path, folder.id))
-            return cursor.rowcount > 0
+            if previous['parent_id'] != folder.parent_id:
+                self._move_subtree_closure(cursor, folder.id, folder.parent_id)
+            if previous['path'] != folder.path:
+                # Descendants share the old prefix: swap it in one statement
+                cursor.execute('''
+                    UPDATE folders SET path = ? || substr(path, ?)
+                    WHERE id IN (SELECT descendant_id FROM folder_closure
+                                 WHERE ancestor_id = ? AND depth > 0)
+                ''', (folder.path, len(previous['path']) + 1, folder.id))
+            return True
+    
+    def _move_subtree_closure(self, cursor, folder_id: int, new_parent_id: Optional[int]):
+        # Detach the subtree from its old ancestors...
+        cursor.execute('''
+            DELETE FROM folder_closure
+            WHERE descendant_id IN (SELECT descendant_id FROM folder_closure WHERE ancestor_id = ?)
+              AND ancestor_id NOT IN (SELECT descendant_id FROM folder_closure WHERE ancestor_id = ?)
+        ''', (folder_id, folder_id))
+        # ...and attach it below every ancestor of the new parent
+        if new_parent_id is not None:
+            cursor.execute('''
+                INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+                SELECT above.ancestor_id, below.descendant_id, above.depth + below.depth + 1
+                FROM folder_closure above, folder_closure below
+                WHERE above.descendant_id = ? AND below.ancestor_id = ?
+            ''', (new_parent_id, folder_id))
+    
+    @tracer.traced(category="db")
+    def get_subtree_folders(self, folder_id: int) -> List[Folder]:
+        """All folders below folder_id (not itself), shallowest first."""
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute('''
+                SELECT f.id, f.name, f.parent_id, f.created_date, f.path
+                FROM folder_closure c JOIN folders f ON f.id = c.descendant_id
+                WHERE c.ancestor_id = ? AND c.depth > 0
+                ORDER BY c.depth, f.name
+            ''', (folder_id,))
+            return [self._row_to_folder(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def is_descendant(self, folder_id: int, ancestor_id: int) -> bool:
+        """True if folder_id is ancestor_id or lies anywhere below it."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT 1 FROM folder_closure WHERE ancestor_id = ? AND descendant_id = ?
+            ''', (ancestor_id, folder_id))
+            return cursor.fetchone() is not None
+    
+    @tracer.traced(category="db")
+    def rebuild_folder_closure(self):
+        """Recompute the closure table from folders.parent_id."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM folder_closure')
+            cursor.execute('''
+                WITH RECURSIVE ancestry(ancestor_id, descendant_id, depth) AS (
+                    SELECT id, id, 0 FROM folders
+                    UNION ALL
+                    SELECT f.parent_id, a.descendant_id, a.depth + 1 FROM ancestry a
+                    JOIN folders f ON f.id = a.ancestor_id
+                    WHERE f.parent_id IS NOT NULL
+                )
+                INSERT INTO folder_closure (ancestor_id, descendant_id, depth)
+                SELECT ancestor_id, descendant_id, depth FROM ancestry
+            ''')
     
+    @tracer.traced(category="db")
     def delete_folder(self, folder_id: int) -> bool:
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute('DELETE FROM folder_stats WHERE folder_id = ?', (folder_id,))
+            cursor.execute('DELETE FROM folder_closure WHERE descendant_id = ?', (folder_id,))
             cursor.execute('DELETE FROM folders WHERE id = ?', (folder_id,))
             return cursor.rowcount > 0
     
+    @tracer.traced(category="db")
+    def delete_folder_tree(self, folder_id: int) -> Tuple[List[int], List[int]]:
+        """Delete a folder with all of its subfolders and scripts.
+
+        Returns the removed (folder ids, script ids). Scripts, stats and sync
+        targets below the folder go with it through ON DELETE CASCADE.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT descendant_id FROM folder_closure WHERE ancestor_id = ?',
+                           (folder_id,))
+            folder_ids = [row[0] for row in cursor.fetchall()]
+            if not folder_ids:
+                return [], []
+            cursor.execute('''
+                SELECT id FROM scripts WHERE folder_id IN
+                (SELECT descendant_id FROM folder_closure WHERE ancestor_id = ?)
+            ''', (folder_id,))
+            script_ids = [row[0] for row in cursor.fetchall()]
+            cursor.execute('''
+                DELETE FROM folder_closure WHERE descendant_id IN
+                (SELECT descendant_id FROM folder_closure WHERE ancestor_id = ?)
+            ''', (folder_id,))
+            cursor.execute('DELETE FROM folders WHERE id = ?', (folder_id,))
+            return folder_ids, script_ids
+    
+    # Folder stats
+    @tracer.traced(category="db")
+    def get_folder_stats(self, folder_id: int) -> Optional[FolderStats]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM folder_stats WHERE folder_id = ?', (folder_id,))
+            row = cursor.fetchone()
+            return self._row_to_folder_stats(row) if row else None
+    
+    @tracer.traced(category="db")
+    def get_all_folder_stats(self) -> Dict[int, FolderStats]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM folder_stats')
+            return {row['folder_id']: self._row_to_folder_stats(row) for row in cursor.fetchall()}
+    
+    @tracer.traced(category="db")
+    def adjust_folder_stats(self, folder_id: int, count_delta: int,
+                            bytes_delta: int, modified: Optional[datetime]):
+        """Apply a delta to folder_id and all of its ancestors in one statement."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                UPDATE folder_stats
+                SET script_count = script_count + ?,
+                    total_bytes = total_bytes + ?,
+                    last_modified = CASE
+                        WHEN ? IS NULL THEN last_modified
+                        WHEN last_modified IS NULL OR last_modified < ? THEN ?
+                        ELSE last_modified END
+                WHERE folder_id IN (SELECT ancestor_id FROM folder_closure WHERE descendant_id = ?)
+            ''', (count_delta, bytes_delta, modified, modified, modified, folder_id))
+    
+    @tracer.traced(category="db")
+    def rebuild_folder_stats(self):
+        """Recompute every folder's subtree aggregates from scratch."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM folder_stats')
+            cursor.execute('''
+                WITH direct AS (
+                    SELECT folder_id, COUNT(*) AS script_count,
+                           SUM(LENGTH(CAST(content AS BLOB))) AS total_bytes,
+                           MAX(modified_date) AS last_modified
+                    FROM scripts WHERE folder_id IS NOT NULL GROUP BY folder_id
+                )
+                INSERT INTO folder_stats (folder_id, script_count, total_bytes, last_modified)
+                SELECT f.id, COALESCE(SUM(d.script_count), 0), COALESCE(SUM(d.total_bytes), 0),
+                       MAX(d.last_modified)
+                FROM folders f
+                LEFT JOIN folder_closure c ON c.ancestor_id = f.id
+                LEFT JOIN direct d ON d.folder_id = c.descendant_id
+                GROUP BY f.id
+            ''')
+    
     # Script operations
+    @tracer.traced(category="db")
     def create_script(self, script: Script) -> int:
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -126,28 +339,114 @@ class DatabaseManager:
                   script.created_date, script.modified_date, script.last_opened_date))
             return cursor.lastrowid
     
+    @tracer.traced(category="db")
     def get_script(self, script_id: int) -> Optional[Script]:
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM scripts WHERE id = ?', (script_id,))
+            cursor.execute(f'SELECT {SCRIPT_COLUMNS} FROM scripts WHERE id = ?', (script_id,))
             row = cursor.fetchone()
             if row:
                 return self._row_to_script(row)
             return None
     
-    def get_scripts_by_folder(self, folder_id: Optional[int]) -> List[Script]:
+    @tracer.traced(category="db")
+    def get_script_content(self, script_id: int) -> Optional[str]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT content FROM scripts WHERE id = ?', (script_id,))
+            row = cursor.fetchone()
+            return row[0] if row else None
+    
+    @tracer.traced(category="db")
+    def get_script_footprint(self, script_id: int) -> Optional[Tuple[Optional[int], int]]:
+        """(folder_id, content size in bytes) as currently stored."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT folder_id, LENGTH(CAST(content AS BLOB)) FROM scripts WHERE id = ?',
+                           (script_id,))
+            row = cursor.fetchone()
+            return (row[0], row[1] or 0) if row else None
+    
+    @tracer.traced(category="db")
+    def get_script_by_name(self, folder_id: Optional[int], name: str,
+                           file_type: Optional[str] = None) -> Optional[Script]:
+        sql = f'SELECT {SCRIPT_COLUMNS} FROM scripts WHERE folder_id IS ? AND name = ?'
+        params = [folder_id, name]
+        if file_type:
+            sql += ' AND file_type = ?'
+            params.append(file_type)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql + ' ORDER BY id LIMIT 1', params)
+            row = cursor.fetchone()
+            if row:
+                return self._row_to_script(row)
+            return None
+    
+    @tracer.traced(category="db")
+    def get_script_stamp(self, script_id: int) -> Optional[Tuple[int, str, Optional[str]]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_STAMP_SQL + ' WHERE s.id = ?', (script_id,))
+            row = cursor.fetchone()
+            return tuple(row) if row else None
+    
+    @tracer.traced(category="db")
+    def find_script_stamp(self, folder_id: Optional[int], name: str,
+                          file_type: Optional[str] = None) -> Optional[Tuple[int, str, Optional[str]]]:
+        sql = _STAMP_SQL + ' WHERE s.folder_id IS ? AND s.name = ?'
+        params = [folder_id, name]
+        if file_type:
+            sql += ' AND s.file_type = ?'
+            params.append(file_type)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(sql + ' ORDER BY s.id LIMIT 1', params)
+            row = cursor.fetchone()
+            return tuple(row) if row else None
+    
+    @tracer.traced(category="db")
+    def get_scripts_by_folder(self, folder_id: Optional[int]) -> List[Script]:
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
             if folder_id is None:
-                cursor.execute('SELECT * FROM scripts WHERE folder_id IS NULL ORDER BY name')
+                cursor.execute(f'SELECT {SCRIPT_COLUMNS} FROM scripts WHERE folder_id IS NULL ORDER BY name')
             else:
-                cursor.execute('SELECT * FROM scripts WHERE folder_id = ? ORDER BY name', (folder_id,))
+                cursor.execute(f'SELECT {SCRIPT_COLUMNS} FROM scripts WHERE folder_id = ? ORDER BY name', (folder_id,))
+            return [self._row_to_script(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_all_script_summaries(self) -> List[Script]:
+        """Every script without its content (Script.content is None)."""
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(f'SELECT {SCRIPT_SUMMARY_COLUMNS} FROM scripts ORDER BY folder_id, name')
             return [self._row_to_script(row) for row in cursor.fetchall()]
     
+    @tracer.traced(category="db")
+    def get_all_scripts(self) -> List[Script]:
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(f'SELECT {SCRIPT_COLUMNS} FROM scripts ORDER BY folder_id, name')
+            return [self._row_to_script(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
     def update_script(self, script: Script) -> bool:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             script.modified_date = datetime.now()
+            if script.content is None:
+                # Content not loaded (or handed to an editor): keep what is stored
+                cursor.execute('''
+                    UPDATE scripts 
+                    SET name = ?, folder_id = ?, description = ?, 
+                        author = ?, environment_tag = ?, file_type = ?, 
+                        modified_date = ?, last_opened_date = ?
+                    WHERE id = ?
+                ''', (script.name, script.folder_id, script.description,
+                      script.author, script.environment_tag, script.file_type,
+                      script.modified_date, script.last_opened_date, script.id))
+                return cursor.rowcount > 0
             cursor.execute('''
                 UPDATE scripts 
                 SET name = ?, folder_id = ?, content = ?, description = ?, 
@@ -159,6 +458,7 @@ class DatabaseManager:
                   script.modified_date, script.last_opened_date, script.id))
             return cursor.rowcount > 0
     
+    @tracer.traced(category="db")
     def update_script_last_opened(self, script_id: int) -> bool:
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -169,44 +469,834 @@ class DatabaseManager:
             ''', (datetime.now(), script_id))
             return cursor.rowcount > 0
     
+    @tracer.traced(category="db")
     def delete_script(self, script_id: int) -> bool:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('DELETE FROM scripts WHERE id = ?', (script_id,))
             return cursor.rowcount > 0
     
-    def search_scripts(self, query: str) -> List[Script]:
+    # Bulk script operations: ids go through a temp table, so any number fits
+    def _stage_ids(self, cursor, ids: Iterable[int]):
+        cursor.execute('CREATE TEMP TABLE IF NOT EXISTS staged_ids (id INTEGER PRIMARY KEY)')
+        cursor.execute('DELETE FROM staged_ids')
+        cursor.executemany('INSERT OR IGNORE INTO staged_ids (id) VALUES (?)',
+                           ((item_id,) for item_id in ids))
+    
+    @tracer.traced(category="db")
+    def get_script_footprints(self, script_ids: Iterable[int]) -> Dict[Optional[int], Tuple[int, int]]:
+        """Per folder: how many of the given scripts it holds and their total bytes."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            search_pattern = f'%{query}%'
+            self._stage_ids(cursor, script_ids)
+            cursor.execute('''
+                SELECT folder_id, COUNT(*), COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0)
+                FROM scripts WHERE id IN (SELECT id FROM staged_ids) GROUP BY folder_id
+            ''')
+            return {row[0]: (row[1], row[2]) for row in cursor.fetchall()}
+    
+    @tracer.traced(category="db")
+    def get_scripts(self, script_ids: Iterable[int]) -> List[Script]:
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            self._stage_ids(cursor, script_ids)
+            cursor.execute(f'SELECT {SCRIPT_COLUMNS} FROM scripts WHERE id IN (SELECT id FROM staged_ids)')
+            return [self._row_to_script(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def delete_scripts(self, script_ids: Iterable[int]) -> List[int]:
+        """Delete many scripts in one statement; returns the ids that existed."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_ids(cursor, script_ids)
+            cursor.execute('SELECT id FROM scripts WHERE id IN (SELECT id FROM staged_ids)')
+            deleted = [row[0] for row in cursor.fetchall()]
+            cursor.execute('DELETE FROM scripts WHERE id IN (SELECT id FROM staged_ids)')
+            return deleted
+    
+    @tracer.traced(category="db")
+    def move_scripts(self, script_ids: Iterable[int], folder_id: Optional[int]) -> int:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_ids(cursor, script_ids)
             cursor.execute('''
-                SELECT * FROM scripts 
+                UPDATE scripts SET folder_id = ?, modified_date = ?
+                WHERE id IN (SELECT id FROM staged_ids)
+            ''', (folder_id, datetime.now()))
+            return cursor.rowcount
+    
+    @tracer.traced(category="db")
+    def get_script_names(self) -> List[Tuple[int, str, str, Optional[int]]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, name, file_type, folder_id FROM scripts')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def search_scripts(self, query: str) -> List[Script]:
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            search_pattern = f'%{query}%'
+            cursor.execute(f'''
+                SELECT {SCRIPT_COLUMNS} FROM scripts 
                 WHERE name LIKE ? OR content LIKE ? OR description LIKE ?
                 ORDER BY name
             ''', (search_pattern, search_pattern, search_pattern))
             return [self._row_to_script(row) for row in cursor.fetchall()]
     
+    @tracer.traced(category="db")
+    def query_scripts(self, query: ScriptQuery) -> List[Script]:
+        sql, params = query.compile(SCRIPT_COLUMNS)
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(sql, params)
+            return [self._row_to_script(row) for row in cursor.fetchall()]
+    
+    def iter_scripts(self, query: Optional[ScriptQuery] = None) -> Iterator[Script]:
+        """Yield matching scripts one at a time instead of building a list."""
+        sql, params = (query or ScriptQuery()).compile(SCRIPT_COLUMNS)
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            cursor.execute(sql, params)
+            for row in cursor:
+                yield self._row_to_script(row)
+    
+    @tracer.traced(category="db")
+    def query_script_summaries(self, query: ScriptQuery) -> List[dict]:
+        """Like query_scripts but without content, as plain dicts."""
+        sql, params = query.compile(SUMMARY_COLUMNS)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(sql, params)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    # Saved search operations
+    @tracer.traced(category="db")
+    def create_saved_search(self, search: SavedSearch) -> int:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO saved_searches (name, query_text, created_date)
+                VALUES (?, ?, ?)
+                ON CONFLICT(name) DO UPDATE SET query_text = excluded.query_text
+            ''', (search.name, search.query_text, search.created_date))
+            cursor.execute('SELECT id FROM saved_searches WHERE name = ?', (search.name,))
+            return cursor.fetchone()['id']
+    
+    @tracer.traced(category="db")
+    def get_saved_searches(self) -> List[SavedSearch]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM saved_searches ORDER BY name')
+            return [self._row_to_saved_search(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def delete_saved_search(self, search_id: int) -> bool:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM saved_searches WHERE id = ?', (search_id,))
+            return cursor.rowcount > 0
+    
+    # Settings operations
+    @tracer.traced(category="db")
+    def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT value FROM settings WHERE key = ?', (key,))
+            row = cursor.fetchone()
+            return row['value'] if row else default
+    
+    @tracer.traced(category="db")
+    def set_setting(self, key: str, value: str):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO settings (key, value) VALUES (?, ?)
+                ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            ''', (key, value))
+    
+    # Sync operations
+    @tracer.traced(category="db")
+    def create_sync_target(self, target: SyncTarget) -> int:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT INTO sync_targets (folder_id, directory, created_date)
+                VALUES (?, ?, ?)
+                ON CONFLICT(directory) DO UPDATE SET folder_id = excluded.folder_id
+            ''', (target.folder_id, target.directory, target.created_date))
+            cursor.execute('SELECT id FROM sync_targets WHERE directory = ?', (target.directory,))
+            return cursor.fetchone()['id']
+    
+    @tracer.traced(category="db")
+    def get_sync_targets(self) -> List[SyncTarget]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM sync_targets ORDER BY directory')
+            return [SyncTarget(id=row['id'], folder_id=row['folder_id'], directory=row['directory'],
+                               created_date=datetime.fromisoformat(row['created_date']))
+                    for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def delete_sync_target(self, target_id: int) -> bool:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM sync_state WHERE target_id = ?', (target_id,))
+            cursor.execute('DELETE FROM sync_targets WHERE id = ?', (target_id,))
+            return cursor.rowcount > 0
+    
+    @tracer.traced(category="db")
+    def get_sync_state(self, target_id: int) -> List[SyncStateEntry]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT script_id, rel_path, content_hash, file_mtime_ns, file_size, db_modified
+                FROM sync_state WHERE target_id = ?
+            ''', (target_id,))
+            return [SyncStateEntry(*row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def save_sync_state(self, target_id: int, entries: List[SyncStateEntry],
+                        removed_script_ids: List[int]):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO sync_state
+                    (target_id, script_id, rel_path, content_hash, file_mtime_ns, file_size, db_modified)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(target_id, e.script_id, e.rel_path, e.content_hash, e.file_mtime_ns,
+                   e.file_size, e.db_modified) for e in entries])
+            cursor.executemany('DELETE FROM sync_state WHERE target_id = ? AND script_id = ?',
+                               [(target_id, script_id) for script_id in removed_script_ids])
+    
+    # Duplicate detection cache (see core/duplicates.py)
+    @tracer.traced(category="db")
+    def get_script_modified_dates(self) -> List[Tuple[int, str]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT id, modified_date FROM scripts')
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_script_contents(self, script_ids: Iterable[int]) -> List[Tuple[int, str, str]]:
+        """(id, modified_date, content) for the given scripts."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_ids(cursor, script_ids)
+            cursor.execute('''
+                SELECT id, modified_date, content FROM scripts
+                WHERE id IN (SELECT id FROM staged_ids)
+            ''')
+            return [(row[0], row[1], row[2]) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_script_fingerprints(self) -> Dict[int, Tuple[str, str, bytes]]:
+        """script id -> (modified_date, content hash, signature)."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM script_fingerprints')
+            return {row['script_id']: (row['modified_date'], row['content_hash'], row['signature'])
+                    for row in cursor.fetchall()}
+    
+    @tracer.traced(category="db")
+    def save_script_fingerprints(self, rows: List[Tuple[int, str, str, bytes]]):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO script_fingerprints
+                    (script_id, modified_date, content_hash, signature)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
+    
+    # Symbol index operations
+    @tracer.traced(category="db")
+    def get_unindexed_symbol_script_ids(self) -> List[int]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id FROM scripts
+                WHERE id NOT IN (SELECT script_id FROM script_symbols_indexed)
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_script_sources(self, script_ids: Iterable[int]) -> List[Tuple[int, str, str]]:
+        """(id, file_type, content) for the given scripts."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_ids(cursor, script_ids)
+            cursor.execute('''
+                SELECT id, file_type, content FROM scripts
+                WHERE id IN (SELECT id FROM staged_ids)
+            ''')
+            return [(row[0], row[1], row[2]) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def save_script_index(self, entries: List[Tuple[int, List[tuple], List[tuple]]],
+                          skip_indexed: bool = False):
+        """Replace the symbols and references of each (script id, symbols, references).
+
+        Symbols are (kind, name, line, occurrences) and references (kind,
+        target_name, target_type, target_dir, line). With skip_indexed,
+        scripts whose index became current since the entries were computed
+        are left alone.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # Batches touch pages all over the (name, kind) b-tree; the default
+            # 2 MB page cache makes a full build several times slower
+            cursor.execute('PRAGMA cache_size = -65536')
+            if skip_indexed:
+                self._stage_ids(cursor, [entry[0] for entry in entries])
+                cursor.execute('''
+                    SELECT script_id FROM script_symbols_indexed
+                    WHERE script_id IN (SELECT id FROM staged_ids)
+                ''')
+                current = {row[0] for row in cursor.fetchall()}
+                entries = [entry for entry in entries if entry[0] not in current]
+            script_ids = [(entry[0],) for entry in entries]
+            cursor.executemany('DELETE FROM script_symbols WHERE script_id = ?', script_ids)
+            cursor.executemany('''
+                INSERT INTO script_symbols (kind, name, line, occurrences, script_id)
+                VALUES (?, ?, ?, ?, ?)
+            ''', [(*symbol, script_id) for script_id, symbols, _ in entries for symbol in symbols])
+            cursor.executemany('DELETE FROM script_references WHERE script_id = ?', script_ids)
+            cursor.executemany('''
+                INSERT INTO script_references
+                    (kind, target_name, target_type, target_dir, line, script_id)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [(*reference, script_id) for script_id, _, references in entries
+                  for reference in references])
+            # New references need resolving again (see core/dependencies.py)
+            cursor.executemany('DELETE FROM script_dependencies_resolved WHERE script_id = ?',
+                               script_ids)
+            cursor.executemany('INSERT OR IGNORE INTO script_symbols_indexed (script_id) VALUES (?)',
+                               script_ids)
+    
+    @tracer.traced(category="db")
+    def find_symbols(self, name: str, kinds: Iterable[str],
+                     limit: Optional[int] = None) -> List[Tuple[int, str, str, int, int]]:
+        """(script id, kind, name, line, occurrences) of a symbol, any case."""
+        kinds = list(kinds)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                SELECT script_id, kind, name, line, occurrences FROM script_symbols
+                WHERE name = ? AND kind IN ({", ".join("?" * len(kinds))})
+                ORDER BY kind, script_id LIMIT ?
+            ''', (name, *kinds, -1 if limit is None else limit))
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    # Dependency graph operations
+    @tracer.traced(category="db")
+    def get_unresolved_dependency_script_ids(self) -> List[int]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id FROM scripts
+                WHERE id NOT IN (SELECT script_id FROM script_dependencies_resolved)
+            ''')
+            return [row[0] for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_script_references(self, script_ids: Iterable[int]) -> List[Tuple[int, str, Optional[str], Optional[str]]]:
+        """(script id, target_name, target_type, target_dir) of each reference."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_ids(cursor, script_ids)
+            cursor.execute('''
+                SELECT script_id, target_name, target_type, target_dir FROM script_references
+                WHERE script_id IN (SELECT id FROM staged_ids)
+            ''')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_reference_lines(self, script_id: int) -> List[Tuple[str, str, Optional[str], int]]:
+        """(kind, target_name, target_type, line) of a script's references, in line order."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT kind, target_name, target_type, line FROM script_references
+                WHERE script_id = ? ORDER BY line
+            ''', (script_id,))
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_scripts_by_names(self, names: Iterable[str]) -> List[Tuple[int, str, str, Optional[int]]]:
+        """(id, name, file_type, folder_id) of scripts with any of the names, any case."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('CREATE TEMP TABLE IF NOT EXISTS staged_names (name TEXT PRIMARY KEY)')
+            cursor.execute('DELETE FROM staged_names')
+            cursor.executemany('INSERT OR IGNORE INTO staged_names (name) VALUES (?)',
+                               ((name.lower(),) for name in names))
+            cursor.execute('''
+                SELECT id, name, file_type, folder_id FROM scripts
+                WHERE lower(name) IN (SELECT name FROM staged_names)
+            ''')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_script_folder_ids(self, script_ids: Iterable[int]) -> List[Tuple[int, Optional[int]]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._stage_ids(cursor, script_ids)
+            cursor.execute('SELECT id, folder_id FROM scripts WHERE id IN (SELECT id FROM staged_ids)')
+            return [tuple(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def save_script_dependencies(self, entries: List[Tuple[int, List[int]]]):
+        """Replace the resolved edges of each (script id, [depends-on ids])."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            script_ids = [(script_id,) for script_id, _ in entries]
+            cursor.executemany('DELETE FROM script_dependencies WHERE script_id = ?', script_ids)
+            cursor.executemany('''
+                INSERT INTO script_dependencies (script_id, depends_on_id) VALUES (?, ?)
+            ''', [(script_id, target) for script_id, targets in entries for target in targets])
+            cursor.executemany('''
+                INSERT OR IGNORE INTO script_dependencies_resolved (script_id) VALUES (?)
+            ''', script_ids)
+    
+    @tracer.traced(category="db")
+    def get_dependency_closure(self, script_id: int, reverse: bool = False) -> List[Tuple[int, bool]]:
+        """(script id, direct) of everything reachable over dependency edges.
+
+        reverse follows edges backwards: the scripts that depend on script_id.
+        """
+        source, target = ("depends_on_id", "script_id") if reverse else ("script_id", "depends_on_id")
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            # UNION (not UNION ALL) visits each script once, so cycles terminate
+            cursor.execute(f'''
+                WITH RECURSIVE reachable(id) AS (
+                    SELECT ?
+                    UNION
+                    SELECT d.{target} FROM script_dependencies d
+                    JOIN reachable r ON d.{source} = r.id
+                )
+                SELECT id, id IN (SELECT {target} FROM script_dependencies WHERE {source} = ?)
+                FROM reachable WHERE id != ? ORDER BY id
+            ''', (script_id, script_id, script_id))
+            return [(row[0], bool(row[1])) for row in cursor.fetchall()]
+    
+    # Change log
+    @tracer.traced(category="db")
+    def get_latest_change_seq(self) -> int:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM change_log')
+            return cursor.fetchone()[0]
+    
+    @tracer.traced(category="db")
+    def get_changes_since(self, seq: int) -> Tuple[Optional[int], List[Tuple[int, str, int, str]]]:
+        """(oldest seq still logged, [(seq, item_type, item_id, action)] after seq)."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT MIN(seq) FROM change_log')
+            oldest = cursor.fetchone()[0]
+            cursor.execute('''
+                SELECT seq, item_type, item_id, action FROM change_log
+                WHERE seq > ? ORDER BY seq
+            ''', (seq,))
+            return oldest, [tuple(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_script_summaries(self, script_ids: Iterable[int]) -> List[Script]:
+        """The given scripts without their content (Script.content is None)."""
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            self._stage_ids(cursor, script_ids)
+            cursor.execute(f'''
+                SELECT {SCRIPT_SUMMARY_COLUMNS} FROM scripts
+                WHERE id IN (SELECT id FROM staged_ids)
+            ''')
+            return [self._row_to_script(row) for row in cursor.fetchall()]
+    
+    @tracer.traced(category="db")
+    def get_folders(self, folder_ids: Iterable[int]) -> List[Folder]:
+        with self.get_connection() as conn:
+            cursor = self._row_cursor(conn)
+            self._stage_ids(cursor, folder_ids)
+            cursor.execute(f'''
+                SELECT {FOLDER_COLUMNS} FROM folders
+                WHERE id IN (SELECT id FROM staged_ids) ORDER BY path
+            ''')
+            return [self._row_to_folder(row) for row in cursor.fetchall()]
+    
     # Helper methods
-    def _row_to_folder(self, row) -> Folder:
-        return Folder(
+    def _row_to_saved_search(self, row) -> SavedSearch:
+        return SavedSearch(
             id=row['id'],
             name=row['name'],
-            parent_id=row['parent_id'],
-            created_date=datetime.fromisoformat(row['created_date']),
-            path=row['path']
+            query_text=row['query_text'],
+            created_date=datetime.fromisoformat(row['created_date'])
         )
     
-    def _row_to_script(self, row) -> Script:
-        return Script(
-            id=row['id'],
-            name=row['name'],
+    def _row_to_folder_stats(self, row) -> FolderStats:
+        last_modified = row['last_modified']
+        return FolderStats(
             folder_id=row['folder_id'],
-            content=row['content'],
-            description=row['description'],
-            author=row['author'],
-            environment_tag=row['environment_tag'],
-            file_type=row['file_type'],
-            created_date=datetime.fromisoformat(row['created_date']),
-            modified_date=datetime.fromisoformat(row['modified_date']),
-            last_opened_date=datetime.fromisoformat(row['last_opened_date'])
-        )
\ No newline at end of file
+            script_count=row['script_count'],
+            total_bytes=row['total_bytes'],
+            last_modified=datetime.fromisoformat(last_modified) if last_modified else None
+        )
+    
+    def _row_cursor(self, conn):
+        # Plain tuples for bulk listings: cheaper than sqlite3.Row, and the
+        # converters below only need positions
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+    
+    # Rows selected with FOLDER_COLUMNS / SCRIPT_COLUMNS (or SCRIPT_SUMMARY_COLUMNS,
+    # which leaves content unloaded); timestamps are decoded on first use
+    _row_to_folder = staticmethod(Folder._from_row)
+    _row_to_script = staticmethod(Script._from_row)
+
+
+# Schema history (see database/migrations.py). Append new versions to MIGRATIONS;
+# a version that has shipped is never changed, since libraries past it skip it
+def _create_baseline_schema(cursor: sqlite3.Cursor):
+    """Version 1: the schema as it was before versioning.
+
+    Libraries from before then report user_version 0 with some or all of
+    these objects already there, hence IF NOT EXISTS throughout.
+    """
+    # Create folders table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS folders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            parent_id INTEGER,
+            created_date TIMESTAMP NOT NULL,
+            path TEXT NOT NULL,
+            FOREIGN KEY (parent_id) REFERENCES folders(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Create scripts table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS scripts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            folder_id INTEGER,
+            content TEXT NOT NULL DEFAULT '',
+            description TEXT NOT NULL DEFAULT '',
+            author TEXT NOT NULL DEFAULT '',
+            environment_tag TEXT NOT NULL DEFAULT 'Testing',
+            file_type TEXT NOT NULL DEFAULT 'ps1',
+            created_date TIMESTAMP NOT NULL,
+            modified_date TIMESTAMP NOT NULL,
+            last_opened_date TIMESTAMP NOT NULL,
+            FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Create saved searches table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS saved_searches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL UNIQUE,
+            query_text TEXT NOT NULL,
+            created_date TIMESTAMP NOT NULL
+        )
+    ''')
+    
+    # Create settings table (key/value application state)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS settings (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )
+    ''')
+    
+    # Create folder closure table: one row per (ancestor, descendant) pair,
+    # including each folder paired with itself at depth 0
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS folder_closure (
+            ancestor_id INTEGER NOT NULL,
+            descendant_id INTEGER NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor_id, descendant_id)
+        ) WITHOUT ROWID
+    ''')
+    
+    # Create folder stats table (subtree aggregates, see ScriptManager)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS folder_stats (
+            folder_id INTEGER PRIMARY KEY,
+            script_count INTEGER NOT NULL DEFAULT 0,
+            total_bytes INTEGER NOT NULL DEFAULT 0,
+            last_modified TIMESTAMP,
+            FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Create sync tables (library subtree <-> directory mirrors)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_targets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            folder_id INTEGER,
+            directory TEXT NOT NULL UNIQUE,
+            created_date TIMESTAMP NOT NULL,
+            FOREIGN KEY (folder_id) REFERENCES folders(id) ON DELETE CASCADE
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sync_state (
+            target_id INTEGER NOT NULL,
+            script_id INTEGER NOT NULL,
+            rel_path TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            file_mtime_ns INTEGER NOT NULL,
+            file_size INTEGER NOT NULL,
+            db_modified TEXT NOT NULL,
+            PRIMARY KEY (target_id, script_id),
+            FOREIGN KEY (target_id) REFERENCES sync_targets(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Create duplicate detection cache, valid while modified_date matches
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS script_fingerprints (
+            script_id INTEGER PRIMARY KEY,
+            modified_date TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            signature BLOB NOT NULL,
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+        )
+    ''')
+    
+    # Create symbol index tables (see core/symbols.py): one row per distinct
+    # symbol per script, and the scripts whose rows are current
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS script_symbols (
+            name TEXT NOT NULL COLLATE NOCASE,
+            kind TEXT NOT NULL,
+            script_id INTEGER NOT NULL,
+            line INTEGER NOT NULL,
+            occurrences INTEGER NOT NULL,
+            PRIMARY KEY (name, kind, script_id),
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS script_symbols_indexed (
+            script_id INTEGER PRIMARY KEY,
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+        )
+    ''')
+    # Content changed by anything but ScriptManager (which re-indexes in
+    # the same transaction) leaves the script to SymbolIndex.refresh
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS scripts_symbols_stale
+        AFTER UPDATE OF content, file_type ON scripts
+        WHEN OLD.content IS NOT NEW.content OR OLD.file_type IS NOT NEW.file_type
+        BEGIN
+            DELETE FROM script_symbols WHERE script_id = NEW.id;
+            DELETE FROM script_symbols_indexed WHERE script_id = NEW.id;
+        END
+    ''')
+    
+    # Create dependency tables (see core/dependencies.py): references as
+    # written, and the resolved script -> script edges cached from them
+    cursor.execute(
+        "SELECT EXISTS(SELECT 1 FROM sqlite_master WHERE name = 'script_references')"
+    )
+    had_references = cursor.fetchone()[0]
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS script_references (
+            script_id INTEGER NOT NULL,
+            kind TEXT NOT NULL,
+            target_name TEXT NOT NULL,
+            target_type TEXT,
+            target_dir TEXT,
+            line INTEGER NOT NULL,
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+        )
+    ''')
+    if not had_references:
+        # Scripts indexed before references were extracted need re-indexing
+        cursor.execute('DELETE FROM script_symbols_indexed')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS script_dependencies (
+            script_id INTEGER NOT NULL,
+            depends_on_id INTEGER NOT NULL,
+            PRIMARY KEY (script_id, depends_on_id),
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE,
+            FOREIGN KEY (depends_on_id) REFERENCES scripts(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS script_dependencies_resolved (
+            script_id INTEGER PRIMARY KEY,
+            FOREIGN KEY (script_id) REFERENCES scripts(id) ON DELETE CASCADE
+        )
+    ''')
+    # Drop cached edges whose resolution may have changed: the script's own
+    # references or location, or a script with a name it refers to
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS scripts_references_stale
+        AFTER UPDATE OF content, file_type ON scripts
+        WHEN OLD.content IS NOT NEW.content OR OLD.file_type IS NOT NEW.file_type
+        BEGIN
+            DELETE FROM script_references WHERE script_id = NEW.id;
+            DELETE FROM script_dependencies_resolved WHERE script_id = NEW.id;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS scripts_dependencies_moved
+        AFTER UPDATE OF name, folder_id, file_type ON scripts
+        WHEN OLD.name IS NOT NEW.name OR OLD.folder_id IS NOT NEW.folder_id
+             OR OLD.file_type IS NOT NEW.file_type
+        BEGIN
+            DELETE FROM script_dependencies_resolved WHERE script_id = NEW.id
+                OR script_id IN (SELECT script_id FROM script_references
+                                 WHERE target_name IN (lower(OLD.name), lower(NEW.name)));
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS scripts_dependencies_added
+        AFTER INSERT ON scripts
+        BEGIN
+            DELETE FROM script_dependencies_resolved WHERE script_id IN
+                (SELECT script_id FROM script_references WHERE target_name = lower(NEW.name));
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS scripts_dependencies_removed
+        AFTER DELETE ON scripts
+        BEGIN
+            DELETE FROM script_dependencies_resolved WHERE script_id IN
+                (SELECT script_id FROM script_references WHERE target_name = lower(OLD.name));
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS folders_dependencies_moved
+        AFTER UPDATE OF path ON folders
+        WHEN OLD.path IS NOT NEW.path
+        BEGIN
+            DELETE FROM script_dependencies_resolved WHERE script_id IN
+                (SELECT id FROM scripts WHERE folder_id = NEW.id
+                 UNION
+                 SELECT r.script_id FROM script_references r
+                 JOIN scripts s ON r.target_name = lower(s.name)
+                 WHERE s.folder_id = NEW.id);
+        END
+    ''')
+    
+    # Change log: one row per script/folder insert, update or delete, in
+    # commit order, so other clients can catch up on just what changed.
+    # Opening a script (last_opened_date only) is not a change.
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS change_log (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_type TEXT NOT NULL,
+            item_id INTEGER NOT NULL,
+            action TEXT NOT NULL
+        )
+    ''')
+    for table, item_type, columns in (
+            ("scripts", "script", "name, folder_id, content, description, author, "
+                                  "environment_tag, file_type, modified_date"),
+            ("folders", "folder", "name, parent_id, path")):
+        for action, event, row in (("insert", "INSERT", "NEW"),
+                                   ("update", f"UPDATE OF {columns}", "NEW"),
+                                   ("delete", "DELETE", "OLD")):
+            cursor.execute(f'''
+                CREATE TRIGGER IF NOT EXISTS {table}_change_log_{action}
+                AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO change_log (item_type, item_id, action)
+                    VALUES ('{item_type}', {row}.id, '{action}');
+                END
+            ''')
+    
+    # Create indexes for better search performance
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_name ON scripts(name)')
+    # (idx_scripts_content, created by earlier versions, is dropped by
+    # LibraryMaintenance; see database/maintenance.py)
+    
+    # Indexes backing structured queries (see database/query.py)
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_folder_name ON scripts(folder_id, name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_env_modified ON scripts(environment_tag, modified_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_modified ON scripts(modified_date)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_author ON scripts(author)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_folders_parent ON folders(parent_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_folders_path ON folders(path)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_closure_descendant ON folder_closure(descendant_id, depth)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_symbols_script ON script_symbols(script_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_references_script ON script_references(script_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_references_target ON script_references(target_name)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_dependencies_reverse ON script_dependencies(depends_on_id, script_id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_scripts_lower_name ON scripts(lower(name))')
+
+
+def _backfill_folder_closure(cursor: sqlite3.Cursor, chunk_size: int) -> int:
+    """Version 2: closure rows for folders created before folder_closure existed.
+
+    A folder's rows are written together, so one with its depth-0 row is done.
+    """
+    # Starts with INSERT so that sqlite3 reports rowcount
+    cursor.execute('''
+        INSERT OR IGNORE INTO folder_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE ancestry(ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM (
+                SELECT id FROM folders
+                WHERE id NOT IN (SELECT descendant_id FROM folder_closure WHERE depth = 0)
+                LIMIT ?
+            )
+            UNION ALL
+            SELECT f.parent_id, a.descendant_id, a.depth + 1 FROM ancestry a
+            JOIN folders f ON f.id = a.ancestor_id
+            WHERE f.parent_id IS NOT NULL
+        )
+        SELECT ancestor_id, descendant_id, depth FROM ancestry
+    ''', (chunk_size,))
+    return cursor.rowcount
+
+
+def _backfill_folder_stats(cursor: sqlite3.Cursor, chunk_size: int) -> int:
+    """Version 3: subtree aggregates for folders created before folder_stats existed.
+
+    Children first: a folder's figures are its own scripts plus its
+    subfolders' rows, so every script is read once and no chunk has to
+    scan a whole subtree.
+    """
+    cursor.execute('''
+        INSERT INTO folder_stats (folder_id, script_count, total_bytes, last_modified)
+        WITH ready AS (
+            SELECT id FROM folders f
+            WHERE id NOT IN (SELECT folder_id FROM folder_stats)
+              AND NOT EXISTS (SELECT 1 FROM folders c WHERE c.parent_id = f.id
+                              AND c.id NOT IN (SELECT folder_id FROM folder_stats))
+            LIMIT ?
+        ), own AS (
+            SELECT r.id, COUNT(s.id) AS script_count,
+                   COALESCE(SUM(LENGTH(CAST(s.content AS BLOB))), 0) AS total_bytes,
+                   MAX(s.modified_date) AS last_modified
+            FROM ready r LEFT JOIN scripts s ON s.folder_id = r.id
+            GROUP BY r.id
+        ), below AS (
+            SELECT r.id, SUM(st.script_count) AS script_count, SUM(st.total_bytes) AS total_bytes,
+                   MAX(st.last_modified) AS last_modified
+            FROM ready r
+            JOIN folders c ON c.parent_id = r.id
+            JOIN folder_stats st ON st.folder_id = c.id
+            GROUP BY r.id
+        )
+        SELECT own.id, own.script_count + COALESCE(below.script_count, 0),
+               own.total_bytes + COALESCE(below.total_bytes, 0),
+               MAX(COALESCE(own.last_modified, below.last_modified),
+                   COALESCE(below.last_modified, own.last_modified))
+        FROM own LEFT JOIN below ON below.id = own.id
+    ''', (chunk_size,))
+    return cursor.rowcount
+
+
+MIGRATIONS = [
+    Migration(1, "baseline schema", _create_baseline_schema),
+    Migration(2, "folder closure table", backfill=_backfill_folder_closure),
+    Migration(3, "folder statistics", backfill=_backfill_folder_stats),
+]
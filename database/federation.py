@@ -0,0 +1,202 @@
+"""
+Several library files searched and listed together.
+
+Other teams' libraries are mounted read-only next to this one: a single
+connection opens this library and ATTACHes each mounted file, and every
+federated query is one UNION ALL statement across them instead of one
+query (and connection) per library. The connection stays open between
+queries and is rebuilt only when the set of mounts changes.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from database.database import DatabaseManager, FOLDER_COLUMNS, SCRIPT_SUMMARY_COLUMNS
+from database.models import Folder, Script
+from database.pool import read_only_uri
+from database.query import ScriptQuery
+from core.tracing import tracer
+
+
+# SQLite's default limit on attached databases
+MAX_MOUNTS = 10
+
+# Script rows plus the path of their folder, in the same database
+_SCRIPT_WITH_PATH_COLUMNS = (SCRIPT_SUMMARY_COLUMNS +
+                             ", (SELECT path FROM {schema}.folders f WHERE f.id = folder_id)")
+
+# Tables a file needs to be mounted (older libraries gain them once opened normally)
+_REQUIRED_TABLES = ("scripts", "folders", "folder_closure")
+
+
+class MountedLibrary(NamedTuple):
+    name: str
+    path: str
+
+
+class LibraryScript(NamedTuple):
+    library: Optional[str]  # mounted library name; None for this library
+    script: Script
+    folder_path: Optional[str]
+
+    @property
+    def path(self) -> str:
+        return f"{self.folder_path or ''}/{self.script.name}.{self.script.file_type}"
+
+
+class FederationError(Exception):
+    pass
+
+
+class LibraryFederation:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        # Mounts attached to _conn, in schema order (lib1, lib2, ...)
+        self._attached: List[MountedLibrary] = []
+        self.mounts: List[MountedLibrary] = [
+            MountedLibrary(entry["name"], entry["path"])
+            for entry in json.loads(db.get_setting("mounted_libraries", "[]"))
+        ]
+
+    # Mounts
+    def mount(self, path: str, name: Optional[str] = None) -> MountedLibrary:
+        path = os.path.abspath(path)
+        name = name or os.path.splitext(os.path.basename(path))[0]
+        if os.path.abspath(self.db.db_path) == path:
+            raise FederationError("this library is already open")
+        if any(mount.name == name or mount.path == path for mount in self.mounts):
+            raise FederationError(f"already mounted: {name}")
+        if len(self.mounts) >= MAX_MOUNTS:
+            raise FederationError(f"at most {MAX_MOUNTS} libraries can be mounted")
+        self._check_library(path)
+        mount = MountedLibrary(name, path)
+        self._save(self.mounts + [mount])
+        return mount
+
+    def unmount(self, name: str) -> bool:
+        remaining = [mount for mount in self.mounts if mount.name != name]
+        if len(remaining) == len(self.mounts):
+            return False
+        self._save(remaining)
+        return True
+
+    def _save(self, mounts: List[MountedLibrary]):
+        self.db.set_setting("mounted_libraries",
+                            json.dumps([mount._asdict() for mount in mounts]))
+        with self._lock:
+            self.mounts = mounts
+            self.close()
+
+    def _check_library(self, path: str):
+        if not os.path.isfile(path):
+            raise FederationError(f"no such file: {path}")
+        try:
+            conn = sqlite3.connect(read_only_uri(path), uri=True)
+            try:
+                tables = {row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table'")}
+            finally:
+                conn.close()
+        except sqlite3.DatabaseError as error:
+            raise FederationError(f"not a script library: {path} ({error})")
+        missing = [table for table in _REQUIRED_TABLES if table not in tables]
+        if missing:
+            raise FederationError(f"not a script library (or one from an older version; open it "
+                                  f"once to upgrade it): {path}")
+
+    # Connection
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Called with the lock held
+        if self._conn is None:
+            conn = sqlite3.connect(read_only_uri(self.db.db_path), uri=True,
+                                   check_same_thread=False)
+            self._attached = []
+            for mount in self.mounts:
+                try:
+                    conn.execute(f"ATTACH DATABASE ? AS lib{len(self._attached) + 1}",
+                                 (read_only_uri(mount.path),))
+                except sqlite3.DatabaseError:
+                    continue  # e.g. a share that is offline; the rest still work
+                self._attached.append(mount)
+            if tracer.log_sql:
+                conn.set_trace_callback(tracer.sql)
+            self._conn = conn
+        return self._conn
+
+    def available(self) -> List[MountedLibrary]:
+        """Mounted libraries that could be opened."""
+        with self._lock:
+            self._connection()
+            return list(self._attached)
+
+    def _execute(self, build) -> Tuple[List[MountedLibrary], List[tuple]]:
+        """Run the statement build(schemas) returns as (sql, params).
+
+        schemas is "main" followed by one name per attached library; rows
+        come back with the libraries those names stand for.
+        """
+        with self._lock:
+            conn = self._connection()
+            schemas = ["main"] + [f"lib{index}" for index in range(1, len(self._attached) + 1)]
+            sql, params = build(schemas)
+            return list(self._attached), conn.execute(sql, params).fetchall()
+
+    # Federated queries
+    @tracer.traced(category="db")
+    def query_scripts(self, query: ScriptQuery) -> List[LibraryScript]:
+        """Matching scripts from this and every mounted library, without content."""
+        attached, rows = self._execute(
+            lambda schemas: query.compile_union(_SCRIPT_WITH_PATH_COLUMNS, schemas))
+        names = [None] + [mount.name for mount in attached]
+        return [LibraryScript(names[row[0]], Script._from_row(row[1:-1]), row[-1]) for row in rows]
+
+    @tracer.traced(category="db")
+    def get_mounted_contents(self) -> Dict[str, Tuple[List[Folder], List[Script]]]:
+        """Folders (parents first) and scripts of each available mounted library.
+
+        Two statements however many libraries are mounted.
+        """
+        def folders_sql(schemas):
+            branches = [f"SELECT {index} AS library_index, "
+                        f"length(path) - length(replace(path, '/', '')) AS depth, "
+                        f"{FOLDER_COLUMNS} FROM {schema}.folders"
+                        for index, schema in enumerate(schemas) if index]
+            return f"SELECT * FROM ({' UNION ALL '.join(branches)}) ORDER BY depth, name", ()
+
+        def scripts_sql(schemas):
+            branches = [f"SELECT {index} AS library_index, {SCRIPT_SUMMARY_COLUMNS} "
+                        f"FROM {schema}.scripts"
+                        for index, schema in enumerate(schemas) if index]
+            return f"SELECT * FROM ({' UNION ALL '.join(branches)}) ORDER BY name", ()
+
+        if not self.available():
+            return {}
+        attached, folder_rows = self._execute(folders_sql)
+        _, script_rows = self._execute(scripts_sql)
+        contents = {mount.name: ([], []) for mount in attached}
+        for row in folder_rows:
+            contents[attached[row[0] - 1].name][0].append(Folder._from_row(row[2:]))
+        for row in script_rows:
+            contents[attached[row[0] - 1].name][1].append(Script._from_row(row[1:]))
+        return contents
+
+    @tracer.traced(category="db")
+    def get_script_content(self, library: Optional[str], script_id: int) -> Optional[str]:
+        def content_sql(schemas):
+            if library is None:
+                return "SELECT content FROM main.scripts WHERE id = ?", (script_id,)
+            for index, mount in enumerate(self._attached, start=1):
+                if mount.name == library:
+                    return f"SELECT content FROM {schemas[index]}.scripts WHERE id = ?", (script_id,)
+            raise FederationError(f"not mounted: {library}")
+        _, rows = self._execute(content_sql)
+        return rows[0][0] if rows else None
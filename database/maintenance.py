@@ -0,0 +1,205 @@
+"""
+Routine upkeep of the library file: planner statistics, reclaiming free
+pages, removing indexes that cost space without serving any query, and a
+size/fragmentation report.
+
+Everything here is safe to run while the library is in use. The idle-time
+pass (run) refreshes statistics with a sampling limit and reclaims free
+pages in small separate transactions, so other writers wait for one
+short step at most. A full VACUUM rewrites the whole file under an exclusive
+lock and is only ever run on request (vacuum).
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, NamedTuple, Optional
+from database.database import DatabaseManager
+from core.tracing import tracer
+
+
+# Indexes earlier versions created that no query can use, with the reason
+OBSOLETE_INDEXES = {
+    # LIKE '%term%' cannot use a b-tree, so this only duplicated every script body
+    "idx_scripts_content": "index over full script bodies; content searches cannot use it",
+}
+
+# Rows ANALYZE samples per index; enough for the planner, and fast on any size
+ANALYSIS_LIMIT = 1000
+
+# Free pages released per incremental-vacuum step (8 MB at the default page size)
+VACUUM_STEP_PAGES = 2048
+
+DEFAULT_INTERVAL_HOURS = 24
+
+_AUTO_VACUUM_MODES = {0: "none", 1: "full", 2: "incremental"}
+
+
+class StorageEntry(NamedTuple):
+    name: str
+    table: str
+    kind: str                 # "table" or "index"
+    pages: int
+    size: int                 # bytes on disk
+    unused: int               # bytes free inside its pages
+    fragmentation: float      # share of leaf pages not following the previous one
+
+
+class StorageReport(NamedTuple):
+    page_size: int
+    page_count: int
+    free_pages: int
+    auto_vacuum: str
+    entries: List[StorageEntry]   # empty if SQLite was built without dbstat
+
+
+class MaintenanceResult(NamedTuple):
+    dropped_indexes: List[str]
+    freed_pages: int
+    free_pages_left: int
+    seconds: float
+
+
+class LibraryMaintenance:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit, so each statement (and vacuum step) is its own short transaction
+        conn = sqlite3.connect(self.db.db_path, isolation_level=None)
+        if tracer.log_sql:
+            conn.set_trace_callback(tracer.sql)
+        return conn
+
+    # Schedule
+    def last_run(self) -> Optional[datetime]:
+        value = self.db.get_setting("maintenance_last")
+        return datetime.fromisoformat(value) if value else None
+
+    def is_due(self, now: Optional[datetime] = None) -> bool:
+        hours = float(self.db.get_setting("maintenance_interval_hours",
+                                          str(DEFAULT_INTERVAL_HOURS)) or 0)
+        if hours <= 0:
+            return False
+        last = self.last_run()
+        return last is None or (now or datetime.now()) - last >= timedelta(hours=hours)
+
+    # Idle-time pass
+    @tracer.traced(category="db")
+    def run(self, budget_seconds: float = 2.0) -> MaintenanceResult:
+        """Drop obsolete indexes, refresh statistics and reclaim free pages.
+
+        Reclaiming stops once budget_seconds have passed; the next run
+        carries on where this one stopped.
+        """
+        start = time.perf_counter()
+        dropped = self.drop_obsolete_indexes()
+        conn = self._connect()
+        try:
+            conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+            conn.execute("PRAGMA optimize")
+            freed = 0
+            incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            while incremental and free_pages and time.perf_counter() - start < budget_seconds:
+                # executescript steps the pragma to completion; execute() frees one page
+                conn.executescript(f"PRAGMA incremental_vacuum({VACUUM_STEP_PAGES})")
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                freed += free_pages - remaining
+                free_pages = remaining
+        finally:
+            conn.close()
+        self.db.set_setting("maintenance_last", datetime.now().replace(microsecond=0).isoformat())
+        return MaintenanceResult(dropped, freed, free_pages, time.perf_counter() - start)
+
+    def run_async(self, done: Optional[Callable[[Optional[MaintenanceResult], Optional[str]], None]] = None
+                  ) -> threading.Thread:
+        """Run on a worker thread; done(result, error) is called there when it ends."""
+        def work():
+            try:
+                result = self.run()
+            except sqlite3.Error as error:
+                # e.g. another client holding the write lock; the next pass retries
+                if done:
+                    done(None, str(error))
+                return
+            if done:
+                done(result, None)
+        thread = threading.Thread(target=work, name="library-maintenance", daemon=True)
+        thread.start()
+        return thread
+
+    def drop_obsolete_indexes(self) -> List[str]:
+        conn = self._connect()
+        try:
+            existing = {row[0] for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index'")}
+            dropped = [name for name in OBSOLETE_INDEXES if name in existing]
+            for name in dropped:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            return dropped
+        finally:
+            conn.close()
+
+    @tracer.traced(category="db")
+    def vacuum(self):
+        """Rewrite the whole file, switching it to incremental auto-vacuum.
+
+        Holds an exclusive lock for as long as the copy takes; afterwards
+        run() can give free pages back a few at a time.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        finally:
+            conn.close()
+
+    # Report
+    @tracer.traced(category="db")
+    def storage_report(self) -> StorageReport:
+        conn = self._connect()
+        try:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+            free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            auto_vacuum = _AUTO_VACUUM_MODES.get(conn.execute("PRAGMA auto_vacuum").fetchone()[0], "")
+            owners = {row[0]: (row[1], row[2]) for row in conn.execute(
+                "SELECT name, tbl_name, type FROM sqlite_master WHERE type IN ('table', 'index')")}
+            try:
+                # One pass over every page, in b-tree order
+                rows = conn.execute("SELECT name, pagetype, pgsize, unused, pageno FROM dbstat")
+                entries = self._summarize(rows, owners)
+            except sqlite3.OperationalError:
+                entries = []  # no dbstat in this SQLite build
+        finally:
+            conn.close()
+        return StorageReport(page_size, page_count, free_pages, auto_vacuum, entries)
+
+    @staticmethod
+    def _summarize(rows, owners: Dict[str, tuple]) -> List[StorageEntry]:
+        totals: Dict[str, List[int]] = {}
+        last_leaf: Dict[str, int] = {}
+        for name, page_type, page_size, unused, page_number in rows:
+            total = totals.get(name)
+            if total is None:
+                # pages, bytes, unused, leaf pages, leaf pages out of sequence
+                total = totals[name] = [0, 0, 0, 0, 0]
+            total[0] += 1
+            total[1] += page_size
+            total[2] += unused
+            if page_type == "leaf":
+                previous = last_leaf.get(name)
+                total[3] += 1
+                if previous is not None and page_number != previous + 1:
+                    total[4] += 1
+                last_leaf[name] = page_number
+        entries = []
+        for name, (pages, size, unused, leaves, scattered) in totals.items():
+            table, kind = owners.get(name, (name, "table"))
+            entries.append(StorageEntry(name, table, kind, pages, size, unused,
+                                        scattered / (leaves - 1) if leaves > 1 else 0.0))
+        entries.sort(key=lambda entry: entry.size, reverse=True)
+        return entries
@@ -0,0 +1,129 @@
+"""
+Schema versions, kept in PRAGMA user_version, and the migrations between them.
+
+Each Migration takes a library from version - 1 to version in two parts.
+The schema part (new tables, columns, indexes) runs in one short
+IMMEDIATE transaction together with the user_version bump, so a library is
+never left half-way through it, and two clients opening an old library at
+the same time apply it once. Rewriting existing rows (backfilling a column,
+moving data to new storage) goes in backfill instead, which is called
+repeatedly, one bounded chunk per transaction, until it reports nothing
+left to do. Other clients' reads and writes get through between chunks,
+so upgrading a large shared library never locks everyone out for the
+whole of it.
+
+A backfill picks the rows it still has to do (e.g. WHERE column IS NULL)
+rather than tracking an offset, so one that is interrupted simply carries
+on the next time the library is opened. Unfinished backfills are recorded
+in schema_backfills and finished before any later migration runs.
+"""
+
+import sqlite3
+import time
+from typing import Callable, List, NamedTuple, Optional, Set
+
+
+# Rows (or folders, scripts, ...) per backfill chunk, and the shortest pause
+# between chunks, which lets other connections take the write lock
+BACKFILL_CHUNK = 500
+BACKFILL_PAUSE = 0.005
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    schema: Optional[Callable[[sqlite3.Cursor], None]] = None
+    # (cursor, chunk size) -> rows handled by this chunk; 0 once finished
+    backfill: Optional[Callable[[sqlite3.Cursor, int], int]] = None
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _pending_backfills(conn: sqlite3.Connection) -> Set[int]:
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'schema_backfills'"
+    ).fetchone()
+    if not exists:
+        return set()
+    return {row[0] for row in conn.execute("SELECT version FROM schema_backfills")}
+
+
+def migrate(db_path: str, migrations: List[Migration], chunk_size: int = BACKFILL_CHUNK,
+            pause: float = BACKFILL_PAUSE) -> List[int]:
+    """Bring the library at db_path up to the last migration's version.
+
+    Returns the versions whose schema step ran here. A library already
+    on a newer version (opened by a newer release) is left alone.
+    """
+    latest = migrations[-1].version
+    conn = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON")
+        version = schema_version(conn)
+        if version == 0:
+            # Only possible before the first table exists, and outside a
+            # transaction: new libraries can give free pages back a step at
+            # a time (see database/maintenance.py). A no-op on older files
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        pending = _pending_backfills(conn)
+        if version >= latest and not pending:
+            return []
+        applied = []
+        for migration in migrations:
+            if migration.version > version:
+                if not _apply_schema(conn, migration):
+                    # Another client got there first; pick up what it recorded
+                    pending = _pending_backfills(conn)
+                else:
+                    applied.append(migration.version)
+                    if migration.backfill:
+                        pending.add(migration.version)
+                version = max(version, migration.version)
+            if migration.version in pending and migration.backfill:
+                _run_backfill(conn, migration, chunk_size, pause)
+        return applied
+    finally:
+        conn.close()
+
+
+def _apply_schema(conn: sqlite3.Connection, migration: Migration) -> bool:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if schema_version(conn) >= migration.version:
+            conn.execute("ROLLBACK")
+            return False
+        cursor = conn.cursor()
+        if migration.schema:
+            migration.schema(cursor)
+        if migration.backfill:
+            cursor.execute("CREATE TABLE IF NOT EXISTS schema_backfills (version INTEGER PRIMARY KEY)")
+            cursor.execute("INSERT OR IGNORE INTO schema_backfills (version) VALUES (?)",
+                           (migration.version,))
+        cursor.execute(f"PRAGMA user_version = {int(migration.version)}")
+        conn.execute("COMMIT")
+        return True
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _run_backfill(conn: sqlite3.Connection, migration: Migration, chunk_size: int, pause: float):
+    while True:
+        start = time.perf_counter()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = conn.cursor()
+            done = migration.backfill(cursor, chunk_size)
+            if not done:
+                cursor.execute("DELETE FROM schema_backfills WHERE version = ?", (migration.version,))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if not done:
+            return
+        # Leave the lock free at least as long as the chunk held it: other
+        # connections poll for it with growing sleeps and would starve otherwise
+        time.sleep(max(pause, time.perf_counter() - start))
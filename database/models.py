@@ -1,15 +1,126 @@
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, List
+from typing import Optional, List, Tuple
+
+
+class _Timestamp:
+    """A datetime attribute kept as its stored ISO text until first read."""
+    
+    def __set_name__(self, owner, name):
+        self.slot = "_" + name
+    
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if value.__class__ is str:
+            value = datetime.fromisoformat(value)
+            setattr(instance, self.slot, value)
+        return value
+    
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
+
+
+class _Record:
+    """Base for the models loaded by the thousand (folders, scripts).
+
+    Slotted, so there is no per-instance __dict__, and built from database
+    rows positionally (_from_row) with timestamps decoded on first use.
+    Otherwise they behave like the dataclasses below: keyword construction
+    in _fields order, field-wise equality and a matching repr.
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+    __hash__ = None
+    
+    def _replace(self, **changes):
+        """Copy with some fields changed, as NamedTuple._replace."""
+        record = self.__class__.__new__(self.__class__)
+        for slot in self.__slots__:
+            setattr(record, slot, getattr(self, slot))
+        for field, value in changes.items():
+            setattr(record, field, value)
+        return record
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, field) == getattr(other, field) for field in self._fields)
+    
+    def __repr__(self):
+        fields = ", ".join(f"{field}={getattr(self, field)!r}" for field in self._fields)
+        return f"{self.__class__.__name__}({fields})"
+
+
+class Folder(_Record):
+    __slots__ = ("id", "name", "parent_id", "_created_date", "path")
+    _fields = ("id", "name", "parent_id", "created_date", "path")
+    created_date = _Timestamp()
+    
+    def __init__(self, id: Optional[int] = None, name: str = "", parent_id: Optional[int] = None,
+                 created_date: datetime = None, path: str = ""):
+        self.id = id
+        self.name = name
+        self.parent_id = parent_id
+        self.created_date = created_date if created_date is not None else datetime.now()
+        self.path = path
+    
+    @classmethod
+    def _from_row(cls, row) -> "Folder":
+        """Build from a row of every field in _fields order, created_date as text."""
+        folder = cls.__new__(cls)
+        folder.id, folder.name, folder.parent_id, folder._created_date, folder.path = row
+        return folder
+
+
+class Script(_Record):
+    __slots__ = ("id", "name", "folder_id", "content", "description", "author",
+                 "environment_tag", "file_type", "_created_date", "_modified_date",
+                 "_last_opened_date")
+    _fields = ("id", "name", "folder_id", "content", "description", "author",
+               "environment_tag", "file_type", "created_date", "modified_date",
+               "last_opened_date")
+    created_date = _Timestamp()
+    modified_date = _Timestamp()
+    last_opened_date = _Timestamp()
+    
+    def __init__(self, id: Optional[int] = None, name: str = "", folder_id: Optional[int] = None,
+                 content: Optional[str] = "",  # None: not loaded (see ScriptManager.get_content)
+                 description: str = "", author: str = "",
+                 environment_tag: str = "Testing",  # Testing or Production
+                 file_type: str = "ps1",  # ps1 or bat
+                 created_date: datetime = None, modified_date: datetime = None,
+                 last_opened_date: datetime = None):
+        now = datetime.now()
+        self.id = id
+        self.name = name
+        self.folder_id = folder_id
+        self.content = content
+        self.description = description
+        self.author = author
+        self.environment_tag = environment_tag
+        self.file_type = file_type
+        self.created_date = created_date if created_date is not None else now
+        self.modified_date = modified_date if modified_date is not None else now
+        self.last_opened_date = last_opened_date if last_opened_date is not None else now
+    
+    @classmethod
+    def _from_row(cls, row) -> "Script":
+        """Build from a row of every field in _fields order, timestamps as text."""
+        script = cls.__new__(cls)
+        (script.id, script.name, script.folder_id, script.content, script.description,
+         script.author, script.environment_tag, script.file_type, script._created_date,
+         script._modified_date, script._last_opened_date) = row
+        return script
 
 
 @dataclass
-class Folder:
+class SavedSearch:
     id: Optional[int] = None
     name: str = ""
-    parent_id: Optional[int] = None
+    query_text: str = ""
     created_date: datetime = None
-    path: str = ""
     
     def __post_init__(self):
         if self.created_date is None:
@@ -17,24 +128,40 @@ class Folder:
 
 
 @dataclass
-class Script:
+class FolderStats:
+    """Aggregates over a folder's whole subtree, kept up to date by ScriptManager."""
+    folder_id: int
+    script_count: int = 0
+    total_bytes: int = 0
+    last_modified: Optional[datetime] = None
+    
+    def size_text(self) -> str:
+        size = float(self.total_bytes)
+        for unit in ("B", "KB", "MB", "GB"):
+            if size < 1024 or unit == "GB":
+                return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+            size /= 1024
+
+
+@dataclass
+class SyncTarget:
+    """A library folder (None = whole library) mirrored to a directory."""
     id: Optional[int] = None
-    name: str = ""
     folder_id: Optional[int] = None
-    content: str = ""
-    description: str = ""
-    author: str = ""
-    environment_tag: str = "Testing"  # Testing or Production
-    file_type: str = "ps1"  # ps1 or bat
+    directory: str = ""
     created_date: datetime = None
-    modified_date: datetime = None
-    last_opened_date: datetime = None
     
     def __post_init__(self):
-        now = datetime.now()
         if self.created_date is None:
-            self.created_date = now
-        if self.modified_date is None:
-            self.modified_date = now
-        if self.last_opened_date is None:
-            self.last_opened_date = now
\ No newline at end of file
+            self.created_date = datetime.now()
+
+
+@dataclass
+class SyncStateEntry:
+    """Last synced state of one script; both sides matched content_hash then."""
+    script_id: int
+    rel_path: str
+    content_hash: str
+    file_mtime_ns: int
+    file_size: int
+    db_modified: str  # modified_date as stored, compared textually
\ No newline at end of file
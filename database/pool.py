@@ -0,0 +1,78 @@
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import List
+from urllib.parse import quote
+
+
+def read_only_uri(path: str) -> str:
+    """A mode=ro SQLite URI for path, UNC shares included.
+
+    The authority is always left empty: Path.as_uri() puts a share's server
+    there (file://server/share/...), which SQLite rejects, so a UNC path
+    has to become file:////server/share/... instead.
+    """
+    posix = os.path.abspath(path).replace(os.sep, "/")
+    if not posix.startswith("/"):
+        posix = "/" + posix  # drive letter: file:///C:/...
+    return "file://" + quote(posix, safe="/:") + "?mode=ro"
+
+
+class ReadOnlyConnectionPool:
+    """Fixed set of read-only SQLite connections shared between threads.
+
+    Connections are opened with mode=ro and query_only, so a reader can never
+    take a write lock. Use with DatabaseManager.using_connection() to run the
+    normal DatabaseManager/ScriptManager methods on a pooled connection.
+    """
+
+    def __init__(self, db_path: str, size: int = 8, timeout: float = 30.0):
+        self.db_path = db_path
+        self.size = size
+        self.timeout = timeout
+        self._uri = read_only_uri(db_path)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self._uri, uri=True, check_same_thread=False,
+                               timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA query_only = ON")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("connection pool is closed")
+            if len(self._all) < self.size:
+                conn = self._open()
+                self._all.append(conn)
+                return conn
+        # Pool exhausted: wait for a connection to come back
+        return self._idle.get(timeout=self.timeout)
+
+    @contextmanager
+    def connection(self):
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            for conn in self._all:
+                conn.close()
+            self._all.clear()
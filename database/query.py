@@ -0,0 +1,220 @@
+import re
+import shlex
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, List, Optional, Tuple
+
+
+@dataclass
+class ScriptQuery:
+    """Structured script filter that compiles to parameterised SQL.
+
+    Every filter is optional; an empty query matches all scripts. The
+    equality filters and date ranges line up with the composite indexes
+    created by the schema in database/database.py (see MIGRATIONS).
+    """
+    text: str = ""
+    environment_tag: Optional[str] = None
+    author: Optional[str] = None
+    file_type: Optional[str] = None
+    folder_id: Optional[int] = None
+    folder_path: Optional[str] = None
+    include_subfolders: bool = True
+    root_only: bool = False  # only scripts outside any folder
+    modified_after: Optional[datetime] = None
+    modified_before: Optional[datetime] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    limit: Optional[int] = None
+    offset: Optional[int] = None
+
+    def has_filters(self) -> bool:
+        return any(value is not None for value in (
+            self.environment_tag, self.author, self.file_type,
+            self.folder_id, self.folder_path, self.root_only or None,
+            self.modified_after, self.modified_before,
+            self.created_after, self.created_before
+        ))
+
+    def compile(self, columns: str = "*") -> Tuple[str, List[Any]]:
+        where, params = self.where()
+        sql = f"SELECT {columns} FROM scripts{where}"
+        return self._order_and_page(sql, params, "name, id")
+
+    def compile_union(self, columns: str, schemas: List[str]) -> Tuple[str, List[Any]]:
+        """One statement over the scripts of several attached databases.
+
+        Each row starts with library_index, the position of its schema in
+        schemas; columns may refer to the branch's schema as {schema}.
+        folder_id filters are ids in the first schema and only
+        apply there; folder paths are looked up in each database.
+        """
+        branches: List[str] = []
+        params: List[Any] = []
+        for index, schema in enumerate(schemas):
+            if self.folder_id is not None and index > 0:
+                break
+            where, branch_params = self.where(schema)
+            branches.append(f"SELECT {index} AS library_index, {columns.format(schema=schema)} "
+                            f"FROM {schema}.scripts{where}")
+            params.extend(branch_params)
+        sql = "SELECT * FROM (" + " UNION ALL ".join(branches) + ")"
+        return self._order_and_page(sql, params, "name, library_index, id")
+
+    def where(self, schema: str = "") -> Tuple[str, List[Any]]:
+        """The WHERE clause (with a leading space, or empty) and its parameters."""
+        prefix = f"{schema}." if schema else ""
+        clauses: List[str] = []
+        params: List[Any] = []
+
+        if self.folder_id is not None or self.folder_path is not None:
+            if self.folder_id is not None:
+                root_sql, root_param = "?", self.folder_id
+            else:
+                root_sql = f"(SELECT id FROM {prefix}folders WHERE path = ?)"
+                root_param = self.folder_path
+            if self.include_subfolders:
+                # Whole subtree via the closure table, no recursion needed
+                clauses.append(f"folder_id IN (SELECT descendant_id FROM {prefix}folder_closure "
+                               f"WHERE ancestor_id = {root_sql})")
+            else:
+                clauses.append(f"folder_id = {root_sql}")
+            params.append(root_param)
+        elif self.root_only:
+            clauses.append("folder_id IS NULL")
+
+        for column, value in (("environment_tag", self.environment_tag),
+                              ("author", self.author),
+                              ("file_type", self.file_type)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        for column, op, value in (("modified_date", ">=", self.modified_after),
+                                  ("modified_date", "<", self.modified_before),
+                                  ("created_date", ">=", self.created_after),
+                                  ("created_date", "<", self.created_before)):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                params.append(_format_timestamp(value))
+
+        if self.text:
+            pattern = f"%{self.text}%"
+            clauses.append("(name LIKE ? OR content LIKE ? OR description LIKE ?)")
+            params.extend([pattern, pattern, pattern])
+
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _order_and_page(self, sql: str, params: List[Any], order: str) -> Tuple[str, List[Any]]:
+        # The trailing id breaks ties so LIMIT/OFFSET pages are stable
+        sql += f" ORDER BY {order}"
+        if self.limit is not None or self.offset:
+            sql += " LIMIT ?"
+            params.append(self.limit if self.limit is not None else -1)
+        if self.offset:
+            sql += " OFFSET ?"
+            params.append(self.offset)
+        return sql, params
+
+
+def _format_timestamp(value: datetime) -> str:
+    # Same text form sqlite3 stores for datetime parameters
+    return value.isoformat(" ")
+
+
+# Query language
+_KEY_ALIASES = {
+    "env": "environment_tag",
+    "environment": "environment_tag",
+    "author": "author",
+    "type": "file_type",
+    "ext": "file_type",
+    "folder": "folder_path",
+    "in": "folder_path",
+    "modified": "modified",
+    "created": "created",
+}
+
+_RELATIVE_SPAN = re.compile(r"^(\d+)([hdw])$")
+
+
+def parse_query(text: str, now: Optional[datetime] = None) -> ScriptQuery:
+    """Parse a search box string into a ScriptQuery.
+
+    Supported filters, combined with free text:
+        env:Production  author:alice  type:bat  folder:/Infra/Deploy
+        modified:today|week|month|7d|24h|>=2024-01-01|<2024-02-01
+        created:...     (same forms as modified)
+
+    Relative dates are resolved against ``now`` at parse time.
+    """
+    now = now or datetime.now()
+    query = ScriptQuery()
+    words: List[str] = []
+
+    try:
+        tokens = shlex.split(text)
+    except ValueError:
+        tokens = text.split()
+
+    for token in tokens:
+        key, sep, value = token.partition(":")
+        field = _KEY_ALIASES.get(key.lower()) if sep else None
+        if field is None or not value:
+            words.append(token)
+            continue
+
+        if field in ("modified", "created"):
+            after, before = _parse_date_filter(value, now)
+            if after is None and before is None:
+                words.append(token)
+                continue
+            setattr(query, f"{field}_after", after)
+            setattr(query, f"{field}_before", before)
+        elif field == "folder_path":
+            query.folder_path = "/" + value.strip("/")
+        elif field == "environment_tag":
+            query.environment_tag = value.capitalize()
+        elif field == "file_type":
+            query.file_type = value.lower().lstrip(".")
+        else:
+            setattr(query, field, value)
+
+    query.text = " ".join(words)
+    return query
+
+
+def _parse_date_filter(value: str, now: datetime) -> Tuple[Optional[datetime], Optional[datetime]]:
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    lowered = value.lower()
+
+    if lowered == "today":
+        return today, None
+    if lowered == "yesterday":
+        return today - timedelta(days=1), today
+    if lowered == "week":
+        return today - timedelta(days=today.weekday()), None
+    if lowered == "month":
+        return today.replace(day=1), None
+
+    match = _RELATIVE_SPAN.match(lowered)
+    if match:
+        amount, unit = int(match.group(1)), match.group(2)
+        span = {"h": timedelta(hours=amount),
+                "d": timedelta(days=amount),
+                "w": timedelta(weeks=amount)}[unit]
+        return now - span, None
+
+    for prefix in (">=", "<=", ">", "<", ""):
+        if value.startswith(prefix):
+            try:
+                moment = datetime.fromisoformat(value[len(prefix):])
+            except ValueError:
+                continue
+            day_after = moment + timedelta(days=1)
+            if prefix in (">=", ">"):
+                return (day_after if prefix == ">" else moment), None
+            if prefix in ("<=", "<"):
+                return None, (day_after if prefix == "<=" else moment)
+            return moment, day_after
+    return None, None
\ No newline at end of file
@@ -0,0 +1,94 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTabWidget, QTreeWidget,
+    QTreeWidgetItem
+)
+from PyQt6.QtCore import Qt, pyqtSignal
+from typing import Dict, List
+from core.dependencies import Dependency, DependencyGraph
+from core.duplicates import script_paths
+from database.models import Script
+
+
+class DependenciesDialog(QDialog):
+    """What a script dot-sources, imports or calls, and what uses it."""
+    script_selected = pyqtSignal(int)  # script id
+
+    def __init__(self, graph: DependencyGraph, parent=None):
+        super().__init__(parent)
+        self.graph = graph
+        self.script = None
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Script Dependencies")
+        self.setModal(False)
+        self.resize(700, 450)
+
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.tabs = QTabWidget()
+        self.dependencies_tree = self._create_tree()
+        self.dependents_tree = self._create_tree()
+        self.tabs.addTab(self.dependencies_tree, "Depends on")
+        self.tabs.addTab(self.dependents_tree, "Used by")
+        layout.addWidget(self.tabs)
+
+        refresh_button = QPushButton("Refresh")
+        refresh_button.clicked.connect(self.refresh)
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout = QHBoxLayout()
+        button_layout.addWidget(refresh_button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def _create_tree(self) -> QTreeWidget:
+        tree = QTreeWidget()
+        tree.setHeaderLabels(["Script", "Link"])
+        tree.setRootIsDecorated(False)
+        tree.setSortingEnabled(True)
+        tree.setColumnWidth(0, 540)
+        tree.itemDoubleClicked.connect(self.on_item_double_clicked)
+        return tree
+
+    def show_script(self, script: Script):
+        self.script = script
+        self.refresh()
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def refresh(self):
+        if not self.script:
+            return
+        # Both directions come from cached edges; only stale scripts are re-resolved
+        dependencies = self.graph.dependencies(self.script.id)
+        dependents = self.graph.dependents(self.script.id)
+        paths = script_paths(self.graph.db)
+        self._fill(self.dependencies_tree, dependencies, paths)
+        self._fill(self.dependents_tree, dependents, paths)
+        self.tabs.setTabText(0, f"Depends on ({len(dependencies)})")
+        self.tabs.setTabText(1, f"Used by ({len(dependents)})")
+        direct = sum(1 for dependent in dependents if dependent.direct)
+        self.summary_label.setText(
+            f"{paths.get(self.script.id, self.script.name)}: used directly by {direct}, "
+            f"{len(dependents)} in total"
+        )
+
+    def _fill(self, tree: QTreeWidget, related: List[Dependency], paths: Dict[int, str]):
+        tree.setSortingEnabled(False)
+        tree.clear()
+        for dependency in related:
+            item = QTreeWidgetItem(tree)
+            item.setText(0, paths.get(dependency.script_id, f"#{dependency.script_id}"))
+            item.setText(1, "direct" if dependency.direct else "indirect")
+            item.setData(0, Qt.ItemDataRole.UserRole, dependency.script_id)
+        tree.setSortingEnabled(True)
+        tree.sortItems(1, Qt.SortOrder.AscendingOrder)
+
+    def on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+        self.script_selected.emit(item.data(0, Qt.ItemDataRole.UserRole))
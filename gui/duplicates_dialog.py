@@ -0,0 +1,161 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QDoubleSpinBox,
+    QProgressBar, QTreeWidget, QTreeWidgetItem, QFileDialog, QMessageBox
+)
+from PyQt6.QtCore import Qt, pyqtSignal, QThread
+from typing import Dict
+import json
+from database.database import DatabaseManager
+from database.models import Script
+from core.duplicates import DuplicateFinder, DuplicateReport, group_record, script_paths
+from core.script_manager import ScriptManager
+
+
+class DuplicateScanThread(QThread):
+    """Runs the duplicate analysis off the GUI thread."""
+    progress = pyqtSignal(int, int)
+    report_ready = pyqtSignal(object, object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, db: DatabaseManager, threshold: float, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.threshold = threshold
+
+    def run(self):
+        try:
+            finder = DuplicateFinder(self.db, self.threshold, progress=self.progress.emit)
+            report = finder.run()
+            self.report_ready.emit(report, script_paths(self.db))
+        except Exception as e:
+            self.failed.emit(str(e))
+
+
+class DuplicatesDialog(QDialog):
+    script_selected = pyqtSignal(Script)
+
+    def __init__(self, script_manager: ScriptManager, parent=None):
+        super().__init__(parent)
+        self.script_manager = script_manager
+        self.scan: DuplicateScanThread = None
+        self.report: DuplicateReport = None
+        self.paths: Dict[int, str] = {}
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Duplicate Scripts")
+        self.setModal(False)
+        self.resize(700, 500)
+
+        layout = QVBoxLayout(self)
+
+        # Controls
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Near-duplicate similarity:"))
+        self.threshold_spin = QDoubleSpinBox()
+        self.threshold_spin.setRange(0.5, 1.0)
+        self.threshold_spin.setSingleStep(0.05)
+        self.threshold_spin.setValue(0.8)
+        controls.addWidget(self.threshold_spin)
+        controls.addStretch()
+
+        self.analyze_button = QPushButton("Analyze")
+        self.analyze_button.clicked.connect(self.start_scan)
+        controls.addWidget(self.analyze_button)
+
+        self.save_button = QPushButton("Save Report...")
+        self.save_button.setEnabled(False)
+        self.save_button.clicked.connect(self.save_report)
+        controls.addWidget(self.save_button)
+        layout.addLayout(controls)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        self.summary_label = QLabel("Click Analyze to scan the library.")
+        layout.addWidget(self.summary_label)
+
+        # Groups with their scripts as children
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderLabels(["Script", "Similarity"])
+        self.results_tree.setColumnWidth(0, 520)
+        self.results_tree.itemDoubleClicked.connect(self.on_item_double_clicked)
+        layout.addWidget(self.results_tree)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def start_scan(self):
+        if self.scan and self.scan.isRunning():
+            return
+        self.analyze_button.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.summary_label.setText("Analyzing...")
+        self.scan = DuplicateScanThread(self.script_manager.db, self.threshold_spin.value(), self)
+        self.scan.progress.connect(self.on_progress)
+        self.scan.report_ready.connect(self.show_report)
+        self.scan.failed.connect(self.on_failed)
+        self.scan.start()
+
+    def on_progress(self, done: int, total: int):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def on_failed(self, message: str):
+        self.analyze_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.summary_label.setText("Analysis failed.")
+        QMessageBox.warning(self, "Error", f"Duplicate analysis failed: {message}")
+
+    def show_report(self, report: DuplicateReport, paths: Dict[int, str]):
+        self.report = report
+        self.paths = paths
+        self.analyze_button.setEnabled(True)
+        self.save_button.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        self.summary_label.setText(
+            f"{len(report.exact_groups())} exact and {len(report.near_groups())} near-duplicate "
+            f"groups; {report.redundant_scripts()} redundant scripts out of {report.scanned} "
+            f"({report.elapsed:.1f}s)"
+        )
+
+        self.results_tree.clear()
+        for group in report.groups:
+            kind = "Identical" if group.kind == "exact" else "Similar"
+            group_item = QTreeWidgetItem(self.results_tree)
+            group_item.setText(0, f"{kind}: {len(group.script_ids)} scripts")
+            group_item.setText(1, f"{group.similarity:.0%}")
+            for script_id in group.script_ids:
+                child = QTreeWidgetItem(group_item)
+                child.setText(0, paths.get(script_id, f"#{script_id}"))
+                child.setData(0, Qt.ItemDataRole.UserRole, script_id)
+
+    def on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+        script_id = item.data(0, Qt.ItemDataRole.UserRole)
+        if script_id is None:
+            return
+        script = self.script_manager.get_script(script_id)
+        if script:
+            self.script_selected.emit(script)
+
+    def save_report(self):
+        if not self.report:
+            return
+        file_name, _ = QFileDialog.getSaveFileName(
+            self, "Save Duplicate Report", "duplicates.json", "JSON Files (*.json)"
+        )
+        if not file_name:
+            return
+        payload = {
+            "scanned": self.report.scanned,
+            "redundant_scripts": self.report.redundant_scripts(),
+            "groups": [group_record(group, self.paths) for group in self.report.groups],
+        }
+        with open(file_name, "w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
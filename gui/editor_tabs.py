@@ -1,80 +1,63 @@
 from PyQt6.QtWidgets import (
-    QTabWidget, QWidget, QVBoxLayout, QPushButton, QMessageBox
+    QTabWidget, QWidget, QVBoxLayout, QPushButton, QMessageBox, QLabel
 )
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont, QColor
-from PyQt6.Qsci import QsciScintilla
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple, TYPE_CHECKING
 from database.models import Script
 from core.script_manager import ScriptManager
-from core.syntax_highlighter import SyntaxHighlighterFactory
+from core.session import TabState
+from core.tracing import tracer
 
+if TYPE_CHECKING:
+    from .script_editor import ScriptEditor
 
-class ScriptEditor(QsciScintilla):
-    def __init__(self, script: Script):
+
+# Scripts above either threshold open in large-file mode; both can be
+# overridden with the large_file_bytes / large_file_lines settings
+LARGE_FILE_BYTES = 2 * 1024 * 1024
+LARGE_FILE_LINES = 50_000
+
+
+def is_large_content(content: str, max_bytes: int = LARGE_FILE_BYTES,
+                     max_lines: int = LARGE_FILE_LINES) -> bool:
+    # Character count stands in for bytes; it is never larger
+    return len(content) > max_bytes or content.count("\n") >= max_lines
+
+
+def _editor_class():
+    # QScintilla is the heaviest import in the app; load it with the first editor
+    from .script_editor import ScriptEditor
+    return ScriptEditor
+
+
+class PlaceholderTab(QWidget):
+    """Stands in for a restored tab until it is first activated."""
+    
+    def __init__(self, state: TabState):
         super().__init__()
-        self.script = script
-        self.original_content = script.content
-        self.setup_editor()
-        self.set_content(script.content)
-        
-    def setup_editor(self):
-        # Editor settings
-        self.setUtf8(True)
-        self.setFont(QFont("Consolas", 10))
-        
-        # Set default colors
-        self.setPaper(QColor("#1e1e1e"))
-        self.setColor(QColor("#ffffff"))
-        
-        # Line numbers
-        self.setMarginType(0, QsciScintilla.MarginType.NumberMargin)
-        self.setMarginWidth(0, "0000")
-        self.setMarginLineNumbers(0, True)
-        self.setMarginsBackgroundColor(QColor("#2b2b2b"))
-        self.setMarginsForegroundColor(QColor("#858585"))
-        
-        # Indentation
-        self.setIndentationsUseTabs(False)
-        self.setIndentationWidth(4)
-        self.setAutoIndent(True)
-        
-        # Brace matching
-        self.setBraceMatching(QsciScintilla.BraceMatch.SloppyBraceMatch)
-        
-        # Current line highlighting
-        self.setCaretLineVisible(True)
-        self.setCaretLineBackgroundColor(QColor("#2a2a2a"))
-        
-        # Set lexer based on file type
-        lexer = SyntaxHighlighterFactory.get_highlighter(self.script.file_type, self)
-        if lexer:
-            self.setLexer(lexer)
-            
-    def set_content(self, content: str):
-        self.setText(content)
-        self.setModified(False)
-        
-    def get_content(self) -> str:
-        return self.text()
-        
-    def is_content_changed(self) -> bool:
-        return self.get_content() != self.original_content
-        
-    def save_content(self):
-        self.original_content = self.get_content()
-        self.setModified(False)
+        self.state = state
+        layout = QVBoxLayout(self)
+        label = QLabel(f"Loading {state.title}...")
+        label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(label)
 
 
 class EditorTabWidget(QTabWidget):
-    current_script_changed = pyqtSignal(Script)
+    # Script, or None when no tab of this library's scripts is current
+    current_script_changed = pyqtSignal(object)
     script_modified = pyqtSignal(Script, bool)
     cursor_position_changed = pyqtSignal(int, int)
     
     def __init__(self, script_manager: ScriptManager):
         super().__init__()
         self.script_manager = script_manager
-        self.editors: Dict[int, ScriptEditor] = {}
+        self.editors: Dict[int, "ScriptEditor"] = {}
+        self.placeholders: Dict[int, PlaceholderTab] = {}
+        # Read-only tabs for scripts of mounted libraries, by (library, script id)
+        self.mounted_editors: Dict[Tuple[str, int], "ScriptEditor"] = {}
+        db = script_manager.db
+        self.large_file_bytes = int(db.get_setting("large_file_bytes", str(LARGE_FILE_BYTES)))
+        self.large_file_lines = int(db.get_setting("large_file_lines", str(LARGE_FILE_LINES)))
         self.setup_ui()
         
     def setup_ui(self):
@@ -86,6 +69,9 @@ class EditorTabWidget(QTabWidget):
         self.tabCloseRequested.connect(self.close_tab)
         self.currentChanged.connect(self.on_tab_changed)
         
+    def preload_editor(self):
+        _editor_class()
+        
     def open_script(self, script: Script):
         # Check if already open
         if script.id in self.editors:
@@ -94,28 +80,123 @@ class EditorTabWidget(QTabWidget):
             index = self.indexOf(editor)
             self.setCurrentIndex(index)
             return
+        if script.id in self.placeholders:
+            # Activating the placeholder materialises it
+            self.setCurrentIndex(self.indexOf(self.placeholders[script.id]))
+            return
             
-        # Mark as opened
-        self.script_manager.mark_script_opened(script.id)
-        
-        # Create new editor
-        editor = ScriptEditor(script)
-        self.editors[script.id] = editor
+        editor = self._create_editor(script)
         
         # Add tab
         tab_name = f"{script.name}.{script.file_type}"
         index = self.addTab(editor, tab_name)
         self.setCurrentIndex(index)
         
+    def open_mounted_script(self, library: str, script: Script, content: str):
+        """Show a script from a mounted library; those are never edited here."""
+        key = (library, script.id)
+        if key in self.mounted_editors:
+            self.setCurrentIndex(self.indexOf(self.mounted_editors[key]))
+            return
+        large = is_large_content(content, self.large_file_bytes, self.large_file_lines)
+        editor = _editor_class()(script, content, large_file=large, read_only=True)
+        editor.cursorPositionChanged.connect(
+            lambda line, col: self.cursor_position_changed.emit(line + 1, col + 1)
+        )
+        self.mounted_editors[key] = editor
+        index = self.addTab(editor, f"{script.name}.{script.file_type} [{library}]")
+        self.setTabToolTip(index, f"Read-only, from the mounted library {library}")
+        self.setCurrentIndex(index)
+        
+    def close_library_tabs(self, library: str):
+        for key, editor in list(self.mounted_editors.items()):
+            if key[0] == library:
+                del self.mounted_editors[key]
+                self.removeTab(self.indexOf(editor))
+                editor.deleteLater()
+                
+    @tracer.traced(category="gui")
+    def _create_editor(self, script: Script) -> "ScriptEditor":
+        # Mark as opened
+        self.script_manager.mark_script_opened(script.id)
+        
+        # Create new editor; huge scripts get the stripped-down large-file mode.
+        # From here on the editor holds the only copy of the text
+        content = self.script_manager.get_content(script)
+        large = is_large_content(content, self.large_file_bytes, self.large_file_lines)
+        editor = _editor_class()(script, content, large_file=large)
+        self.script_manager.release_content(script)
+        self.editors[script.id] = editor
+        
         # Connect editor signals
         editor.textChanged.connect(lambda: self.on_text_changed(editor))
         editor.cursorPositionChanged.connect(
             lambda line, col: self.cursor_position_changed.emit(line + 1, col + 1)
         )
+        return editor
+        
+    # Session support
+    def restore_tabs(self, tabs: List[TabState], current_index: int):
+        """Add lightweight placeholder tabs; content loads on first activation."""
+        self.blockSignals(True)
+        try:
+            for state in tabs:
+                if state.script_id in self.editors or state.script_id in self.placeholders:
+                    continue
+                placeholder = PlaceholderTab(state)
+                self.placeholders[state.script_id] = placeholder
+                self.addTab(placeholder, state.title)
+            if 0 <= current_index < self.count():
+                self.setCurrentIndex(current_index)
+        finally:
+            self.blockSignals(False)
+            
+    def activate_current(self):
+        self.on_tab_changed(self.currentIndex())
+        
+    def session_tabs(self) -> List[TabState]:
+        tabs = []
+        for index in range(self.count()):
+            widget = self.widget(index)
+            if isinstance(widget, PlaceholderTab):
+                tabs.append(widget.state)
+            elif widget in self.editors.values():
+                script = widget.script
+                line, column = widget.getCursorPosition()
+                tabs.append(TabState(
+                    script_id=script.id,
+                    title=f"{script.name}.{script.file_type}",
+                    line=line,
+                    column=column,
+                    first_visible_line=widget.firstVisibleLine()
+                ))
+        return tabs
+        
+    def _materialize(self, index: int, placeholder: PlaceholderTab):
+        state = placeholder.state
+        del self.placeholders[state.script_id]
+        script = self.script_manager.get_script(state.script_id)
+        
+        # Swap widgets without letting the intermediate tab changes cascade
+        self.blockSignals(True)
+        try:
+            self.removeTab(index)
+            if script:
+                editor = self._create_editor(script)
+                index = self.insertTab(index, editor, f"{script.name}.{script.file_type}")
+                editor.restore_position(state.line, state.column, state.first_visible_line)
+            self.setCurrentIndex(min(index, self.count() - 1))
+        finally:
+            self.blockSignals(False)
+        placeholder.deleteLater()
+        self.on_tab_changed(self.currentIndex())
         
     def close_tab(self, index: int):
         editor = self.widget(index)
-        if isinstance(editor, ScriptEditor):
+        if isinstance(editor, PlaceholderTab):
+            del self.placeholders[editor.state.script_id]
+            editor.deleteLater()
+        elif editor in self.editors.values():
             if editor.is_content_changed():
                 reply = QMessageBox.question(
                     self,
@@ -134,12 +215,28 @@ class EditorTabWidget(QTabWidget):
             # Remove from editors dict
             if editor.script.id in self.editors:
                 del self.editors[editor.script.id]
-                
+        else:
+            for key, mounted in list(self.mounted_editors.items()):
+                if mounted is editor:
+                    del self.mounted_editors[key]
+                    
         self.removeTab(index)
         
+    def current_editor(self) -> Optional["ScriptEditor"]:
+        widget = self.currentWidget()
+        return widget if widget in self.editors.values() else None
+        
+    def go_to_line(self, script: Script, line: int):
+        """Open script (or switch to its tab) with the caret on a 1-based line."""
+        self.open_script(script)
+        editor = self.editors.get(script.id)
+        if editor:
+            editor.restore_position(line - 1, 0, max(0, line - 6))
+            editor.setFocus()
+            
     def save_current_script(self):
         current_editor = self.currentWidget()
-        if isinstance(current_editor, ScriptEditor):
+        if current_editor in self.editors.values():
             self.save_script(current_editor)
             
     def save_all_scripts(self):
@@ -147,16 +244,21 @@ class EditorTabWidget(QTabWidget):
             if editor.is_content_changed():
                 self.save_script(editor)
                 
-    def save_script(self, editor: ScriptEditor):
-        editor.script.content = editor.get_content()
-        if self.script_manager.update_script(editor.script):
-            editor.save_content()
+    @tracer.traced(category="gui")
+    def save_script(self, editor: "ScriptEditor"):
+        content = editor.get_content()
+        editor.script.content = content
+        saved = self.script_manager.update_script(editor.script)
+        # Don't leave a second copy on the model (or in the manager's cache)
+        self.script_manager.release_content(editor.script)
+        if saved:
+            editor.save_content(content)
             self.update_tab_title(editor, modified=False)
             self.script_modified.emit(editor.script, False)
         else:
             QMessageBox.warning(self, "Error", "Failed to save script")
             
-    def on_text_changed(self, editor: ScriptEditor):
+    def on_text_changed(self, editor: "ScriptEditor"):
         if editor.is_content_changed():
             self.update_tab_title(editor, modified=True)
             self.script_modified.emit(editor.script, True)
@@ -164,7 +266,7 @@ class EditorTabWidget(QTabWidget):
             self.update_tab_title(editor, modified=False)
             self.script_modified.emit(editor.script, False)
             
-    def update_tab_title(self, editor: ScriptEditor, modified: bool):
+    def update_tab_title(self, editor: "ScriptEditor", modified: bool):
         index = self.indexOf(editor)
         if index >= 0:
             tab_name = f"{editor.script.name}.{editor.script.file_type}"
@@ -175,8 +277,12 @@ class EditorTabWidget(QTabWidget):
     def on_tab_changed(self, index: int):
         if index >= 0:
             editor = self.widget(index)
-            if isinstance(editor, ScriptEditor):
-                self.current_script_changed.emit(editor.script)
+            if isinstance(editor, PlaceholderTab):
+                self._materialize(index, editor)
+            else:
+                # Mounted scripts have no properties to edit in this library
+                mounted = editor not in self.editors.values()
+                self.current_script_changed.emit(None if mounted else editor.script)
                 # Update cursor position
                 line, col = editor.getCursorPosition()
                 self.cursor_position_changed.emit(line + 1, col + 1)
@@ -199,8 +305,62 @@ class EditorTabWidget(QTabWidget):
                     tab_name = f"● {tab_name}"
                 self.setTabText(index, tab_name)
                 
+    # Changes made elsewhere (see ScriptManager.apply_changes)
+    @tracer.traced(category="gui")
+    def apply_changes(self, events: List[tuple]):
+        """Keep open tabs in step with scripts another client changed.
+
+        Unmodified editors reload changed content; editors with unsaved
+        edits keep them and are flagged instead, as are tabs whose script
+        was deleted.
+        """
+        for event, data, content_changed in events:
+            if event == "script_deleted":
+                self._script_deleted(data)
+            elif event == "script_updated" and data.id in self.editors:
+                self._script_updated(data, content_changed)
+                
+    def _script_updated(self, script: Script, content_changed: bool):
+        editor = self.editors[script.id]
+        if editor.script is not script:
+            # The tab may hold another copy (e.g. the tree's); content stays with the editor
+            for field in ("name", "folder_id", "description", "author", "environment_tag",
+                          "file_type", "created_date", "modified_date", "last_opened_date"):
+                setattr(editor.script, field, getattr(script, field))
+        # Not for our own saves and moves coming back from the feed: no need to
+        # read (and hash) what may be a multi-MB body the editor already has
+        if content_changed:
+            content = self.script_manager.db.get_script_content(script.id) or ""
+            index = self.indexOf(editor)
+            if not editor.matches_saved(content):
+                if editor.is_content_changed():
+                    self.setTabToolTip(index, "Changed elsewhere since it was opened; "
+                                              "saving overwrites that version")
+                else:
+                    editor.set_content(content)
+                    editor.mark_saved(content)
+                    self.setTabToolTip(index, "")
+        self.update_script_tab(editor.script)
+        
+    def _script_deleted(self, script_id: int):
+        placeholder = self.placeholders.pop(script_id, None)
+        if placeholder:
+            self.removeTab(self.indexOf(placeholder))
+            placeholder.deleteLater()
+        editor = self.editors.get(script_id)
+        if not editor:
+            return
+        if editor.is_content_changed():
+            self.setTabToolTip(self.indexOf(editor), "Deleted elsewhere; copy the text to keep it")
+        else:
+            del self.editors[script_id]
+            # Closing the last tab reports current_script_changed(None) from the
+            # change feed's timer, hence the object-typed signal
+            self.removeTab(self.indexOf(editor))
+            editor.deleteLater()
+            
     def apply_theme(self, theme):
         # Apply theme to all open editors
-        for editor in self.editors.values():
+        for editor in list(self.editors.values()) + list(self.mounted_editors.values()):
             if hasattr(theme, 'apply_to_editor'):
                 theme.apply_to_editor(editor)
\ No newline at end of file
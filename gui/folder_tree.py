@@ -1,13 +1,15 @@
 from PyQt6.QtWidgets import (
     QTreeWidget, QTreeWidgetItem, QMenu, QInputDialog,
-    QMessageBox, QAbstractItemView, QHeaderView, QStyle
+    QMessageBox, QAbstractItemView, QHeaderView, QStyle, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QMimeData, QByteArray
+from PyQt6.QtCore import Qt, pyqtSignal, QMimeData, QByteArray, QThread, QTimer
 from PyQt6.QtGui import QAction, QDrag, QIcon, QPalette
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 import json
 from database.models import Script, Folder
+from database.federation import LibraryFederation
 from core.script_manager import ScriptManager
+from core.tracing import tracer
 
 
 class FolderTreeItem(QTreeWidgetItem):
@@ -22,8 +24,8 @@ class FolderTreeItem(QTreeWidgetItem):
         
         if item_type == "folder":
             self.setText(0, data.name)
-            # Use system folder icon
-            if self.treeWidget():
+            # Use system folder icon; set once, so an open folder keeps its open icon
+            if self.treeWidget() and self.icon(0).isNull():
                 folder_icon = self.treeWidget().style().standardIcon(QStyle.StandardPixmap.SP_DirIcon)
                 self.setIcon(0, folder_icon)
             self.setData(0, Qt.ItemDataRole.UserRole, ("folder", data.id))
@@ -31,26 +33,85 @@ class FolderTreeItem(QTreeWidgetItem):
             display_name = f"{data.name}.{data.file_type}"
             self.setText(0, display_name)
             # Use file icon
-            if self.treeWidget():
+            if self.treeWidget() and self.icon(0).isNull():
                 file_icon = self.treeWidget().style().standardIcon(QStyle.StandardPixmap.SP_FileIcon)
                 self.setIcon(0, file_icon)
             self.setData(0, Qt.ItemDataRole.UserRole, ("script", data.id))
 
 
+class MountedItem(QTreeWidgetItem):
+    """Read-only item from a mounted library: its root, a folder or a script."""
+    
+    def __init__(self, parent, library: str, item_type: str, data=None):
+        super().__init__(parent)
+        self.library = library
+        self.item_type = item_type
+        self.item_data = data
+        self.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
+        style = self.treeWidget().style()
+        if item_type == "library":
+            self.setText(0, library)
+            self.setIcon(0, style.standardIcon(QStyle.StandardPixmap.SP_DriveNetIcon))
+        elif item_type == "folder":
+            self.setText(0, data.name)
+            self.setIcon(0, style.standardIcon(QStyle.StandardPixmap.SP_DirIcon))
+        else:
+            self.setText(0, f"{data.name}.{data.file_type}")
+            self.setIcon(0, style.standardIcon(QStyle.StandardPixmap.SP_FileIcon))
+
+
+class TreeLoader(QThread):
+    """Reads the folder tree and scripts off the GUI thread."""
+    loaded = pyqtSignal(object, object, object)
+    
+    def __init__(self, script_manager: ScriptManager,
+                 federation: Optional[LibraryFederation] = None, parent=None):
+        super().__init__(parent)
+        self.script_manager = script_manager
+        self.federation = federation
+        
+    def run(self):
+        folder_tree = self.script_manager.get_folder_tree()
+        scripts_by_folder = self.script_manager.get_scripts_grouped_by_folder()
+        mounted = self.federation.get_mounted_contents() if self.federation else {}
+        self.loaded.emit(folder_tree, scripts_by_folder, mounted)
+
+
 class FolderTreeWidget(QTreeWidget):
     script_selected = pyqtSignal(Script)
     folder_selected = pyqtSignal(Folder)
+    mounted_script_selected = pyqtSignal(str, Script)  # library name, script
+    unmount_requested = pyqtSignal(str)
+    tree_loaded = pyqtSignal()
     
-    def __init__(self, script_manager: ScriptManager):
+    # Optional columns filled from the folder_stats table
+    STATS_COLUMNS = ["Scripts", "Size", "Modified"]
+    
+    def __init__(self, script_manager: ScriptManager, load: bool = True):
         super().__init__()
         self.script_manager = script_manager
         self.item_map: Dict[tuple, FolderTreeItem] = {}
+        # Mounted libraries, shown read-only after this library's items
+        self.federation: Optional[LibraryFederation] = None
+        self.mounted_roots: Dict[str, MountedItem] = {}
+        self.loader: Optional[TreeLoader] = None
+        self.stats_visible = False
+        
+        # Coalesce bursts of changes into one stats refresh
+        self.stats_timer = QTimer(self)
+        self.stats_timer.setSingleShot(True)
+        self.stats_timer.setInterval(250)
+        self.stats_timer.timeout.connect(self.update_folder_stats)
+        self.script_manager.add_listener(self.on_library_changed)
         
         self.setup_ui()
-        self.load_tree()
+        if load:
+            self.load_tree()
         
     def setup_ui(self):
-        self.setHeaderLabel("Explorer")
+        self.setHeaderLabels(["Explorer"] + self.STATS_COLUMNS)
+        for column in range(1, len(self.STATS_COLUMNS) + 1):
+            self.setColumnHidden(column, True)
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         
@@ -60,7 +121,7 @@ class FolderTreeWidget(QTreeWidget):
         self.setAcceptDrops(True)
         
         # Selection behavior
-        self.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
         
         # Tree appearance
         self.setIndentation(20)
@@ -80,23 +141,42 @@ class FolderTreeWidget(QTreeWidget):
         self.itemExpanded.connect(self.on_item_expanded)
         self.itemCollapsed.connect(self.on_item_collapsed)
         
+    @tracer.traced(category="gui")
     def load_tree(self):
+        # Get folder tree structure and all scripts in two queries
+        folder_tree = self.script_manager.get_folder_tree()
+        scripts_by_folder = self.script_manager.get_scripts_grouped_by_folder()
+        mounted = self.federation.get_mounted_contents() if self.federation else {}
+        self._populate(folder_tree, scripts_by_folder, mounted)
+        
+    def load_tree_async(self):
+        """Load the tree on a worker thread; tree_loaded fires when it is shown."""
+        if self.loader and self.loader.isRunning():
+            return
+        self.loader = TreeLoader(self.script_manager, self.federation, self)
+        self.loader.loaded.connect(self._populate)
+        self.loader.start()
+        
+    @tracer.traced(category="gui")
+    def _populate(self, folder_tree: Dict, scripts_by_folder: Dict, mounted: Dict = None):
         self.clear()
         self.item_map.clear()
-        
-        # Get folder tree structure
-        folder_tree = self.script_manager.get_folder_tree()
+        self.mounted_roots.clear()
         
         # Create root folders
-        self._create_folder_items(None, folder_tree)
+        self._create_folder_items(None, folder_tree, scripts_by_folder)
         
-        # Load scripts for root level
-        root_scripts = self.script_manager.get_scripts_by_folder(None)
-        for script in root_scripts:
+        # Add scripts at root level
+        for script in scripts_by_folder.get(None, []):
             self._create_script_item(None, script)
         
+        self._create_mounted_items(mounted or {})
+        if self.stats_visible:
+            self.update_folder_stats()
+        self.tree_loaded.emit()
+        
     def _create_folder_items(self, parent_item: Optional[FolderTreeItem], 
-                           folder_tree: Dict):
+                           folder_tree: Dict, scripts_by_folder: Dict):
         parent_id = parent_item.item_data.id if parent_item else None
         
         # Create folders for this level
@@ -104,11 +184,10 @@ class FolderTreeWidget(QTreeWidget):
             folder_item = self._create_folder_item(parent_item, folder)
             
             # Recursively create subfolders
-            self._create_folder_items(folder_item, folder_tree)
+            self._create_folder_items(folder_item, folder_tree, scripts_by_folder)
             
             # Add scripts to this folder
-            scripts = self.script_manager.get_scripts_by_folder(folder.id)
-            for script in scripts:
+            for script in scripts_by_folder.get(folder.id, []):
                 self._create_script_item(folder_item, script)
                     
     def _create_folder_item(self, parent: Optional[FolderTreeItem], 
@@ -133,14 +212,56 @@ class FolderTreeWidget(QTreeWidget):
         self.item_map[("script", script.id)] = item
         return item
         
+    # Mounted libraries
+    def set_federation(self, federation: LibraryFederation):
+        self.federation = federation
+        
+    def reload_mounted(self):
+        """Rebuild just the mounted libraries' items, e.g. after (un)mounting."""
+        for root in self.mounted_roots.values():
+            self.invisibleRootItem().removeChild(root)
+        self.mounted_roots.clear()
+        self._create_mounted_items(self.federation.get_mounted_contents() if self.federation else {})
+        
+    @tracer.traced(category="gui")
+    def _create_mounted_items(self, mounted: Dict[str, Tuple[List[Folder], List[Script]]]):
+        if not self.federation:
+            return
+        for mount in self.federation.mounts:
+            root = MountedItem(self, mount.name, "library")
+            root.setToolTip(0, mount.path)
+            self.mounted_roots[mount.name] = root
+            if mount.name not in mounted:
+                root.setText(0, f"{mount.name} (unavailable)")
+                root.setDisabled(True)
+                continue
+            folders, scripts = mounted[mount.name]
+            # Folders come parents first, so each parent exists before its children
+            parents: Dict[Optional[int], QTreeWidgetItem] = {None: root}
+            for folder in folders:
+                parents[folder.id] = MountedItem(parents.get(folder.parent_id, root),
+                                                 mount.name, "folder", folder)
+            for script in scripts:
+                MountedItem(parents.get(script.folder_id, root), mount.name, "script", script)
+                
     def on_item_clicked(self, item: FolderTreeItem, column: int):
-        if item.item_type == "folder":
+        # Ctrl/Shift-clicks only extend the selection
+        modifiers = QApplication.keyboardModifiers()
+        if modifiers & (Qt.KeyboardModifier.ControlModifier | Qt.KeyboardModifier.ShiftModifier):
+            return
+        if isinstance(item, MountedItem):
+            if item.item_type == "script":
+                self.mounted_script_selected.emit(item.library, item.item_data)
+        elif item.item_type == "folder":
             self.folder_selected.emit(item.item_data)
         elif item.item_type == "script":
             self.script_selected.emit(item.item_data)
             
     def on_item_double_clicked(self, item: FolderTreeItem, column: int):
-        if item.item_type == "script":
+        if isinstance(item, MountedItem):
+            if item.item_type == "script":
+                self.mounted_script_selected.emit(item.library, item.item_data)
+        elif item.item_type == "script":
             self.script_selected.emit(item.item_data)
             
     def on_item_expanded(self, item: FolderTreeItem):
@@ -158,8 +279,36 @@ class FolderTreeWidget(QTreeWidget):
     def show_context_menu(self, position):
         item = self.itemAt(position)
         menu = QMenu(self)
+        selected = self.selected_tree_items()
         
-        if item and item.item_type == "folder":
+        if isinstance(item, MountedItem):
+            # Mounted libraries are read-only
+            if item.item_type == "script":
+                open_action = QAction("Open (Read-Only)", self)
+                open_action.triggered.connect(
+                    lambda: self.mounted_script_selected.emit(item.library, item.item_data)
+                )
+                menu.addAction(open_action)
+            elif item.item_type == "library":
+                unmount_action = QAction("Unmount Library", self)
+                unmount_action.triggered.connect(
+                    lambda: self.unmount_requested.emit(item.library)
+                )
+                menu.addAction(unmount_action)
+            else:
+                return
+                
+        elif item and item in selected and len(selected) > 1:
+            # Bulk actions on the whole selection
+            move_action = QAction("Move to Folder...", self)
+            move_action.triggered.connect(self.move_selected)
+            menu.addAction(move_action)
+            
+            delete_action = QAction(f"Delete {len(selected)} Items", self)
+            delete_action.triggered.connect(self.delete_selected)
+            menu.addAction(delete_action)
+            
+        elif item and item.item_type == "folder":
             # Folder context menu
             new_script_action = QAction("New Script", self)
             new_script_action.triggered.connect(
@@ -179,6 +328,10 @@ class FolderTreeWidget(QTreeWidget):
             rename_action.triggered.connect(lambda: self.rename_item(item))
             menu.addAction(rename_action)
             
+            move_action = QAction("Move to Folder...", self)
+            move_action.triggered.connect(lambda: self.move_items([item]))
+            menu.addAction(move_action)
+            
             delete_action = QAction("Delete", self)
             delete_action.triggered.connect(lambda: self.delete_item(item))
             menu.addAction(delete_action)
@@ -197,6 +350,10 @@ class FolderTreeWidget(QTreeWidget):
             rename_action.triggered.connect(lambda: self.rename_item(item))
             menu.addAction(rename_action)
             
+            move_action = QAction("Move to Folder...", self)
+            move_action.triggered.connect(lambda: self.move_items([item]))
+            menu.addAction(move_action)
+            
             delete_action = QAction("Delete", self)
             delete_action.triggered.connect(lambda: self.delete_item(item))
             menu.addAction(delete_action)
@@ -300,44 +457,123 @@ class FolderTreeWidget(QTreeWidget):
                     QMessageBox.warning(self, "Error", "Failed to rename script")
                     
     def delete_item(self, item: FolderTreeItem):
-        msg = f"Are you sure you want to delete '{item.item_data.name}'?"
+        self.delete_items([item])
+        
+    def delete_items(self, items: List[FolderTreeItem]):
+        items = self._outermost(items)
+        if not items:
+            return
+        script_ids, folder_ids = self._split_ids(items)
+        # Scripts that go with the selected folders, from the stats table
+        contained = sum(stats.script_count for folder_id, stats
+                        in self.script_manager.get_all_folder_stats().items()
+                        if folder_id in folder_ids)
+        if len(items) == 1:
+            msg = f"Are you sure you want to delete '{items[0].item_data.name}'?"
+        else:
+            msg = f"Are you sure you want to delete {len(items)} items?"
+        if contained:
+            msg += f"\n\nThis also deletes {contained} script(s) inside the selected folder(s)."
         reply = QMessageBox.question(
             self, "Confirm Delete", msg,
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
         )
         
         if reply == QMessageBox.StandardButton.Yes:
-            if item.item_type == "folder":
-                if self.script_manager.delete_folder(item.item_data.id):
-                    # Remove from tree
-                    parent = item.parent() or self.invisibleRootItem()
-                    parent.removeChild(item)
-                    del self.item_map[("folder", item.item_data.id)]
-                else:
-                    QMessageBox.warning(
-                        self, "Error", 
-                        "Cannot delete folder. Make sure it's empty."
-                    )
-                    
-            elif item.item_type == "script":
-                if self.script_manager.delete_script(item.item_data.id):
-                    # Remove from tree
-                    parent = item.parent() or self.invisibleRootItem()
-                    parent.removeChild(item)
-                    del self.item_map[("script", item.item_data.id)]
-                else:
-                    QMessageBox.warning(self, "Error", "Failed to delete script")
-                    
+            try:
+                self.script_manager.delete_items(script_ids, folder_ids)
+            except Exception as e:
+                QMessageBox.warning(self, "Error", f"Failed to delete: {e}")
+                return
+            for item in items:
+                self._remove_item(item)
+                
     def delete_selected(self):
-        item = self.currentItem()
-        if isinstance(item, FolderTreeItem):
-            self.delete_item(item)
+        self.delete_items(self.selected_tree_items())
+        
+    def move_selected(self):
+        self.move_items(self.selected_tree_items())
+        
+    def move_items(self, items: List[FolderTreeItem]):
+        items = self._outermost(items)
+        if not items:
+            return
+        script_ids, folder_ids = self._split_ids(items)
+        folders = sorted(self.script_manager.get_all_folders(), key=lambda f: f.path.lower())
+        choices = ["/"] + [f.path for f in folders]
+        path, ok = QInputDialog.getItem(
+            self, "Move to Folder", f"Move {len(items)} item(s) to:", choices, 0, False
+        )
+        if not ok:
+            return
+        target = self.script_manager.get_folder_by_path(path)
+        target_folder_id = target.id if target else None
+        if not self._move(script_ids, folder_ids, target_folder_id):
+            QMessageBox.warning(
+                self, "Error", "Cannot move a folder into itself or one of its subfolders."
+            )
+        
+    def _move(self, script_ids: List[int], folder_ids: List[int],
+              target_folder_id: Optional[int]) -> bool:
+        """Move in one transaction, then re-place just the moved items."""
+        events = []
+        collect = lambda event, item: events.append((event, item, False))
+        self.script_manager.add_listener(collect)
+        try:
+            moved = self.script_manager.move_items(script_ids, folder_ids, target_folder_id)
+        finally:
+            self.script_manager.remove_listener(collect)
+        if moved:
+            # The manager reports every moved script and folder (subfolders
+            # included, with their new paths); no full reload needed
+            self.apply_changes(events)
+        return moved
+        
+    def selected_tree_items(self) -> List[FolderTreeItem]:
+        return [item for item in self.selectedItems() if isinstance(item, FolderTreeItem)]
+        
+    def _outermost(self, items: List[FolderTreeItem]) -> List[FolderTreeItem]:
+        # Drop items whose ancestor is also in the list; they go with it
+        chosen = set(id(item) for item in items)
+        result = []
+        for item in items:
+            parent = item.parent()
+            while parent is not None and id(parent) not in chosen:
+                parent = parent.parent()
+            if parent is None:
+                result.append(item)
+        return result
+        
+    def _split_ids(self, items: List[FolderTreeItem]):
+        script_ids = [item.item_data.id for item in items if item.item_type == "script"]
+        folder_ids = [item.item_data.id for item in items if item.item_type == "folder"]
+        return script_ids, folder_ids
+        
+    def _remove_item(self, item: FolderTreeItem):
+        stack = [item]
+        while stack:
+            current = stack.pop()
+            self.item_map.pop((current.item_type, current.item_data.id), None)
+            stack.extend(current.child(i) for i in range(current.childCount()))
+        parent = item.parent() or self.invisibleRootItem()
+        parent.removeChild(item)
             
     def rename_selected(self):
         item = self.currentItem()
         if isinstance(item, FolderTreeItem):
             self.rename_item(item)
             
+    def select_item(self, item_type: str, item_id: int):
+        item = self.item_map.get((item_type, item_id))
+        if item:
+            # Expand ancestors so the item is visible
+            parent = item.parent()
+            while parent:
+                parent.setExpanded(True)
+                parent = parent.parent()
+            self.setCurrentItem(item)
+            self.scrollToItem(item)
+            
     def refresh_item(self, data):
         if isinstance(data, Folder):
             item = self.item_map.get(("folder", data.id))
@@ -349,44 +585,147 @@ class FolderTreeWidget(QTreeWidget):
                 display_name = f"{data.name}.{data.file_type}"
                 item.setText(0, display_name)
                 
-    def refresh(self):
-        """Reload the entire tree while preserving expansion state"""
-        # Save expansion state
-        expanded_folders = set()
-        for key, item in self.item_map.items():
-            if key[0] == "folder" and item.isExpanded():
-                expanded_folders.add(key[1])
+    # Changes made elsewhere (see ScriptManager.apply_changes)
+    @tracer.traced(category="gui")
+    def apply_changes(self, events: List[tuple]):
+        """Add, update, move or remove just the items the events name.
+
+        Events for items already shown as they are (e.g. this window's own
+        edits coming back from the change feed) leave the tree unchanged.
+        """
+        for event, data, _ in events:
+            item_type, _, action = event.partition("_")
+            if action == "deleted":
+                item = self.item_map.get((item_type, data))
+                if item:
+                    self._remove_item(item)
+                continue
+            parent_id = data.parent_id if item_type == "folder" else data.folder_id
+            item = self.item_map.get((item_type, data.id))
+            if item is None:
+                item = FolderTreeItem()
+                item.set_data(data, item_type)
+                self.item_map[(item_type, data.id)] = item
+            else:
+                item.set_data(data, item_type)
+            self._place(item, parent_id)
+        if self.stats_visible:
+            self.stats_timer.start()
+            
+    def _place(self, item: FolderTreeItem, parent_id: Optional[int]):
+        """Put item under parent_id's item in name order: folders, then scripts."""
+        parent = self.item_map.get(("folder", parent_id)) if parent_id is not None else None
+        target = parent or self.invisibleRootItem()
+        current = item.parent() or (self.invisibleRootItem() if item.treeWidget() else None)
+        key = self._order_key(item)
+        if current is target:
+            index = target.indexOfChild(item)
+            previous = target.child(index - 1) if index > 0 else None
+            following = target.child(index + 1) if index + 1 < target.childCount() else None
+            if (previous is None or self._order_key(previous) <= key) and \
+                    (following is None or key <= self._order_key(following)):
+                return  # already in place
+        if current is not None:
+            current.takeChild(current.indexOfChild(item))
+        # Children are kept in order, so a binary search finds the slot; bulk
+        # moves insert thousands of items
+        low, high = 0, target.childCount()
+        while low < high:
+            middle = (low + high) // 2
+            if self._order_key(target.child(middle)) < key:
+                low = middle + 1
+            else:
+                high = middle
+        target.insertChild(low, item)
+        if item.icon(0).isNull():
+            # New items get their icon once they are in the tree
+            item.set_data(item.item_data, item.item_type)
+            
+    @staticmethod
+    def _order_key(item: QTreeWidgetItem) -> tuple:
+        # Mounted libraries stay after this library's root items
+        return (isinstance(item, MountedItem), getattr(item, "item_type", None) != "folder",
+                item.text(0).lower())
         
-        # Save current selection
+    # Folder statistics columns
+    def set_stats_columns_visible(self, visible: bool):
+        self.stats_visible = visible
+        for column in range(1, len(self.STATS_COLUMNS) + 1):
+            self.setColumnHidden(column, not visible)
+        header = self.header()
+        header.setStretchLastSection(not visible)
+        if visible:
+            header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+            for column in range(1, len(self.STATS_COLUMNS) + 1):
+                header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+            self.update_folder_stats()
+        else:
+            header.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)
+            
+    def on_library_changed(self, event: str, item):
+        if self.stats_visible:
+            self.stats_timer.start()
+            
+    def update_folder_stats(self):
+        # One read of the materialised aggregates; no descendant scan
+        all_stats = self.script_manager.get_all_folder_stats()
+        align = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        for (item_type, item_id), item in self.item_map.items():
+            if item_type != "folder":
+                continue
+            stats = all_stats.get(item_id)
+            if not stats:
+                continue
+            item.setText(1, str(stats.script_count))
+            item.setText(2, stats.size_text())
+            item.setText(3, stats.last_modified.strftime("%Y-%m-%d %H:%M")
+                         if stats.last_modified else "")
+            for column in (1, 2):
+                item.setTextAlignment(column, align)
+                
+    def get_expanded_folder_ids(self) -> List[int]:
+        return [key[1] for key, item in self.item_map.items()
+                if key[0] == "folder" and item.isExpanded()]
+        
+    def set_expanded_folder_ids(self, folder_ids):
+        for folder_id in folder_ids:
+            item = self.item_map.get(("folder", folder_id))
+            if item:
+                item.setExpanded(True)
+                
+    def get_current_key(self) -> Optional[tuple]:
         current = self.currentItem()
-        current_key = None
         if isinstance(current, FolderTreeItem):
-            current_key = (current.item_type, current.item_data.id)
+            return (current.item_type, current.item_data.id)
+        return None
+        
+    def set_current_key(self, key):
+        if key:
+            item = self.item_map.get(tuple(key))
+            if item:
+                self.setCurrentItem(item)
+                self.scrollToItem(item)
+                
+    def refresh(self):
+        """Reload the entire tree while preserving expansion state"""
+        # Save expansion state and current selection
+        expanded_folders = self.get_expanded_folder_ids()
+        current_key = self.get_current_key()
         
         # Reload tree
         self.load_tree()
         
-        # Restore expansion state
-        for folder_id in expanded_folders:
-            item = self.item_map.get(("folder", folder_id))
-            if item:
-                item.setExpanded(True)
-        
-        # Restore selection
-        if current_key and current_key in self.item_map:
-            self.setCurrentItem(self.item_map[current_key])
+        # Restore expansion state and selection
+        self.set_expanded_folder_ids(expanded_folders)
+        self.set_current_key(current_key)
                 
     # Drag and drop support
     def mimeData(self, items):
         mime_data = QMimeData()
-        if items:
-            item = items[0]
-            if isinstance(item, FolderTreeItem):
-                data = {
-                    "type": item.item_type,
-                    "id": item.item_data.id
-                }
-                mime_data.setText(json.dumps(data))
+        data = [{"type": item.item_type, "id": item.item_data.id}
+                for item in items if isinstance(item, FolderTreeItem)]
+        if data:
+            mime_data.setText(json.dumps(data))
         return mime_data
         
     def dropMimeData(self, parent, index, data, action):
@@ -395,11 +734,13 @@ class FolderTreeWidget(QTreeWidget):
             
         try:
             drop_data = json.loads(data.text())
-            item_type = drop_data["type"]
-            item_id = drop_data["id"]
+            script_ids = [entry["id"] for entry in drop_data if entry["type"] == "script"]
+            folder_ids = [entry["id"] for entry in drop_data if entry["type"] == "folder"]
             
-            # Determine target folder
+            # Determine target folder; mounted libraries take no drops
             target_folder_id = None
+            if isinstance(parent, MountedItem):
+                return False
             if parent and isinstance(parent, FolderTreeItem):
                 if parent.item_type == "folder":
                     target_folder_id = parent.item_data.id
@@ -407,17 +748,8 @@ class FolderTreeWidget(QTreeWidget):
                     # Drop on script - use its parent folder
                     target_folder_id = parent.item_data.folder_id
                     
-            # Perform the move
-            if item_type == "folder":
-                success = self.script_manager.move_folder(item_id, target_folder_id)
-            elif item_type == "script":
-                success = self.script_manager.move_script(item_id, target_folder_id)
-            else:
-                return False
-                
-            if success:
-                # Reload tree to reflect changes
-                self.load_tree()
+            # Perform the move, all items in one transaction
+            if self._move(script_ids, folder_ids, target_folder_id):
                 return True
                 
         except Exception as e:
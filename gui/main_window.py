@@ -1,30 +1,97 @@
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QSplitter,
-    QMenuBar, QMenu, QToolBar, QStatusBar, QMessageBox
+    QMenuBar, QMenu, QToolBar, QStatusBar, QMessageBox, QLabel, QFileDialog, QInputDialog
 )
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QAction, QIcon, QKeySequence
 from .folder_tree import FolderTreeWidget
 from .editor_tabs import EditorTabWidget
 from .properties_panel import PropertiesPanel
-from .search_dialog import SearchDialog
 from .theme_manager import ThemeManager
 from core.script_manager import ScriptManager
+from core.name_index import NameIndex
+from core.symbols import SymbolIndex, symbol_query
+from core.change_feed import ChangeFeed
+from core.backup import LibraryBackup
+from core.startup_profiler import startup_profiler
+from core.session import SessionState
+from core.tracing import tracer
 from database.database import DatabaseManager
+from database.federation import FederationError, LibraryFederation
+from database.maintenance import LibraryMaintenance
 from database.models import Script, Folder
+from typing import Optional
 
 
 class MainWindow(QMainWindow):
+    # Emitted from the backup thread: (BackupInfo or None, error message or None)
+    backup_finished = pyqtSignal(object, object)
+    # Emitted from the maintenance thread: (MaintenanceResult or None, error message or None)
+    maintenance_finished = pyqtSignal(object, object)
+    
     def __init__(self):
         super().__init__()
         self.db_manager = DatabaseManager()
         self.script_manager = ScriptManager(self.db_manager)
         self.theme_manager = ThemeManager()
         self.search_dialog = None
+        self.duplicates_dialog = None
+        self.symbols_dialog = None
+        self.dependencies_dialog = None
+        self.quick_open_dialog = None
+        self.pending_session: Optional[SessionState] = None
+        self.performance_panel = None
+        
+        # Name index for quick open, kept current from manager events
+        self.name_index = NameIndex()
+        self.script_manager.add_listener(self.name_index.handle_event)
+        
+        # Symbol index; saves keep it current, refresh catches up the rest
+        self.symbol_index = SymbolIndex(self.db_manager)
+        
+        # Edits other clients commit to the same library, polled once the tree is up
+        self.change_feed = ChangeFeed(self.db_manager)
+        self.change_timer = QTimer(self)
+        self.change_timer.setInterval(2000)
+        self.change_timer.timeout.connect(self.poll_changes)
+        
+        # Scheduled online backups (backup_interval_hours) and maintenance
+        # (maintenance_interval_hours), checked every few minutes
+        self.backup = LibraryBackup(self.db_manager)
+        self.maintenance = LibraryMaintenance(self.db_manager)
+        self.maintenance_running = False
+        self.housekeeping_timer = QTimer(self)
+        self.housekeeping_timer.setInterval(5 * 60 * 1000)
+        self.housekeeping_timer.timeout.connect(self.housekeeping)
+        
+        # Other library files mounted read-only next to this one
+        self.federation = LibraryFederation(self.db_manager)
         
         self.setup_ui()
         self.setup_connections()
         self.apply_theme()
+        startup_profiler.mark("main window constructed")
+        
+    def finish_startup(self):
+        """Second startup stage, run once the window is on screen.
+
+        The tree and the quick-open index load on worker threads so the
+        window is responsive immediately; QScintilla is imported once the
+        tree is shown rather than before the first paint.
+        """
+        startup_profiler.mark("first event loop pass")
+        
+        # Restored tabs are placeholders; only the current one loads, after the tree
+        self.pending_session = self.script_manager.load_session()
+        self.editor_tabs.restore_tabs(
+            self.pending_session.tabs, self.pending_session.current_index
+        )
+        
+        if self.script_manager.db.get_setting("tree_stats_columns") == "1":
+            self.toggle_folder_stats_action.setChecked(True)
+        self.folder_tree.load_tree_async()
+        self.name_index.build_async(self.script_manager)
+        self.symbol_index.refresh_async()
         
     def setup_ui(self):
         self.setWindowTitle("PowerShell & Batch Script Library")
@@ -41,8 +108,9 @@ class MainWindow(QMainWindow):
         self.main_splitter = QSplitter(Qt.Orientation.Horizontal)
         main_layout.addWidget(self.main_splitter)
         
-        # Left panel - Folder tree
-        self.folder_tree = FolderTreeWidget(self.script_manager)
+        # Left panel - Folder tree (filled in by finish_startup)
+        self.folder_tree = FolderTreeWidget(self.script_manager, load=False)
+        self.folder_tree.set_federation(self.federation)
         self.folder_tree.setMinimumWidth(200)
         self.folder_tree.setMaximumWidth(400)
         self.main_splitter.addWidget(self.folder_tree)
@@ -95,6 +163,17 @@ class MainWindow(QMainWindow):
         
         file_menu.addSeparator()
         
+        self.mount_library_action = QAction("&Mount Library...", self)
+        file_menu.addAction(self.mount_library_action)
+        
+        self.unmount_library_action = QAction("&Unmount Library...", self)
+        file_menu.addAction(self.unmount_library_action)
+        
+        self.backup_action = QAction("&Back Up Now", self)
+        file_menu.addAction(self.backup_action)
+        
+        file_menu.addSeparator()
+        
         self.exit_action = QAction("E&xit", self)
         self.exit_action.setShortcut(QKeySequence.StandardKey.Quit)
         file_menu.addAction(self.exit_action)
@@ -106,6 +185,18 @@ class MainWindow(QMainWindow):
         self.search_action.setShortcut(QKeySequence.StandardKey.Find)
         edit_menu.addAction(self.search_action)
         
+        self.quick_open_action = QAction("&Go to Script...", self)
+        self.quick_open_action.setShortcut("Ctrl+P")
+        edit_menu.addAction(self.quick_open_action)
+        
+        self.go_to_definition_action = QAction("Go to &Definition", self)
+        self.go_to_definition_action.setShortcut("F12")
+        edit_menu.addAction(self.go_to_definition_action)
+        
+        self.find_references_action = QAction("Find &References", self)
+        self.find_references_action.setShortcut("Shift+F12")
+        edit_menu.addAction(self.find_references_action)
+        
         edit_menu.addSeparator()
         
         self.delete_action = QAction("&Delete", self)
@@ -129,6 +220,26 @@ class MainWindow(QMainWindow):
         self.toggle_properties_action.setChecked(True)
         view_menu.addAction(self.toggle_properties_action)
         
+        self.toggle_folder_stats_action = QAction("Folder &Statistics Columns", self)
+        self.toggle_folder_stats_action.setCheckable(True)
+        view_menu.addAction(self.toggle_folder_stats_action)
+        
+        view_menu.addSeparator()
+        
+        self.toggle_performance_action = QAction("Performance &Overlay", self)
+        self.toggle_performance_action.setCheckable(True)
+        self.toggle_performance_action.setShortcut("Ctrl+Shift+F12")
+        view_menu.addAction(self.toggle_performance_action)
+        
+        # Tools menu
+        tools_menu = menubar.addMenu("&Tools")
+        
+        self.duplicates_action = QAction("Find &Duplicates...", self)
+        tools_menu.addAction(self.duplicates_action)
+        
+        self.dependencies_action = QAction("Script De&pendencies...", self)
+        tools_menu.addAction(self.dependencies_action)
+        
         # Theme is fixed to dark mode
         
     def setup_toolbar(self):
@@ -155,27 +266,49 @@ class MainWindow(QMainWindow):
         self.cursor_pos_label = QWidget()
         self.status_bar.addPermanentWidget(self.cursor_pos_label)
         
+        # Tracing indicator
+        self.tracing_label = QLabel("Tracing")
+        self.tracing_label.setVisible(tracer.enabled)
+        self.status_bar.addPermanentWidget(self.tracing_label)
+        
     def setup_connections(self):
         # File menu actions
         self.new_script_action.triggered.connect(self.new_script)
         self.new_folder_action.triggered.connect(self.new_folder)
         self.save_action.triggered.connect(self.save_current_script)
         self.save_all_action.triggered.connect(self.save_all_scripts)
+        self.mount_library_action.triggered.connect(self.mount_library)
+        self.unmount_library_action.triggered.connect(self.choose_library_to_unmount)
+        self.backup_action.triggered.connect(self.start_backup)
+        self.backup_finished.connect(self.on_backup_finished)
+        self.maintenance_finished.connect(self.on_maintenance_finished)
         self.exit_action.triggered.connect(self.close)
         
         # Edit menu actions
         self.search_action.triggered.connect(self.show_search_dialog)
+        self.quick_open_action.triggered.connect(self.show_quick_open_dialog)
+        self.go_to_definition_action.triggered.connect(self.go_to_definition)
+        self.find_references_action.triggered.connect(self.find_references)
         self.delete_action.triggered.connect(self.delete_selected)
         self.rename_action.triggered.connect(self.rename_selected)
         
         # View menu actions
         self.toggle_folder_tree_action.toggled.connect(self.toggle_folder_tree)
         self.toggle_properties_action.toggled.connect(self.toggle_properties_panel)
+        self.toggle_performance_action.toggled.connect(self.toggle_performance_panel)
+        self.toggle_folder_stats_action.toggled.connect(self.toggle_folder_stats)
+        
+        # Tools menu actions
+        self.duplicates_action.triggered.connect(self.show_duplicates_dialog)
+        self.dependencies_action.triggered.connect(self.show_dependencies_dialog)
         # No theme switching - dark mode only
         
         # Folder tree signals
+        self.folder_tree.tree_loaded.connect(self.on_tree_loaded)
         self.folder_tree.script_selected.connect(self.open_script)
         self.folder_tree.folder_selected.connect(self.on_folder_selected)
+        self.folder_tree.mounted_script_selected.connect(self.open_mounted_script)
+        self.folder_tree.unmount_requested.connect(self.unmount_library)
         
         # Editor tabs signals
         self.editor_tabs.current_script_changed.connect(self.on_current_script_changed)
@@ -197,14 +330,208 @@ class MainWindow(QMainWindow):
     def save_all_scripts(self):
         self.editor_tabs.save_all_scripts()
         
+    def mount_library(self):
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Mount Library", "", "Script libraries (*.db);;All files (*)"
+        )
+        if not path:
+            return
+        try:
+            mount = self.federation.mount(path)
+        except FederationError as e:
+            QMessageBox.warning(self, "Mount Library", str(e))
+            return
+        self.folder_tree.reload_mounted()
+        self.update_status_bar(f"Mounted {mount.name} (read-only)")
+        
+    def choose_library_to_unmount(self):
+        names = [mount.name for mount in self.federation.mounts]
+        if not names:
+            self.update_status_bar("No libraries are mounted")
+            return
+        name, ok = QInputDialog.getItem(self, "Unmount Library", "Library:", names, 0, False)
+        if ok:
+            self.unmount_library(name)
+            
+    def unmount_library(self, name: str):
+        if self.federation.unmount(name):
+            self.editor_tabs.close_library_tabs(name)
+            self.folder_tree.reload_mounted()
+            self.update_status_bar(f"Unmounted {name}")
+            
+    def open_mounted_script(self, library: str, script: Script):
+        try:
+            content = self.federation.get_script_content(library, script.id)
+        except FederationError as e:
+            QMessageBox.warning(self, "Open Script", str(e))
+            return
+        if content is None:
+            self.update_status_bar(f"{script.name} no longer exists in {library}")
+            return
+        self.editor_tabs.open_mounted_script(library, script, content)
+        
+    def housekeeping(self):
+        if self.backup.is_due():
+            self.start_backup()
+        elif self.maintenance.is_due() and not self.maintenance_running:
+            # Short transactions on a worker thread; saves interleave with it
+            self.maintenance_running = True
+            self.maintenance.run_async(self.maintenance_finished.emit)
+            
+    def on_maintenance_finished(self, result, error):
+        self.maintenance_running = False
+        if error:
+            self.update_status_bar(f"Maintenance skipped: {error}")
+        elif result.dropped_indexes:
+            self.update_status_bar(f"Removed unused index(es): {', '.join(result.dropped_indexes)}")
+            
+
+    def start_backup(self):
+        # Copies in small steps on a worker thread; saves carry on meanwhile
+        self.backup_action.setEnabled(False)
+        self.update_status_bar("Backing up the library...")
+        self.backup.run_async(self.backup_finished.emit)
+        
+    def on_backup_finished(self, info, error):
+        self.backup_action.setEnabled(True)
+        if error:
+            self.update_status_bar(f"Backup failed: {error}")
+        else:
+            self.update_status_bar(f"Backed up to {info.path}")
+            
+    def on_tree_loaded(self):
+        if self.pending_session is not None:
+            session, self.pending_session = self.pending_session, None
+            self.folder_tree.set_expanded_folder_ids(session.expanded_folder_ids)
+            self.folder_tree.set_current_key(session.selected_item)
+            startup_profiler.finish()
+            if session.tabs and self.editor_tabs.currentIndex() >= 0:
+                self.editor_tabs.activate_current()
+        # Warm up the editor module while the user is still looking around
+        QTimer.singleShot(0, self.editor_tabs.preload_editor)
+        self.change_timer.start()
+        if not self.housekeeping_timer.isActive():
+            self.housekeeping_timer.start()
+            QTimer.singleShot(0, self.housekeeping)
+        
+    def poll_changes(self):
+        changes = self.change_feed.poll()
+        if changes is None:
+            # Too far behind to catch up from the log
+            self.script_manager.clear_caches()
+            self.folder_tree.refresh()
+        elif changes:
+            events = self.script_manager.apply_changes(changes)
+            self.folder_tree.apply_changes(events)
+            self.editor_tabs.apply_changes(events)
+            
+    def save_session(self):
+        current_key = self.folder_tree.get_current_key()
+        session = SessionState(
+            tabs=self.editor_tabs.session_tabs(),
+            current_index=self.editor_tabs.currentIndex(),
+            expanded_folder_ids=self.folder_tree.get_expanded_folder_ids(),
+            selected_item=list(current_key) if current_key else None
+        )
+        self.script_manager.save_session(session)
+        
     def show_search_dialog(self):
         if not self.search_dialog:
-            self.search_dialog = SearchDialog(self.script_manager, self)
+            from .search_dialog import SearchDialog
+            self.search_dialog = SearchDialog(self.script_manager, self.federation, self)
             self.search_dialog.script_selected.connect(self.open_script)
+            self.search_dialog.mounted_script_selected.connect(self.open_mounted_script)
         self.search_dialog.show()
         self.search_dialog.raise_()
         self.search_dialog.activateWindow()
         
+    def show_duplicates_dialog(self):
+        if not self.duplicates_dialog:
+            from .duplicates_dialog import DuplicatesDialog
+            self.duplicates_dialog = DuplicatesDialog(self.script_manager, self)
+            self.duplicates_dialog.script_selected.connect(self.open_script)
+        self.duplicates_dialog.show()
+        self.duplicates_dialog.raise_()
+        self.duplicates_dialog.activateWindow()
+        
+    def show_dependencies_dialog(self):
+        editor = self.editor_tabs.current_editor()
+        if not editor:
+            self.update_status_bar("Open a script to see its dependencies")
+            return
+        if not self.dependencies_dialog:
+            from core.dependencies import DependencyGraph
+            from .dependencies_dialog import DependenciesDialog
+            self.dependencies_dialog = DependenciesDialog(DependencyGraph(self.db_manager), self)
+            self.dependencies_dialog.script_selected.connect(self.open_script_by_id)
+        self.dependencies_dialog.show_script(editor.script)
+        
+    def show_quick_open_dialog(self):
+        if not self.quick_open_dialog:
+            from .quick_open_dialog import QuickOpenDialog
+            self.quick_open_dialog = QuickOpenDialog(self.name_index, self)
+            self.quick_open_dialog.script_chosen.connect(self.open_script_by_id)
+            self.quick_open_dialog.folder_chosen.connect(self.reveal_folder)
+        self.quick_open_dialog.show()
+        self.quick_open_dialog.raise_()
+        self.quick_open_dialog.activateWindow()
+        
+    def go_to_definition(self):
+        editor = self.editor_tabs.current_editor()
+        symbol = editor.symbol_at_cursor() if editor else ""
+        if not symbol:
+            return
+        name, _ = symbol_query(symbol)
+        locations = self.symbol_index.definitions(name)
+        # A definition in the same script wins, as it would in the shell
+        local = [location for location in locations if location.script_id == editor.script.id]
+        if local or len(locations) == 1:
+            location = (local or locations)[0]
+            self.open_location(location.script_id, location.line)
+        elif locations:
+            self.show_symbol_results(f"Definitions of {name}", locations)
+        else:
+            self.update_status_bar(f"No definition found for {name}")
+            
+    def find_references(self):
+        editor = self.editor_tabs.current_editor()
+        symbol = editor.symbol_at_cursor() if editor else ""
+        if not symbol:
+            return
+        name, kinds = symbol_query(symbol)
+        locations = self.symbol_index.references(name, kinds, limit=5000)
+        if locations:
+            self.show_symbol_results(f"References to {symbol}", locations)
+        else:
+            self.update_status_bar(f"No references found for {symbol}")
+            
+    def show_symbol_results(self, title: str, locations):
+        if not self.symbols_dialog:
+            from .symbols_dialog import SymbolResultsDialog
+            self.symbols_dialog = SymbolResultsDialog(self)
+            self.symbols_dialog.location_selected.connect(self.open_location)
+        from core.duplicates import script_paths
+        self.symbols_dialog.show_results(title, locations, script_paths(self.db_manager))
+        
+    def open_location(self, script_id: int, line: int):
+        script = self.script_manager.get_script(script_id)
+        if script:
+            self.folder_tree.select_item("script", script_id)
+            self.editor_tabs.go_to_line(script, line)
+            self.properties_panel.set_script(script)
+            
+    def open_script_by_id(self, script_id: int):
+        script = self.script_manager.get_script(script_id)
+        if script:
+            self.folder_tree.select_item("script", script_id)
+            self.open_script(script)
+            
+    def reveal_folder(self, folder_id: int):
+        folder = self.script_manager.get_folder(folder_id)
+        if folder:
+            self.folder_tree.select_item("folder", folder_id)
+            self.on_folder_selected(folder)
+        
     def delete_selected(self):
         self.folder_tree.delete_selected()
         
@@ -217,6 +544,28 @@ class MainWindow(QMainWindow):
     def toggle_properties_panel(self, checked):
         self.properties_panel.setVisible(checked)
         
+    def toggle_folder_stats(self, checked):
+        self.folder_tree.set_stats_columns_visible(checked)
+        self.script_manager.db.set_setting("tree_stats_columns", "1" if checked else "0")
+        
+    def toggle_performance_panel(self, checked):
+        if checked:
+            if not self.performance_panel:
+                from .performance_panel import PerformancePanel
+                self.performance_panel = PerformancePanel(self)
+                self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.performance_panel)
+                self.performance_panel.visibilityChanged.connect(
+                    lambda visible: visible or self.toggle_performance_action.setChecked(False)
+                )
+            # Instrumentation is always compiled in; showing the overlay turns it on
+            tracer.enable(log_sql=tracer.log_sql)
+            self.performance_panel.show()
+        else:
+            if self.performance_panel:
+                self.performance_panel.hide()
+            tracer.disable()
+        self.tracing_label.setVisible(tracer.enabled)
+        
     
     def apply_theme(self):
         theme = self.theme_manager.get_current_theme()
@@ -269,10 +618,13 @@ class MainWindow(QMainWindow):
             
             if reply == QMessageBox.StandardButton.Save:
                 self.save_all_scripts()
+                self.save_session()
                 event.accept()
             elif reply == QMessageBox.StandardButton.Discard:
+                self.save_session()
                 event.accept()
             else:
                 event.ignore()
         else:
+            self.save_session()
             event.accept()
\ No newline at end of file
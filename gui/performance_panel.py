@@ -0,0 +1,95 @@
+from PyQt6.QtWidgets import (
+    QDockWidget, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
+    QTableWidgetItem, QPushButton, QCheckBox, QLabel, QFileDialog,
+    QHeaderView, QAbstractItemView
+)
+from PyQt6.QtCore import Qt, QTimer
+from core.tracing import tracer
+
+
+class PerformancePanel(QDockWidget):
+    """Live view of tracer statistics with Chrome trace export."""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, parent=None):
+        super().__init__("Performance", parent)
+        self.setObjectName("PerformancePanel")
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self.setup_ui()
+
+    def setup_ui(self):
+        container = QWidget()
+        layout = QVBoxLayout(container)
+        layout.setContentsMargins(6, 6, 6, 6)
+
+        controls = QHBoxLayout()
+        layout.addLayout(controls)
+
+        self.log_sql_check = QCheckBox("Log SQL")
+        self.log_sql_check.setChecked(tracer.log_sql)
+        self.log_sql_check.toggled.connect(self.on_log_sql_toggled)
+        controls.addWidget(self.log_sql_check)
+
+        controls.addStretch()
+
+        self.clear_button = QPushButton("Clear")
+        self.clear_button.clicked.connect(self.clear)
+        controls.addWidget(self.clear_button)
+
+        self.export_button = QPushButton("Export Trace...")
+        self.export_button.clicked.connect(self.export_trace)
+        controls.addWidget(self.export_button)
+
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Span", "Calls", "Total ms", "Avg ms", "Max ms"])
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self.counters_label = QLabel("")
+        self.counters_label.setWordWrap(True)
+        layout.addWidget(self.counters_label)
+
+        self.setWidget(container)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start(self.REFRESH_MS)
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def refresh(self):
+        rows = tracer.summary()
+        self.table.setRowCount(len(rows))
+        for row, (name, calls, total, average, peak) in enumerate(rows):
+            values = [name, str(calls), f"{total:.1f}", f"{average:.2f}", f"{peak:.2f}"]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+
+        counters = tracer.counters()
+        self.counters_label.setText(
+            "  ".join(f"{name}: {value}" for name, value in sorted(counters.items()))
+        )
+
+    def on_log_sql_toggled(self, checked: bool):
+        tracer.log_sql = checked
+
+    def clear(self):
+        tracer.clear()
+        self.refresh()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Export Trace", "pslibrary-trace.json", "Chrome Trace (*.json)"
+        )
+        if path:
+            tracer.export_chrome_trace(path)
\ No newline at end of file
@@ -77,6 +77,13 @@ class PropertiesPanel(QWidget):
         self.folder_path.setReadOnly(True)
         self.folder_layout.addRow("Path:", self.folder_path)
         
+        # Subtree totals from the folder_stats table
+        self.folder_scripts = QLabel()
+        self.folder_layout.addRow("Scripts:", self.folder_scripts)
+        
+        self.folder_size = QLabel()
+        self.folder_layout.addRow("Total Size:", self.folder_size)
+        
         # Metadata group
         self.metadata_group = QGroupBox("Metadata")
         self.metadata_layout = QFormLayout()
@@ -143,9 +150,20 @@ class PropertiesPanel(QWidget):
         self.folder_name.setText(folder.name)
         self.folder_path.setText(folder.path)
         
+        stats = self.script_manager.get_folder_stats(folder.id)
+        if stats:
+            self.folder_scripts.setText(str(stats.script_count))
+            self.folder_size.setText(stats.size_text())
+        else:
+            self.folder_scripts.clear()
+            self.folder_size.clear()
+        
         # Metadata
         self.created_date.setText(folder.created_date.strftime("%Y-%m-%d %H:%M"))
-        self.modified_date.setText("")
+        if stats and stats.last_modified:
+            self.modified_date.setText(stats.last_modified.strftime("%Y-%m-%d %H:%M"))
+        else:
+            self.modified_date.setText("")
         self.last_opened.setText("")
         
         self.title_label.setText(f"Properties - {folder.name}")
@@ -164,6 +182,8 @@ class PropertiesPanel(QWidget):
         self.script_description.clear()
         self.folder_name.clear()
         self.folder_path.clear()
+        self.folder_scripts.clear()
+        self.folder_size.clear()
         self.created_date.clear()
         self.modified_date.clear()
         self.last_opened.clear()
@@ -0,0 +1,106 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QLineEdit, QListWidget, QListWidgetItem, QLabel
+)
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from core.name_index import NameIndex
+
+
+class QuickOpenDialog(QDialog):
+    script_chosen = pyqtSignal(int)
+    folder_chosen = pyqtSignal(int)
+
+    MAX_RESULTS = 50
+
+    def __init__(self, name_index: NameIndex, parent=None):
+        super().__init__(parent)
+        self.name_index = name_index
+        # Shows results once a build still running when the dialog opened ends
+        self.ready_timer = QTimer(self)
+        self.ready_timer.setInterval(100)
+        self.ready_timer.timeout.connect(self.check_ready)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Go to Script")
+        self.setModal(False)
+        self.resize(600, 400)
+
+        layout = QVBoxLayout(self)
+
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Type part of a script name or folder path...")
+        self.search_input.textChanged.connect(self.update_results)
+        self.search_input.returnPressed.connect(self.open_current)
+        self.search_input.installEventFilter(self)
+        layout.addWidget(self.search_input)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self.open_item)
+        layout.addWidget(self.results_list)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.search_input.selectAll()
+        self.search_input.setFocus()
+        self.update_results(self.search_input.text())
+
+    def hideEvent(self, event):
+        self.ready_timer.stop()
+        super().hideEvent(event)
+
+    def check_ready(self):
+        if self.name_index.ready.is_set():
+            self.ready_timer.stop()
+            self.update_results(self.search_input.text())
+
+    def eventFilter(self, obj, event):
+        # Let the arrow keys move through results while typing
+        if obj is self.search_input and event.type() == event.Type.KeyPress:
+            if event.key() in (Qt.Key.Key_Down, Qt.Key.Key_Up):
+                step = 1 if event.key() == Qt.Key.Key_Down else -1
+                count = self.results_list.count()
+                if count:
+                    row = (self.results_list.currentRow() + step) % count
+                    self.results_list.setCurrentRow(row)
+                return True
+        return super().eventFilter(obj, event)
+
+    def update_results(self, text: str):
+        self.results_list.clear()
+        if not self.name_index.ready.is_set():
+            self.status_label.setText("Indexing library...")
+            if self.isVisible():
+                self.ready_timer.start()
+            return
+
+        matches = self.name_index.search(text, self.MAX_RESULTS)
+        for match in matches:
+            if match.kind == "script":
+                item = QListWidgetItem(f"{match.label}    {match.detail}")
+            else:
+                item = QListWidgetItem(f"[folder] {match.label}")
+            item.setData(Qt.ItemDataRole.UserRole, (match.kind, match.item_id))
+            self.results_list.addItem(item)
+
+        if text.strip():
+            self.status_label.setText(f"{len(matches)} match(es)")
+        else:
+            self.status_label.setText(f"{len(self.name_index)} items indexed")
+        if matches:
+            self.results_list.setCurrentRow(0)
+
+    def open_current(self):
+        item = self.results_list.currentItem()
+        if item:
+            self.open_item(item)
+
+    def open_item(self, item: QListWidgetItem):
+        kind, item_id = item.data(Qt.ItemDataRole.UserRole)
+        if kind == "script":
+            self.script_chosen.emit(item_id)
+        else:
+            self.folder_chosen.emit(item_id)
+        self.accept()
\ No newline at end of file
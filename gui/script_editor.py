@@ -0,0 +1,235 @@
+import hashlib
+import re
+from PyQt6.QtWidgets import QFrame, QHBoxLayout, QLabel, QPushButton
+from PyQt6.QtGui import QFont, QColor
+from PyQt6.QtCore import QTimer, pyqtSignal
+from PyQt6.Qsci import QsciScintilla
+from database.models import Script
+from .syntax_highlighter import SyntaxHighlighterFactory
+
+
+# Large files are appended in slices so the event loop keeps running
+LOAD_CHUNK_CHARS = 512 * 1024
+
+
+# Symbols as written in a line: variables with their sigils, names, labels
+_SYMBOL = re.compile(r"\$\{[^}\n]*\}|\$[\w:]+|%[\w-]+%|![\w-]+!|:?\w[\w.:-]*")
+_BATCH_JUMP = re.compile(r"\bgoto\s+$", re.IGNORECASE)
+
+
+def _digest(encoded: bytes) -> bytes:
+    return hashlib.blake2b(encoded, digest_size=16).digest()
+
+
+class LargeFileBanner(QFrame):
+    """Strip across the top of a large-file editor offering full editing."""
+    
+    def __init__(self, editor: "ScriptEditor", size_bytes: int, lines: int):
+        super().__init__(editor)
+        self.setStyleSheet("QFrame { background: #3a3d41; } QLabel { color: #e0e0e0; }")
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(8, 2, 4, 2)
+        
+        size_mb = size_bytes / (1024 * 1024)
+        self.label = QLabel(
+            f"Large file ({size_mb:.1f} MB, {lines:,} lines): syntax highlighting, "
+            f"brace matching and line highlighting are off."
+        )
+        layout.addWidget(self.label, 1)
+        
+        self.enable_button = QPushButton("Enable Full Editing")
+        self.enable_button.clicked.connect(editor.enable_full_features)
+        layout.addWidget(self.enable_button)
+        
+        close_button = QPushButton("✕")
+        close_button.setFlat(True)
+        close_button.setFixedWidth(24)
+        close_button.clicked.connect(editor.hide_banner)
+        layout.addWidget(close_button)
+
+
+class ScriptEditor(QsciScintilla):
+    """Editor for one script; owns the only live copy of its text.
+
+    The model's content is released once it is handed over here, and the
+    saved state is kept as a length and digest rather than a second string.
+    """
+    
+    # Emitted once all content is in the editor (immediately for normal files)
+    content_loaded = pyqtSignal()
+    
+    def __init__(self, script: Script, content: str, large_file: bool = False,
+                 read_only: bool = False):
+        super().__init__()
+        self.script = script
+        self.large_file = large_file
+        self.read_only = read_only  # e.g. a script from a mounted library
+        self.loading = False
+        self.banner = None
+        self._pending = []
+        self.mark_saved(content)
+        self.setup_editor()
+        if large_file:
+            self.setup_large_file_mode(content.count("\n") + 1)
+        else:
+            self.setup_full_features()
+        self.set_content(content)
+        self.setReadOnly(read_only or self.loading)
+    
+    def setup_editor(self):
+        # Editor settings
+        self.setUtf8(True)
+        self.setFont(QFont("Consolas", 10))
+        
+        # Set default colors
+        self.setPaper(QColor("#1e1e1e"))
+        self.setColor(QColor("#ffffff"))
+        
+        # Line numbers
+        self.setMarginType(0, QsciScintilla.MarginType.NumberMargin)
+        self.setMarginWidth(0, "0000")
+        self.setMarginLineNumbers(0, True)
+        self.setMarginsBackgroundColor(QColor("#2b2b2b"))
+        self.setMarginsForegroundColor(QColor("#858585"))
+        
+        # Indentation
+        self.setIndentationsUseTabs(False)
+        self.setIndentationWidth(4)
+        self.setAutoIndent(True)
+    
+    def setup_full_features(self):
+        # Brace matching
+        self.setBraceMatching(QsciScintilla.BraceMatch.SloppyBraceMatch)
+        
+        # Current line highlighting
+        self.setCaretLineVisible(True)
+        self.setCaretLineBackgroundColor(QColor("#2a2a2a"))
+        
+        # Set lexer based on file type
+        lexer = SyntaxHighlighterFactory.get_highlighter(self.script.file_type, self)
+        if lexer:
+            self.setLexer(lexer)
+    
+    def setup_large_file_mode(self, lines: int):
+        # Plain text: no lexer (so no styling or fold levels), no brace or
+        # caret-line work on every cursor move, and layout cached per page only
+        self.setBraceMatching(QsciScintilla.BraceMatch.NoBraceMatch)
+        self.setCaretLineVisible(False)
+        self.setFolding(QsciScintilla.FoldStyle.NoFoldStyle)
+        self.setWrapMode(QsciScintilla.WrapMode.WrapNone)
+        self.SendScintilla(QsciScintilla.SCI_SETLAYOUTCACHE, QsciScintilla.SC_CACHE_PAGE)
+        self.setMarginWidth(0, "0" * (len(str(lines)) + 1))
+        
+        self.banner = LargeFileBanner(self, self._saved_length, lines)
+        self.setViewportMargins(0, self.banner.sizeHint().height(), 0, 0)
+    
+    def enable_full_features(self):
+        """Leave large-file mode: highlighting, brace matching and caret line."""
+        if not self.large_file:
+            return
+        self.large_file = False
+        self.setup_full_features()
+        self.hide_banner()
+    
+    def hide_banner(self):
+        if self.banner:
+            self.banner.hide()
+            self.banner.deleteLater()
+            self.banner = None
+            self.setViewportMargins(0, 0, 0, 0)
+    
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        if self.banner:
+            self.banner.setGeometry(0, 0, self.width(), self.banner.sizeHint().height())
+    
+    def set_content(self, content: str):
+        if not self.large_file or len(content) <= LOAD_CHUNK_CHARS:
+            self.setText(content)
+            self.setModified(False)
+            self.content_loaded.emit()
+            return
+        
+        # Show the first slice at once and append the rest from the event loop;
+        # read-only and without undo history until everything is in
+        self.loading = True
+        self.setReadOnly(True)
+        self.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 0)
+        self._pending = [content[i:i + LOAD_CHUNK_CHARS]
+                         for i in range(0, len(content), LOAD_CHUNK_CHARS)]
+        self._pending.reverse()
+        self.setText(self._pending.pop())
+        if self.banner:
+            self.banner.enable_button.setEnabled(False)
+        QTimer.singleShot(0, self._load_next_chunk)
+    
+    def _load_next_chunk(self):
+        if self._pending:
+            self.append(self._pending.pop())
+        if self._pending:
+            QTimer.singleShot(0, self._load_next_chunk)
+            return
+        self.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 1)
+        self.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        self.setReadOnly(self.read_only)
+        self.setModified(False)
+        self.loading = False
+        if self.banner:
+            self.banner.enable_button.setEnabled(True)
+        self.content_loaded.emit()
+    
+    def restore_position(self, line: int, column: int, first_visible_line: int):
+        """Move the caret/scroll position, waiting for a chunked load if needed."""
+        def apply():
+            self.setCursorPosition(line, column)
+            self.setFirstVisibleLine(first_visible_line)
+        if self.loading:
+            self.content_loaded.connect(apply)
+        else:
+            apply()
+    
+    def get_content(self) -> str:
+        return self.text()
+    
+    def symbol_at_cursor(self) -> str:
+        """The symbol under the caret as written, e.g. Get-Config, $Name or %NAME%."""
+        line, index = self.getCursorPosition()
+        text = self.text(line)
+        for match in _SYMBOL.finditer(text):
+            if match.start() <= index <= match.end():
+                symbol = match.group()
+                # "goto cleanup" refers to the label :cleanup
+                if self.script.file_type == "bat" and _BATCH_JUMP.search(text[:match.start()]):
+                    symbol = ":" + symbol.lstrip(":")
+                return symbol
+        return ""
+    
+    def is_content_changed(self) -> bool:
+        if self.loading:
+            return False
+        # Scintilla's save point also tracks undo back to the saved state
+        if not self.isModified():
+            return False
+        if self.large_file:
+            # Hashing megabytes of text on every keystroke is what we avoid here
+            return True
+        # Edited away and back by hand: same length (in UTF-8 bytes) and digest
+        if self.SendScintilla(QsciScintilla.SCI_GETLENGTH) != self._saved_length:
+            return True
+        return _digest(self.get_content().encode("utf-8")) != self._saved_digest
+    
+    def mark_saved(self, content: str):
+        """Record content as the clean state without keeping a copy of it."""
+        encoded = content.encode("utf-8")
+        self._saved_length = len(encoded)
+        self._saved_digest = _digest(encoded)
+    
+    def matches_saved(self, content: str) -> bool:
+        """Whether content is what was last loaded or saved here."""
+        encoded = content.encode("utf-8")
+        return len(encoded) == self._saved_length and _digest(encoded) == self._saved_digest
+    
+    def save_content(self, content: str):
+        """Called after content (this editor's text) was written out."""
+        self.mark_saved(content)
+        self.setModified(False)
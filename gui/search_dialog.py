@@ -1,18 +1,25 @@
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
-    QListWidget, QListWidgetItem, QLabel
+    QListWidget, QListWidgetItem, QLabel, QComboBox, QInputDialog
 )
 from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from typing import Optional
 from database.models import Script
+from database.query import parse_query
+from database.federation import LibraryFederation, LibraryScript
 from core.script_manager import ScriptManager
+from core.tracing import tracer
 
 
 class SearchDialog(QDialog):
     script_selected = pyqtSignal(Script)
+    mounted_script_selected = pyqtSignal(str, Script)  # library name, script
     
-    def __init__(self, script_manager: ScriptManager, parent=None):
+    def __init__(self, script_manager: ScriptManager,
+                 federation: Optional[LibraryFederation] = None, parent=None):
         super().__init__(parent)
         self.script_manager = script_manager
+        self.federation = federation
         self.search_timer = QTimer()
         self.search_timer.setSingleShot(True)
         self.search_timer.timeout.connect(self.perform_search)
@@ -26,12 +33,32 @@ class SearchDialog(QDialog):
         # Main layout
         layout = QVBoxLayout(self)
         
+        # Saved searches
+        saved_layout = QHBoxLayout()
+        layout.addLayout(saved_layout)
+        
+        saved_layout.addWidget(QLabel("Saved:"))
+        self.saved_combo = QComboBox()
+        self.saved_combo.activated.connect(self.on_saved_search_activated)
+        saved_layout.addWidget(self.saved_combo, 1)
+        
+        self.save_search_button = QPushButton("Save...")
+        self.save_search_button.clicked.connect(self.save_current_search)
+        saved_layout.addWidget(self.save_search_button)
+        
+        self.delete_search_button = QPushButton("Delete")
+        self.delete_search_button.clicked.connect(self.delete_saved_search)
+        saved_layout.addWidget(self.delete_search_button)
+        
         # Search input
         search_layout = QHBoxLayout()
         layout.addLayout(search_layout)
         
         self.search_input = QLineEdit()
-        self.search_input.setPlaceholderText("Search by name, content, or description...")
+        self.search_input.setPlaceholderText(
+            "Search text, or filter e.g. env:Production author:alice type:bat "
+            "folder:/Infra modified:week"
+        )
         self.search_input.textChanged.connect(self.on_search_text_changed)
         search_layout.addWidget(self.search_input)
         
@@ -69,6 +96,37 @@ class SearchDialog(QDialog):
         # Focus search input
         self.search_input.setFocus()
         
+        self.load_saved_searches()
+        
+    def load_saved_searches(self):
+        self.saved_combo.clear()
+        self.saved_combo.addItem("", None)
+        for search in self.script_manager.get_saved_searches():
+            self.saved_combo.addItem(search.name, search)
+        self.delete_search_button.setEnabled(self.saved_combo.count() > 1)
+        
+    def on_saved_search_activated(self, index: int):
+        search = self.saved_combo.itemData(index)
+        if search:
+            self.search_input.setText(search.query_text)
+            self.perform_search()
+            
+    def save_current_search(self):
+        query_text = self.search_input.text().strip()
+        if not query_text:
+            return
+        name, ok = QInputDialog.getText(self, "Save Search", "Search name:")
+        if ok and name:
+            self.script_manager.save_search(name, query_text)
+            self.load_saved_searches()
+            self.saved_combo.setCurrentIndex(self.saved_combo.findText(name))
+            
+    def delete_saved_search(self):
+        search = self.saved_combo.currentData()
+        if search:
+            self.script_manager.delete_saved_search(search.id)
+            self.load_saved_searches()
+        
     def on_search_text_changed(self, text: str):
         # Debounce search to avoid too many queries
         self.search_timer.stop()
@@ -82,25 +140,37 @@ class SearchDialog(QDialog):
             self.results_label.setText("Enter search terms above")
             return
             
-        # Perform search
-        results = self.script_manager.search_scripts(query)
-        
+        with tracer.span("SearchDialog.perform_search", "gui") as span:
+            # Perform search; key:value filters compile to indexed SQL.
+            # With libraries mounted, one statement searches them all
+            if self.federation and self.federation.mounts:
+                results = self.federation.query_scripts(parse_query(query))
+            else:
+                results = [LibraryScript(None, script, None) for script in
+                           self.script_manager.query_scripts(parse_query(query))]
+            span.set(rows=len(results))
+            self.show_results(results)
+            
+    def show_results(self, results):
         # Update UI
         self.results_list.clear()
         
         if results:
             self.results_label.setText(f"Found {len(results)} script(s)")
             
-            for script in results:
+            for library, script, _ in results:
                 item = QListWidgetItem()
-                item.setText(f"{script.name}.{script.file_type}")
+                if library:
+                    item.setText(f"{script.name}.{script.file_type}  [{library}]")
+                else:
+                    item.setText(f"{script.name}.{script.file_type}")
                 
                 # Add description as tooltip if available
                 if script.description:
                     item.setToolTip(script.description)
                     
                 # Store script reference
-                item.setData(Qt.ItemDataRole.UserRole, script)
+                item.setData(Qt.ItemDataRole.UserRole, (library, script))
                 
                 self.results_list.addItem(item)
         else:
@@ -111,15 +181,17 @@ class SearchDialog(QDialog):
         self.open_button.setEnabled(has_selection)
         
     def on_item_double_clicked(self, item: QListWidgetItem):
-        script = item.data(Qt.ItemDataRole.UserRole)
-        if script:
-            self.script_selected.emit(script)
-            self.accept()
+        self.open_result(item)
             
     def open_selected_script(self):
         selected_items = self.results_list.selectedItems()
         if selected_items:
-            script = selected_items[0].data(Qt.ItemDataRole.UserRole)
-            if script:
-                self.script_selected.emit(script)
-                self.accept()
\ No newline at end of file
+            self.open_result(selected_items[0])
+            
+    def open_result(self, item: QListWidgetItem):
+        library, script = item.data(Qt.ItemDataRole.UserRole)
+        if library:
+            self.mounted_script_selected.emit(library, script)
+        else:
+            self.script_selected.emit(script)
+        self.accept()
\ No newline at end of file
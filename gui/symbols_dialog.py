@@ -0,0 +1,57 @@
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QTreeWidget, QTreeWidgetItem
+)
+from PyQt6.QtCore import Qt, pyqtSignal
+from typing import Dict, List
+from core.symbols import SymbolLocation
+
+
+class SymbolResultsDialog(QDialog):
+    """Definitions or references of a symbol; double-click jumps to one."""
+    location_selected = pyqtSignal(int, int)  # script id, line
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Symbol Results")
+        self.setModal(False)
+        self.resize(700, 400)
+
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderLabels(["Script", "Line", "Uses", "Kind"])
+        self.results_tree.setRootIsDecorated(False)
+        self.results_tree.setColumnWidth(0, 460)
+        self.results_tree.itemDoubleClicked.connect(self.on_item_double_clicked)
+        layout.addWidget(self.results_tree)
+
+        close_button = QPushButton("Close")
+        close_button.clicked.connect(self.close)
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        button_layout.addWidget(close_button)
+        layout.addLayout(button_layout)
+
+    def show_results(self, title: str, locations: List[SymbolLocation], paths: Dict[int, str]):
+        self.summary_label.setText(f"{title}: {len(locations)} scripts")
+        self.results_tree.clear()
+        for location in locations:
+            item = QTreeWidgetItem(self.results_tree)
+            item.setText(0, paths.get(location.script_id, f"#{location.script_id}"))
+            item.setText(1, str(location.line))
+            item.setText(2, str(location.occurrences))
+            item.setText(3, location.kind)
+            item.setData(0, Qt.ItemDataRole.UserRole, (location.script_id, location.line))
+        self.show()
+        self.raise_()
+        self.activateWindow()
+
+    def on_item_double_clicked(self, item: QTreeWidgetItem, column: int):
+        script_id, line = item.data(0, Qt.ItemDataRole.UserRole)
+        self.location_selected.emit(script_id, line)
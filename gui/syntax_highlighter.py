@@ -1,8 +1,7 @@
-from pygments import highlight
-from pygments.lexers import PowerShellLexer, BatchLexer
-from pygments.formatters import HtmlFormatter
 from PyQt6.Qsci import QsciLexerBatch, QsciLexerCustom
 from PyQt6.QtGui import QColor, QFont
+from core.tracing import tracer
+from core.tokenizer import tokenize_powershell
 
 
 class PowerShellHighlighter(QsciLexerCustom):
@@ -32,6 +31,7 @@ class PowerShellHighlighter(QsciLexerCustom):
             return "Cmdlet"
         return ""
     
+    @tracer.traced("PowerShellHighlighter.styleText", category="gui")
     def styleText(self, start, end):
         # Simple PowerShell syntax highlighting
         # This is a basic implementation - you can enhance it later
@@ -42,57 +42,9 @@ class PowerShellHighlighter(QsciLexerCustom):
         text = editor.text()[start:end]
         self.startStyling(start)
         
-        # Basic tokenization
-        i = 0
-        while i < len(text):
-            ch = text[i]
-            
-            # Comments
-            if ch == '#':
-                j = i
-                while j < len(text) and text[j] != '\n':
-                    j += 1
-                self.setStyling(j - i, 1)
-                i = j
-                continue
-            
-            # Strings
-            elif ch in ['"', "'"]:
-                quote = ch
-                j = i + 1
-                while j < len(text) and text[j] != quote:
-                    if text[j] == '\\' and j + 1 < len(text):
-                        j += 2
-                    else:
-                        j += 1
-                if j < len(text):
-                    j += 1
-                self.setStyling(j - i, 2)
-                i = j
-                continue
-            
-            # Variables
-            elif ch == '$':
-                j = i + 1
-                while j < len(text) and (text[j].isalnum() or text[j] == '_'):
-                    j += 1
-                self.setStyling(j - i, 4)
-                i = j
-                continue
-            
-            # Numbers
-            elif ch.isdigit():
-                j = i
-                while j < len(text) and (text[j].isdigit() or text[j] == '.'):
-                    j += 1
-                self.setStyling(j - i, 5)
-                i = j
-                continue
-            
-            # Default
-            else:
-                self.setStyling(1, 0)
-                i += 1
+        # Tokenization lives in core.tokenizer so it can be benchmarked without Qt
+        for length, style in tokenize_powershell(text):
+            self.setStyling(length, style)
     
     def setup_styles(self):
         # VS Code PowerShell dark theme colors
@@ -184,6 +136,8 @@ class SyntaxHighlighterFactory:
     
     @staticmethod
     def get_lexer(file_type: str):
+        # Pygments is only needed here; importing it lazily keeps it off the startup path
+        from pygments.lexers import PowerShellLexer, BatchLexer
         if file_type == "ps1":
             return PowerShellLexer()
         elif file_type == "bat":
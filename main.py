@@ -4,15 +4,37 @@ PowerShell & Batch Script Library Manager
 A modern VS Code-inspired GUI application for managing PowerShell and batch scripts.
 """
 
+from core.startup_profiler import startup_profiler
+from core.tracing import tracer
+
 import sys
-import os
+import argparse
 from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QIcon
-from gui.main_window import MainWindow
+from PyQt6.QtCore import QTimer
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="PowerShell & Batch Script Library")
+    parser.add_argument(
+        "--profile-startup", action="store_true",
+        help="print a startup timing report to stderr"
+    )
+    parser.add_argument(
+        "--trace", metavar="FILE",
+        help="record timings and SQL from startup and write a Chrome trace to FILE on exit"
+    )
+    # Leave Qt's own options (e.g. -platform) for QApplication
+    args, _ = parser.parse_known_args(argv[1:])
+    return args
 
 
 def main():
+    args = parse_args(sys.argv)
+    startup_profiler.enabled = args.profile_startup
+    if args.trace:
+        tracer.enable(log_sql=True)
+    startup_profiler.mark("qt core imported")
+    
     # Create the application
     app = QApplication(sys.argv)
     
@@ -20,15 +42,25 @@ def main():
     app.setApplicationName("PowerShell & Batch Script Library")
     app.setOrganizationName("ScriptLibrary")
     app.setApplicationDisplayName("Script Library Manager")
+    startup_profiler.mark("application created")
     
     # High DPI scaling is automatic in PyQt6, no need to set attributes
     
-    # Create and show the main window
+    # Import the window after QApplication exists so the import cost is measured
+    from gui.main_window import MainWindow
+    startup_profiler.mark("gui modules imported")
+    
+    # Create and show the main window; heavy loading happens after the first paint
     window = MainWindow()
     window.show()
+    startup_profiler.mark("window shown")
+    QTimer.singleShot(0, window.finish_startup)
     
     # Run the application
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    if args.trace:
+        tracer.export_chrome_trace(args.trace)
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+"""
+PowerShell & Batch Script Library - command-line interface
+Headless access to the library for automation; never imports PyQt.
+
+    python pslibrary.py list /Deploy
+    python pslibrary.py get /Deploy/Web/Install-Site.ps1 > Install-Site.ps1
+"""
+
+import sys
+from cli.main import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())